@@ -0,0 +1,119 @@
+# leagues/analytics.py
+"""
+Statistik tingkat liga untuk satu season: gol per match, persentase hasil,
+kartu per match, dan korelasi (mis. penguasaan bola vs hasil).
+
+Semua angka berasal dari SATU query aggregate atas match FINISHED season tsb.
+Korelasi Pearson dihitung dari statistik cukup (n, Σx, Σy, Σx², Σy², Σxy) yang
+ikut dijumlahkan di query yang sama, lalu divektorkan dengan NumPy untuk semua
+pasangan sekaligus. Hasil di-cache per versi data liga.
+"""
+import numpy as np
+from django.core.cache import cache
+from django.db.models import Case, Count, F, FloatField, Q, Sum, Value, When
+from django.db.models.functions import Cast
+
+from .models import Match
+from .versioning import get_data_version
+
+ANALYTICS_TIMEOUT = 60 * 60 * 24
+
+
+def _diff(name):
+    return Cast(F(f"home_{name}"), FloatField()) - Cast(F(f"away_{name}"), FloatField())
+
+
+# hasil dari sudut pandang tuan rumah: 1 menang, 0 seri, -1 kalah
+_RESULT = Case(
+    When(home_score__gt=F("away_score"), then=Value(1.0)),
+    When(home_score__lt=F("away_score"), then=Value(-1.0)),
+    default=Value(0.0),
+    output_field=FloatField(),
+)
+
+# nama -> (x, y); semua selisih kandang - tandang
+CORRELATIONS = {
+    "possession_vs_result": (_diff("possession"), _RESULT),
+    "possession_vs_goal_diff": (_diff("possession"), _diff("score")),
+    "shots_on_target_vs_goal_diff": (_diff("shots_on_target"), _diff("score")),
+    "shots_vs_goal_diff": (_diff("shots"), _diff("score")),
+}
+
+
+def _sum_fields(side_fields):
+    return sum((F(f"{side}_{name}") for side in ("home", "away") for name in side_fields), Value(0))
+
+
+def _aggregates():
+    aggregates = {
+        "n": Count("id"),
+        "home_wins": Count("id", filter=Q(home_score__gt=F("away_score"))),
+        "away_wins": Count("id", filter=Q(home_score__lt=F("away_score"))),
+        "goals": Sum(_sum_fields(("score",))),
+        "yellow_cards": Sum(_sum_fields(("yellow_cards",))),
+        "red_cards": Sum(_sum_fields(("red_cards",))),
+        "shots": Sum(_sum_fields(("shots",))),
+        "corners": Sum(_sum_fields(("corners",))),
+        "fouls": Sum(_sum_fields(("fouls_conceded",))),
+    }
+    for name, (x, y) in CORRELATIONS.items():
+        aggregates.update({
+            f"{name}__x": Sum(x), f"{name}__y": Sum(y),
+            f"{name}__xx": Sum(x * x), f"{name}__yy": Sum(y * y), f"{name}__xy": Sum(x * y),
+        })
+    return aggregates
+
+
+def pearson_from_sums(n, sx, sy, sxx, syy, sxy):
+    """Korelasi Pearson (vektor) dari statistik cukup; NaN jika variansnya nol."""
+    sx, sy, sxx, syy, sxy = (np.asarray(v, dtype=float) for v in (sx, sy, sxx, syy, sxy))
+    cov = n * sxy - sx * sy
+    var = (n * sxx - sx * sx) * (n * syy - sy * sy)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(var > 0, cov / np.sqrt(np.where(var > 0, var, 1.0)), np.nan)
+
+
+def compute_season_analytics(league_id, season):
+    row = Match.objects.filter(
+        league_id=league_id, season=season, status=Match.Status.FINISHED,
+    ).aggregate(**_aggregates())
+
+    n = row["n"]
+    names = list(CORRELATIONS)
+    sums = [[row[f"{name}__{part}"] or 0.0 for name in names] for part in ("x", "y", "xx", "yy", "xy")]
+    r = pearson_from_sums(n, *sums) if n else np.full(len(names), np.nan)
+
+    def per_match(value):
+        return round((value or 0) / n, 3) if n else None
+
+    def pct(count):
+        return round(100.0 * count / n, 1) if n else None
+
+    return {
+        "season": season,
+        "matches": n,
+        "goals_per_match": per_match(row["goals"]),
+        "home_win_pct": pct(row["home_wins"]),
+        "draw_pct": pct(n - row["home_wins"] - row["away_wins"]),
+        "away_win_pct": pct(row["away_wins"]),
+        "cards_per_match": per_match((row["yellow_cards"] or 0) + (row["red_cards"] or 0)),
+        "yellow_cards_per_match": per_match(row["yellow_cards"]),
+        "red_cards_per_match": per_match(row["red_cards"]),
+        "shots_per_match": per_match(row["shots"]),
+        "corners_per_match": per_match(row["corners"]),
+        "fouls_per_match": per_match(row["fouls"]),
+        "correlations": {
+            name: None if np.isnan(value) else round(float(value), 4) for name, value in zip(names, r)
+        },
+    }
+
+
+def get_season_analytics(league, season):
+    """compute_season_analytics dari cache (key memuat versi data liga)."""
+    league_id = getattr(league, "pk", league)
+    key = f"leagues:season-analytics:{league_id}:{get_data_version(league_id)}:{season}"
+    analytics = cache.get(key)
+    if analytics is None:
+        analytics = compute_season_analytics(league_id, season)
+        cache.set(key, analytics, ANALYTICS_TIMEOUT)
+    return analytics
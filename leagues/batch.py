@@ -0,0 +1,205 @@
+# leagues/batch.py
+"""
+Penulisan Match massal (create + update dalam satu request), mis. satu
+matchday penuh dari panel admin.
+
+Semua item divalidasi lebih dulu; jika ada yang tidak valid tidak ada yang
+ditulis. Validasi dan penulisan berada dalam satu transaksi: match yang
+diupdate dibaca ulang dengan select_for_update, sehingga edit bersamaan
+(admin, batch lain) menunggu dan tidak tertimpa nilai lama. Item valid
+ditulis lewat bulk_create / bulk_update (tanpa signal per match; update
+dikelompokkan per himpunan field yang benar-benar diubah item), lalu data
+turunan dibangun ulang
+sekali per season terdampak (refresh_season) dan rating di-replay sekali
+setelah commit.
+"""
+import copy
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .dashboard import refresh_dashboard_snapshot
+from .deferred import on_commit_once
+from .live import publish_match_change
+from .models import MATCH_STAT_FIELDS, Match, Team
+from .ratings import schedule_replay
+from .seasons import get_latest_season, prune_season, register_season, season_sort_key
+from .services import refresh_head_to_head, refresh_season, team_pair
+from .simulation import invalidate_simulations
+from .versioning import bump_data_version
+
+BATCH_LIMIT = 100
+
+SCORE_FIELDS = ("home_score", "away_score")
+STAT_FIELDS = tuple(f"{side}_{name}" for side in ("home", "away") for name in MATCH_STAT_FIELDS)
+ITEM_FIELDS = {"id", "season", "date", "home_team_id", "away_team_id", "status", "is_finished",
+               *SCORE_FIELDS, *STAT_FIELDS}
+REQUIRED_ON_CREATE = ("home_team_id", "away_team_id", "date")
+
+
+class InvalidItem(ValueError):
+    """Satu item batch tidak valid (pesan dikembalikan per item)."""
+
+
+def _non_negative(name, value, number=int):
+    if isinstance(value, bool):
+        raise InvalidItem(f"{name} harus berupa angka.")
+    try:
+        value = number(value)
+    except (TypeError, ValueError):
+        raise InvalidItem(f"{name} harus berupa angka.")
+    if value < 0:
+        raise InvalidItem(f"{name} tidak boleh negatif.")
+    return value
+
+
+def _apply_item(match, item, teams):
+    """Salin nilai item ke instance Match (belum disimpan); kembalikan nama field yang diisi."""
+    changed = set()
+    for side in ("home", "away"):
+        key = f"{side}_team_id"
+        if key in item:
+            team_id = _non_negative(key, item[key])
+            if team_id not in teams:
+                raise InvalidItem("Tim tidak ditemukan.")
+            setattr(match, key, team_id)
+            changed.add(key)
+    if match.home_team_id == match.away_team_id:
+        raise InvalidItem("Tim kandang dan tandang tidak boleh sama.")
+
+    if "date" in item:
+        date = parse_datetime(str(item["date"]))
+        if date is None:
+            raise InvalidItem("Format tanggal tidak valid.")
+        match.date = timezone.make_aware(date) if timezone.is_naive(date) else date
+        changed.add("date")
+
+    if "season" in item:
+        season = str(item["season"]).strip()
+        if not season or len(season) > Match._meta.get_field("season").max_length:
+            raise InvalidItem("Season tidak valid.")
+        match.season = season
+        changed.add("season")
+
+    if "status" in item:
+        if item["status"] not in Match.Status.values:
+            raise InvalidItem("Status tidak valid.")
+        match.status = item["status"]
+        changed.add("status")
+    elif "is_finished" in item:
+        match.status = Match.Status.FINISHED if item["is_finished"] else Match.Status.SCHEDULED
+        changed.add("status")
+
+    for name in (*SCORE_FIELDS, *STAT_FIELDS):
+        if name in item:
+            number = float if name.endswith("possession") else int
+            setattr(match, name, _non_negative(name, item[name], number))
+            changed.add(name)
+    return changed
+
+
+def validate_match_batch(league, items):
+    """
+    Validasi semua item sekaligus (dua query: match yang diupdate & tim liga).
+    Harus dipanggil di dalam transaksi: match yang diupdate dikunci (urut pk)
+    sampai transaksi selesai.
+    Mengembalikan (plans, errors): plans = list (index, previous|None, match, field),
+    errors = {index: pesan}.
+    """
+    ids = [item.get("id") for item in items if isinstance(item, dict) and item.get("id") is not None]
+    existing = {
+        match.pk: match
+        for match in Match.objects.select_for_update()
+        .filter(league=league, pk__in=[i for i in ids if isinstance(i, int)]).order_by("pk")
+    }
+    teams = set(Team.objects.filter(league=league).values_list("pk", flat=True))
+    default_season = get_latest_season(league)
+
+    plans, errors, seen = [], {}, set()
+    for index, item in enumerate(items):
+        try:
+            if not isinstance(item, dict):
+                raise InvalidItem("Item harus berupa objek.")
+            unknown = sorted(set(item) - ITEM_FIELDS)
+            if unknown:
+                raise InvalidItem(f"Field tidak dikenal: {', '.join(unknown)}")
+
+            match_id = item.get("id")
+            if match_id is None:
+                missing = [name for name in REQUIRED_ON_CREATE if name not in item]
+                if missing:
+                    raise InvalidItem(f"Field wajib: {', '.join(missing)}")
+                previous = None
+                match = Match(league=league, season=default_season or "", status=Match.Status.SCHEDULED)
+            else:
+                if match_id not in existing:
+                    raise InvalidItem("Pertandingan tidak ditemukan.")
+                if match_id in seen:
+                    raise InvalidItem("Pertandingan muncul lebih dari sekali.")
+                seen.add(match_id)
+                previous = existing[match_id]
+                match = copy.copy(previous)
+
+            fields = _apply_item(match, item, teams)
+            if previous is None and not match.season:
+                raise InvalidItem("Season wajib diisi.")
+            plans.append((index, previous, match, fields))
+        except InvalidItem as e:
+            errors[index] = str(e)
+    return plans, errors
+
+
+def _refresh_after_batch(league, touched):
+    """Data turunan untuk semua match lama & baru yang tersentuh batch."""
+    seasons = {m.season for m in touched}
+    for season in sorted(seasons, key=season_sort_key):
+        refresh_season(league, season)
+        register_season(league.pk, season)
+        prune_season(league.pk, season)
+
+    pairs = {team_pair(m.home_team_id, m.away_team_id) for m in touched if m.status == Match.Status.FINISHED}
+    for low, high in sorted(pairs):
+        refresh_head_to_head(low, high)
+
+    schedule_replay(league.pk)
+    invalidate_simulations(league.pk)
+    bump_data_version(league.pk)
+    on_commit_once(("dashboard", league.pk), lambda: refresh_dashboard_snapshot(league.pk))
+
+
+def apply_match_batch(league, items):
+    """
+    Validasi lalu tulis batch. Mengembalikan (ok, results) dengan satu hasil per item:
+    {"index", "status": "created"|"updated"|"error"|"valid", "id"?, "message"?}.
+    """
+    with transaction.atomic():
+        plans, errors = validate_match_batch(league, items)
+        if errors:
+            results = [
+                {"index": i, "status": "error", "message": errors[i]} if i in errors
+                else {"index": i, "status": "valid"}
+                for i in range(len(items))
+            ]
+            return False, results
+
+        creates = [match for _, previous, match, _ in plans if previous is None]
+        updates = defaultdict(list)
+        for _, previous, match, fields in plans:
+            if previous is not None and fields:
+                updates[tuple(sorted(fields))].append(match)
+
+        Match.objects.bulk_create(creates)
+        for fields in sorted(updates):
+            Match.objects.bulk_update(updates[fields], fields)
+        touched = [m for _, previous, match, _ in plans for m in (previous, match) if m is not None]
+        _refresh_after_batch(league, touched)
+        for _, previous, match, _ in plans:
+            publish_match_change(previous, match)
+
+    results = [
+        {"index": index, "status": "created" if previous is None else "updated", "id": match.pk}
+        for index, previous, match, _ in plans
+    ]
+    return True, results
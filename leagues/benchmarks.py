@@ -0,0 +1,87 @@
+# leagues/benchmarks.py
+"""
+Helper bersama untuk management command benchmark (bench_*).
+Semua benchmark berjalan di dalam transaksi yang di-rollback,
+sehingga data di database tidak berubah setelah benchmark selesai.
+"""
+import statistics
+import time
+from contextlib import contextmanager
+from io import StringIO
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import transaction
+
+DEFAULT_CSV = Path(settings.BASE_DIR) / "football_matches.csv"
+BENCH_LEAGUE_NAME = "Benchmark League"
+
+
+class _Rollback(Exception):
+    pass
+
+
+@contextmanager
+def rolled_back():
+    """Jalankan blok di dalam transaksi lalu batalkan semua perubahannya."""
+    try:
+        with transaction.atomic():
+            yield
+            raise _Rollback
+    except _Rollback:
+        pass
+
+
+def timed(fn, *args, **kwargs):
+    """Jalankan fn dan kembalikan (hasil, durasi dalam detik)."""
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def summarize(samples):
+    """Ringkasan latency (ms) dari list durasi dalam detik."""
+    ms = sorted(s * 1000 for s in samples)
+    if not ms:
+        return {"n": 0, "mean": 0.0, "median": 0.0, "p95": 0.0, "max": 0.0}
+    p95 = ms[min(len(ms) - 1, int(round(0.95 * (len(ms) - 1))))]
+    return {
+        "n": len(ms),
+        "mean": statistics.fmean(ms),
+        "median": statistics.median(ms),
+        "p95": p95,
+        "max": ms[-1],
+    }
+
+
+def format_summary(label, samples):
+    s = summarize(samples)
+    return (f"{label:<28} n={s['n']:<5} mean={s['mean']:9.2f}ms "
+            f"median={s['median']:9.2f}ms p95={s['p95']:9.2f}ms max={s['max']:9.2f}ms")
+
+
+def load_dataset(csv_path=DEFAULT_CSV, league_name=BENCH_LEAGUE_NAME):
+    """Import CSV ke liga benchmark (dipanggil di dalam rolled_back())."""
+    from .models import League
+    call_command("import_matches", "--csv", str(csv_path), "--league-name", league_name, stdout=StringIO())
+    return League.objects.get(name=league_name)
+
+
+def scale_dataset(league, factor, start=1, batch_size=2000):
+    """
+    Perbesar data Match liga secara sintetis menjadi `factor` kali lipat data asli:
+    salinan ke-k (start <= k < factor) memakai season "<season>~k" agar klasemen
+    tetap terpisah. Memakai bulk_create sehingga signal Match tidak ikut berjalan.
+    """
+    from .models import Match
+
+    fields = [f.attname for f in Match._meta.concrete_fields if not f.primary_key]
+    base = list(
+        Match.objects.filter(league=league).exclude(season__contains="~").order_by().values(*fields)
+    )
+    for k in range(max(start, 1), factor):
+        Match.objects.bulk_create(
+            [Match(**dict(row, season=f"{row['season']}~{k}")) for row in base],
+            batch_size=batch_size,
+        )
@@ -0,0 +1,150 @@
+# leagues/columnar.py
+"""
+Ekspor kolumnar Match (NumPy .npz) untuk klien analitik.
+
+Satu array bertipe per kolom Match (skor & semua statistik), tanggal sebagai
+datetime64, serta kamus tim (team_ids / team_names) yang diacu kolom
+home_team / away_team lewat indeks. File di-cache di disk dengan nama yang
+memuat versi data liga (versioning.py): selama data tidak berubah, unduhan
+berikutnya hanya mengirim file yang sama (FileResponse) tanpa encode ulang.
+
+Direktori ekspor dipakai bersama semua worker. File versi lama baru dihapus
+setelah tidak dipakai selama STALE_GRACE_SECONDS (mtime disentuh tiap kali
+dipakai), dan pembuka file membangun ulang jika file terhapus di tengah jalan.
+"""
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+
+from .models import MATCH_STAT_FIELDS, Match, Team
+from .seasons import sort_seasons
+from .versioning import get_data_version
+
+ALL_SEASONS = "all"
+
+# dtype per kolom; kolom statistik lain (hitungan) memakai int32
+COLUMN_DTYPES = {
+    "id": np.int64,
+    "home_score": np.int16,
+    "away_score": np.int16,
+    "home_possession": np.float32,
+    "away_possession": np.float32,
+}
+STAT_COLUMNS = ("home_score", "away_score", *(f"{side}_{name}" for side in ("home", "away")
+                                              for name in MATCH_STAT_FIELDS))
+STATUS_LABELS = tuple(Match.Status.values)
+
+# file versi lama yang masih dipakai worker lain tidak dihapus selama interval ini
+STALE_GRACE_SECONDS = 10 * 60
+OPEN_ATTEMPTS = 3
+
+
+def export_dir():
+    return Path(getattr(settings, "LEAGUES_EXPORT_DIR", Path(tempfile.gettempdir()) / "leagues-exports"))
+
+
+def _slug(season):
+    return (season or ALL_SEASONS).replace("/", "-").replace(os.sep, "-")
+
+
+def export_path(league_id, season=None):
+    """Path file cache untuk (liga, season) pada versi data liga saat ini."""
+    return export_dir() / f"league-{league_id}" / f"{_slug(season)}.{get_data_version(league_id)}.npz"
+
+
+def build_season_arrays(league_id, season=None):
+    """Dict nama -> ndarray untuk satu season (atau semua season jika None)."""
+    qs = Match.objects.filter(league_id=league_id)
+    if season:
+        qs = qs.filter(season=season)
+    columns = ("id", "date", "season", "status", "home_team_id", "away_team_id", *STAT_COLUMNS)
+    rows = list(qs.order_by("date", "id").values_list(*columns))
+    data = dict(zip(columns, zip(*rows))) if rows else {name: () for name in columns}
+
+    teams = list(Team.objects.filter(league_id=league_id).order_by("pk").values_list("pk", "name"))
+    team_index = {pk: i for i, (pk, _) in enumerate(teams)}
+    seasons = sort_seasons(data["season"])
+    season_index = {name: i for i, name in enumerate(seasons)}
+    status_index = {label: i for i, label in enumerate(STATUS_LABELS)}
+
+    arrays = {
+        "id": np.array(data["id"], dtype=np.int64),
+        "date": np.array([d.replace(tzinfo=None) for d in data["date"]], dtype="datetime64[s]"),  # UTC
+        "season": np.array([season_index[s] for s in data["season"]], dtype=np.int16),
+        "status": np.array([status_index[s] for s in data["status"]], dtype=np.int8),
+        "home_team": np.array([team_index[t] for t in data["home_team_id"]], dtype=np.int32),
+        "away_team": np.array([team_index[t] for t in data["away_team_id"]], dtype=np.int32),
+        # kamus untuk kolom berkode di atas
+        "seasons": np.array(seasons, dtype=str),
+        "status_labels": np.array(STATUS_LABELS, dtype=str),
+        "team_ids": np.array([pk for pk, _ in teams], dtype=np.int64),
+        "team_names": np.array([name for _, name in teams], dtype=str),
+    }
+    for name in STAT_COLUMNS:
+        arrays[name] = np.array(data[name], dtype=COLUMN_DTYPES.get(name, np.int32))
+    return arrays
+
+
+def touch_if_exists(path):
+    """Tandai file masih dipakai (mtime = sekarang); False jika file sudah tidak ada."""
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def prune_stale_files(directory, pattern, keep):
+    """Hapus file `pattern` selain `keep` yang tidak dipakai lebih lama dari STALE_GRACE_SECONDS."""
+    cutoff = time.time() - STALE_GRACE_SECONDS
+    for stale in directory.glob(pattern):
+        if stale in keep:
+            continue
+        try:
+            if stale.stat().st_mtime < cutoff:
+                stale.unlink()
+        except FileNotFoundError:
+            pass  # sudah dihapus worker lain
+
+
+def get_columnar_export(league_id, season=None):
+    """
+    Path file .npz (liga, season) untuk versi data terkini; dibangun sekali jika
+    belum ada. Ditulis ke file sementara lalu di-rename (atomik), versi lama yang
+    sudah lewat masa tenggang dihapus.
+    """
+    path = export_path(league_id, season)
+    if touch_if_exists(path):
+        return path
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            # tanpa kompresi: anggota .npy bisa dibaca langsung (np.load / mmap setelah unzip)
+            np.savez(f, **build_season_arrays(league_id, season))
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+    prune_stale_files(path.parent, f"{_slug(season)}.*.npz", keep={path})
+    return path
+
+
+def open_columnar_export(league_id, season=None):
+    """
+    File .npz terbuka (mode biner) untuk versi terkini. Jika file terhapus
+    antara pengecekan dan open (worker lain), path dihitung & dibangun ulang.
+    """
+    for attempt in range(OPEN_ATTEMPTS):
+        path = get_columnar_export(league_id, season)
+        try:
+            return open(path, "rb")
+        except FileNotFoundError:
+            if attempt == OPEN_ATTEMPTS - 1:
+                raise
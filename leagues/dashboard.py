@@ -0,0 +1,157 @@
+# leagues/dashboard.py
+"""
+Snapshot dashboard liga di cache Django: season terbaru, klasemennya,
+5 match selesai terakhir dan 5 match akan datang.
+
+Key snapshot memuat versi data liga (versioning.py, kolom DB yang dibagi semua
+worker), jadi setiap penulisan Match/Team/Standing langsung membuat snapshot
+lama tidak terpakai di worker mana pun; signal lalu membangun ulang snapshot
+setelah commit (write-through) di cache worker penulis.
+
+Miss yang bersamaan menunggu satu pembangun (lock lewat cache.add) alih-alih
+ikut query. Lock dan snapshot hanya seluas backend cache: dengan LocMemCache
+(default) itu per proses, sehingga tiap worker gunicorn membangun snapshotnya
+sendiri; satu pembangun lintas worker hanya berlaku bila CACHES diarahkan ke
+cache bersama (Redis/Memcached).
+
+Statistik hit/miss disimpan di DB (DashboardCacheStats) agar command
+dashboard_cache_stats melihat angka semua worker. Tiap proses menampung
+counter di memori dan menambahkannya (F() + n) setiap STATS_FLUSH_EVERY hit/miss
+atau STATS_FLUSH_SECONDS detik, jadi request dashboard tidak menulis DB setiap kali;
+counter yang belum di-flush saat proses berhenti hilang.
+"""
+import threading
+import time
+
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+
+from .models import DashboardCacheStats, League, Match, Standing
+from .seasons import get_latest_season
+from .versioning import get_data_version
+
+SNAPSHOT_TIMEOUT = 60 * 60 * 24
+LOCK_TIMEOUT = 10
+WAIT_INTERVAL = 0.05
+RECENT_LIMIT = 5
+
+STATS_FLUSH_EVERY = 100
+STATS_FLUSH_SECONDS = 10
+
+_stats_lock = threading.Lock()
+_pending_stats = {"hits": 0, "misses": 0}
+_last_flush = time.monotonic()
+
+
+def _snapshot_key(league_id):
+    return f"leagues:dashboard:{league_id}:{get_data_version(league_id)}"
+
+
+def build_dashboard_snapshot(league_id):
+    latest_season = get_latest_season(league_id)
+
+    standings = []
+    if latest_season:
+        standings = list(
+            Standing.objects.filter(league_id=league_id, season=latest_season).select_related("team")
+        )
+
+    finished_recent = list(
+        Match.objects.filter(league_id=league_id, status=Match.Status.FINISHED)
+        .select_related("home_team", "away_team")
+        .order_by("-date")[:RECENT_LIMIT]
+    )
+
+    upcoming = list(
+        Match.objects.filter(league_id=league_id, date__gt=timezone.now())
+        .select_related("home_team", "away_team")
+        .order_by("date")[:RECENT_LIMIT]
+    )
+
+    return {
+        "latest_season": latest_season,
+        "standings": standings,
+        "finished_recent": finished_recent,
+        "upcoming": upcoming,
+        # daftar "akan datang" basi begitu match pertamanya dimulai
+        "valid_until": upcoming[0].date if upcoming else None,
+    }
+
+
+def _is_fresh(snapshot):
+    return snapshot is not None and (snapshot["valid_until"] is None or timezone.now() < snapshot["valid_until"])
+
+
+def _count(field):
+    with _stats_lock:
+        _pending_stats[field] += 1
+        due = (sum(_pending_stats.values()) >= STATS_FLUSH_EVERY
+               or time.monotonic() - _last_flush >= STATS_FLUSH_SECONDS)
+    if due:
+        flush_dashboard_cache_stats()
+
+
+def get_dashboard_snapshot(league):
+    """Snapshot dashboard dari cache; jika miss, dibangun sekali lalu disimpan."""
+    league_id = getattr(league, "pk", league)
+    key = _snapshot_key(league_id)
+    snapshot = cache.get(key)
+    if _is_fresh(snapshot):
+        _count("hits")
+        return snapshot
+    _count("misses")
+
+    lock_key = f"{key}:lock"
+    if cache.add(lock_key, 1, LOCK_TIMEOUT):
+        try:
+            snapshot = build_dashboard_snapshot(league_id)
+            cache.set(key, snapshot, SNAPSHOT_TIMEOUT)
+        finally:
+            cache.delete(lock_key)
+        return snapshot
+
+    # request lain sedang membangun snapshot yang sama -> tunggu hasilnya
+    deadline = time.monotonic() + LOCK_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(WAIT_INTERVAL)
+        snapshot = cache.get(key)
+        if _is_fresh(snapshot):
+            return snapshot
+    return build_dashboard_snapshot(league_id)
+
+
+def refresh_dashboard_snapshot(league_id):
+    """Bangun ulang snapshot untuk versi data terkini (dipanggil setelah commit penulisan)."""
+    if League.objects.filter(pk=league_id).exists():
+        cache.set(_snapshot_key(league_id), build_dashboard_snapshot(league_id), SNAPSHOT_TIMEOUT)
+
+
+def flush_dashboard_cache_stats():
+    """Tambahkan counter proses ini ke baris DashboardCacheStats bersama."""
+    global _last_flush
+    with _stats_lock:
+        hits, misses = _pending_stats["hits"], _pending_stats["misses"]
+        _pending_stats.update(hits=0, misses=0)
+        _last_flush = time.monotonic()
+    if not (hits or misses):
+        return
+    stats = DashboardCacheStats.objects.filter(pk=1)
+    if not stats.update(hits=F("hits") + hits, misses=F("misses") + misses):
+        DashboardCacheStats.objects.get_or_create(pk=1)
+        stats.update(hits=F("hits") + hits, misses=F("misses") + misses)
+
+
+def dashboard_cache_stats():
+    flush_dashboard_cache_stats()
+    hits, misses = DashboardCacheStats.objects.filter(pk=1).values_list("hits", "misses").first() or (0, 0)
+    total = hits + misses
+    return {"hits": hits, "misses": misses, "hit_ratio": round(hits / total, 4) if total else None}
+
+
+def reset_dashboard_cache_stats():
+    global _last_flush
+    with _stats_lock:
+        _pending_stats.update(hits=0, misses=0)
+        _last_flush = time.monotonic()
+    DashboardCacheStats.objects.filter(pk=1).update(hits=0, misses=0)
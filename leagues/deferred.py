@@ -0,0 +1,26 @@
+# leagues/deferred.py
+"""
+Pekerjaan turunan yang mahal (replay rating, snapshot dashboard) dijalankan
+setelah transaksi commit, paling banyak sekali per kunci per transaksi
+(mis. hapus liga meng-cascade ribuan match dalam satu transaksi).
+"""
+from django.db import connection, transaction
+
+
+class _OnceCallback:
+    def __init__(self, key, func):
+        self.key = key
+        self.func = func
+        self.done = False
+
+    def __call__(self):
+        self.done = True
+        self.func()
+
+
+def on_commit_once(key, func):
+    """Seperti transaction.on_commit, tetapi diabaikan jika `key` masih menunggu commit."""
+    for _, callback, *_ in connection.run_on_commit:
+        if isinstance(callback, _OnceCallback) and callback.key == key and not callback.done:
+            return
+    transaction.on_commit(_OnceCallback(key, func))
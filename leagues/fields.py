@@ -0,0 +1,79 @@
+# leagues/fields.py
+"""
+Sparse fieldset (?fields=a,b,c) untuk API match.
+
+Tiap field output dipetakan ke kolom DB yang dibutuhkan, sehingga view cukup
+memanggil .values(*kolom) dan tidak pernah memuat kolom statistik yang tidak
+diminta. Field di luar whitelist endpoint ditolak (InvalidFields -> 400).
+"""
+from collections import namedtuple
+
+from .models import MATCH_STAT_FIELDS, Match
+
+FieldSpec = namedtuple("FieldSpec", ["columns", "getter"])
+
+
+class InvalidFields(ValueError):
+    """Parameter fields berisi nama di luar whitelist endpoint."""
+
+
+def _column(column):
+    return FieldSpec((column,), lambda row: row[column])
+
+
+MATCH_FIELDS = {
+    "id": _column("id"),
+    "season": _column("season"),
+    "status": _column("status"),
+    "is_finished": FieldSpec(("status",), lambda row: row["status"] == Match.Status.FINISHED),
+    "date": FieldSpec(("date",), lambda row: row["date"].isoformat()),
+    "home_team": _column("home_team__name"),
+    "home_team_id": _column("home_team_id"),
+    "away_team": _column("away_team__name"),
+    "away_team_id": _column("away_team_id"),
+    "home_score": _column("home_score"),
+    "away_score": _column("away_score"),
+    **{f"{side}_{name}": _column(f"{side}_{name}") for side in ("home", "away") for name in MATCH_STAT_FIELDS},
+    # nama lama di match_detail_flutter
+    "home_fouls": _column("home_fouls_conceded"),
+    "away_fouls": _column("away_fouls_conceded"),
+}
+
+# default matches_flutter: ringkas, tanpa kolom statistik
+MATCH_LIST_FIELDS = (
+    "id", "home_team", "home_team_id", "away_team", "away_team_id",
+    "home_score", "away_score", "date", "status", "is_finished", "season",
+)
+
+# default match_detail_flutter (bentuk respons lama)
+MATCH_DETAIL_FIELDS = (
+    "id", "home_team", "away_team", "home_score", "away_score", "date", "status", "season", "is_finished",
+    *(f"home_{name}" for name in ("shots", "shots_on_target", "possession", "passes", "corners", "offsides")),
+    "home_fouls", "home_yellow_cards", "home_red_cards",
+    *(f"away_{name}" for name in ("shots", "shots_on_target", "possession", "passes", "corners", "offsides")),
+    "away_fouls", "away_yellow_cards", "away_red_cards",
+)
+
+
+def parse_fields(value, default, specs=MATCH_FIELDS):
+    """Nama field dari ?fields=...; "id" selalu disertakan. Kosong -> default."""
+    if not value:
+        return tuple(default)
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = [name for name in names if name not in specs]
+    if unknown:
+        raise InvalidFields(f"Field tidak dikenal: {', '.join(unknown)}")
+    return tuple(dict.fromkeys(["id", *names]))
+
+
+def columns_for(names, specs=MATCH_FIELDS, extra=()):
+    """Kolom untuk .values(): gabungan kolom semua field (urut, tanpa duplikat)."""
+    columns = dict.fromkeys(extra)
+    for name in names:
+        columns.update(dict.fromkeys(specs[name].columns))
+    return tuple(columns)
+
+
+def project(row, names, specs=MATCH_FIELDS):
+    """Bentuk dict output dari satu baris .values()."""
+    return {name: specs[name].getter(row) for name in names}
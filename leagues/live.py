@@ -0,0 +1,205 @@
+# leagues/live.py
+"""
+Hub publish/subscribe untuk perubahan skor & status match LIVE (dipakai SSE).
+
+Penulisan Match mem-publish event setelah transaksi commit; endpoint SSE
+(async, lewat ASGI) berlangganan per liga atau per match. Backend dipilih
+lewat settings.LEAGUES_LIVE_BROKER:
+- LocalBroker (default): antrean asyncio in-process, hanya untuk satu worker.
+- CacheBroker: log event di cache Django (mis. Redis) yang di-poll subscriber,
+  sehingga event dari worker mana pun sampai ke semua worker.
+"""
+import asyncio
+import threading
+import time
+from functools import lru_cache
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+from .models import Match
+
+DEFAULT_BROKER = "leagues.live.LocalBroker"
+QUEUE_SIZE = 100
+
+
+def match_event(match):
+    """Payload event untuk satu match (instance atau dict .values())."""
+    get = match.get if isinstance(match, dict) else lambda name: getattr(match, name)
+    return {
+        "match_id": get("id"),
+        "league_id": get("league_id"),
+        "season": get("season"),
+        "status": get("status"),
+        "home_team_id": get("home_team_id"),
+        "away_team_id": get("away_team_id"),
+        "home_score": get("home_score"),
+        "away_score": get("away_score"),
+    }
+
+
+def _matches(event, league_id, match_id):
+    return event["league_id"] == league_id and (match_id is None or event["match_id"] == match_id)
+
+
+class _QueueSubscription:
+    def __init__(self, broker, league_id, match_id):
+        self.broker = broker
+        self.league_id = league_id
+        self.match_id = match_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+
+    def push(self, event):
+        # dipanggil dari thread mana pun (signal berjalan di thread sync)
+        if _matches(event, self.league_id, self.match_id):
+            self.loop.call_soon_threadsafe(self._put, event)
+
+    def _put(self, event):
+        if self.queue.full():
+            self.queue.get_nowait()  # client lambat: event tertua dibuang
+        self.queue.put_nowait(event)
+
+    async def next_events(self, timeout):
+        """Event baru (list); list kosong jika tidak ada event sampai timeout."""
+        try:
+            events = [await asyncio.wait_for(self.queue.get(), timeout)]
+        except asyncio.TimeoutError:
+            return []
+        while not self.queue.empty():
+            events.append(self.queue.get_nowait())
+        return events
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class LocalBroker:
+    """Broker in-process: setiap subscriber punya asyncio.Queue sendiri."""
+
+    def __init__(self):
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def publish(self, event):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            try:
+                subscription.push(event)
+            except RuntimeError:
+                # event loop subscriber sudah ditutup tanpa close(): buang, jangan gagalkan publisher
+                self.unsubscribe(subscription)
+
+    def subscribe(self, league_id, match_id=None):
+        """Harus dipanggil dari dalam event loop (view async)."""
+        subscription = _QueueSubscription(self, league_id, match_id)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+
+class _CacheSubscription:
+    def __init__(self, broker, league_id, match_id):
+        self.broker = broker
+        self.league_id = league_id
+        self.match_id = match_id
+        self.last_seq = broker.current_seq()
+        self.missing_since = None
+
+    def _poll(self):
+        current = self.broker.current_seq()
+        if current <= self.last_seq:
+            return []
+        seqs = range(self.last_seq + 1, current + 1)
+        found = cache.get_many([self.broker.event_key(seq) for seq in seqs])
+        events = []
+        for seq in seqs:
+            event = found.get(self.broker.event_key(seq))
+            if event is None:
+                # nomor urut sudah dinaikkan tapi event belum ditulis publisher: ulangi di poll
+                # berikutnya; baru dilewati jika tidak muncul juga (publisher gagal / kedaluwarsa)
+                now = time.monotonic()
+                if self.missing_since is None:
+                    self.missing_since = now
+                if now - self.missing_since < self.broker.missing_grace:
+                    break
+            self.missing_since = None
+            self.last_seq = seq
+            if event is not None and _matches(event, self.league_id, self.match_id):
+                events.append(event)
+        return events
+
+    async def next_events(self, timeout):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            events = await sync_to_async(self._poll, thread_sensitive=False)()
+            if events or loop.time() >= deadline:
+                return events
+            await asyncio.sleep(min(self.broker.poll_interval, max(0.0, deadline - loop.time())))
+
+    def close(self):
+        pass
+
+
+class CacheBroker:
+    """
+    Broker lintas worker lewat cache Django bersama: event disimpan dengan nomor
+    urut global (cache.incr) dan subscriber mem-poll nomor urut terbaru.
+    """
+    SEQ_KEY = "leagues:live:seq"
+    EVENT_TTL = 60
+    poll_interval = 0.5
+    missing_grace = 5.0
+
+    def event_key(self, seq):
+        return f"leagues:live:event:{seq}"
+
+    def current_seq(self):
+        return cache.get(self.SEQ_KEY, 0)
+
+    def publish(self, event):
+        if cache.add(self.SEQ_KEY, 1, None):
+            seq = 1
+        else:
+            seq = cache.incr(self.SEQ_KEY)
+        cache.set(self.event_key(seq), event, self.EVENT_TTL)
+
+    def subscribe(self, league_id, match_id=None):
+        return _CacheSubscription(self, league_id, match_id)
+
+
+@lru_cache(maxsize=None)
+def _load_broker(path):
+    return import_string(path)()
+
+
+def get_broker():
+    return _load_broker(getattr(settings, "LEAGUES_LIVE_BROKER", DEFAULT_BROKER))
+
+
+def _live_key(match):
+    return (match.status, match.home_score, match.away_score)
+
+
+def publish_match_change(previous, current):
+    """
+    Publish perubahan skor/status match yang sedang atau baru saja LIVE,
+    setelah transaksi commit (client tidak pernah melihat data yang di-rollback).
+    """
+    if current is None:
+        return
+    if previous is not None and _live_key(previous) == _live_key(current):
+        return
+    if current.status != Match.Status.LIVE and (previous is None or previous.status != Match.Status.LIVE):
+        return
+    event = match_event(current)
+    transaction.on_commit(lambda: get_broker().publish(event))
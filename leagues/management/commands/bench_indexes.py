@@ -0,0 +1,93 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+from leagues.benchmarks import DEFAULT_CSV, format_summary, load_dataset, rolled_back, scale_dataset, timed
+from leagues.models import Match, Standing
+from leagues.seasons import get_latest_season
+from leagues.services import recompute_standings_for_league
+
+# indeks komposit dari migrasi 0009 (yang di-drop untuk pengukuran "before")
+HOT_INDEXES = {
+    Match: ("match_league_status_date", "match_league_season_home", "match_league_season_away"),
+    Standing: ("standing_table_order",),
+}
+
+
+def hot_queries(league, season, team_id):
+    """(label, queryset) untuk pola query yang paling sering dijalankan view & signal."""
+    matches = Match.objects.filter(league=league)
+    return [
+        ("finished recent", matches.filter(status=Match.Status.FINISHED).order_by("-date")[:5]),
+        ("upcoming", matches.filter(date__gt=timezone.now()).order_by("date")[:5]),
+        ("team season (form)", matches.filter(season=season, status=Match.Status.FINISHED)
+            .filter(Q(home_team_id=team_id) | Q(away_team_id=team_id)).order_by("-date", "-id")[:5]),
+        ("season exists", matches.filter(season=season).order_by()[:1]),
+        ("standings table", Standing.objects.filter(league=league, season=season)
+            .order_by("-points", "-gd", "-gf")),
+    ]
+
+
+def _indexes(model):
+    names = HOT_INDEXES[model]
+    return [index for index in model._meta.indexes if index.name in names]
+
+
+def _execute(statements):
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(str(sql))
+
+
+def drop_hot_indexes():
+    # SQL langsung (bukan `with schema_editor()`) agar bisa dijalankan di dalam transaksi SQLite
+    _execute(f"DROP INDEX {connection.ops.quote_name(index.name)}"
+             for model in HOT_INDEXES for index in _indexes(model))
+
+
+def create_hot_indexes():
+    editor = connection.schema_editor()
+    _execute(index.create_sql(model, editor) for model in HOT_INDEXES for index in _indexes(model))
+
+
+class Command(BaseCommand):
+    help = ("Benchmark indeks query panas: EXPLAIN + latency tanpa (before) dan dengan (after) "
+            "indeks komposit, di atas dataset yang diperbesar (data di-rollback).")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--csv", default=str(DEFAULT_CSV), help="Path ke football_matches.csv")
+        parser.add_argument("--scale", type=int, default=5, help="Perbesar data Match N kali lipat")
+        parser.add_argument("--repeat", type=int, default=50, help="Jumlah eksekusi per query")
+        parser.add_argument("--no-explain", action="store_true", help="Jangan cetak query plan")
+
+    def _measure(self, label, queries, repeat, explain):
+        _execute(["ANALYZE"])  # statistik planner terbaru untuk set indeks saat ini
+        self.stdout.write(self.style.MIGRATE_HEADING(f"== {label} =="))
+        for name, qs in queries:
+            if explain:
+                self.stdout.write(f"-- {name}\n{qs.explain()}")
+            samples = [timed(lambda: list(qs.all()))[1] for _ in range(repeat)]
+            self.stdout.write(format_summary(f"{label}: {name}", samples))
+
+    def handle(self, *args, **opts):
+        if opts["scale"] < 1 or opts["repeat"] < 1:
+            raise CommandError("--scale dan --repeat minimal 1.")
+
+        with rolled_back():
+            league = load_dataset(opts["csv"])
+            if opts["scale"] > 1:
+                scale_dataset(league, opts["scale"])
+                recompute_standings_for_league(league)
+
+            season = get_latest_season(league)
+            team_id = Match.objects.filter(league=league, season=season).values_list("home_team_id", flat=True).first()
+            if team_id is None:
+                raise CommandError("Dataset tidak berisi match.")
+            self.stdout.write(f"Backend: {connection.vendor}, "
+                              f"{Match.objects.filter(league=league).count()} match, season {season}")
+
+            queries = hot_queries(league, season, team_id)
+            drop_hot_indexes()
+            self._measure("before", queries, opts["repeat"], not opts["no_explain"])
+            create_hot_indexes()
+            self._measure("after", queries, opts["repeat"], not opts["no_explain"])
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+from leagues.benchmarks import DEFAULT_CSV, format_summary, load_dataset, rolled_back, timed
+from leagues.models import Match, TeamRating
+from leagues.ratings import rebuild_ratings_for_league
+
+
+class Command(BaseCommand):
+    help = "Benchmark rating Elo: replay penuh vs update inkremental per match baru (data di-rollback)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--csv", default=str(DEFAULT_CSV), help="Path ke football_matches.csv")
+        parser.add_argument("--replays", type=int, default=5, help="Jumlah replay penuh yang diukur")
+        parser.add_argument("--updates", type=int, default=50, help="Jumlah match terakhir yang diselesaikan ulang")
+
+    def handle(self, *args, **opts):
+        with rolled_back():
+            league = load_dataset(opts["csv"])
+            finished = Match.objects.filter(league=league, status=Match.Status.FINISHED)
+            n = finished.count()
+            if not n:
+                raise CommandError("Dataset tidak berisi match FINISHED.")
+            self.stdout.write(f"Dataset: {n} match FINISHED")
+
+            replay = []
+            for _ in range(opts["replays"]):
+                _, elapsed = timed(rebuild_ratings_for_league, league.pk)
+                replay.append(elapsed)
+            expected = dict(TeamRating.objects.filter(league=league).values_list("team_id", "rating"))
+
+            # match terakhir dibuka lagi (tanpa signal), lalu diselesaikan satu per satu lewat save()
+            latest = list(finished.order_by("-date", "-id")[:opts["updates"]])
+            Match.objects.filter(pk__in=[m.pk for m in latest]).update(status=Match.Status.SCHEDULED)
+            rebuild_ratings_for_league(league.pk)
+
+            incremental = []
+            for m in reversed(latest):
+                m.status = Match.Status.FINISHED
+                _, elapsed = timed(m.save)  # signal -> apply_match_rating
+                incremental.append(elapsed)
+            actual = dict(TeamRating.objects.filter(league=league).values_list("team_id", "rating"))
+
+        self.stdout.write(format_summary("full replay", replay))
+        self.stdout.write(format_summary("incremental (save+elo)", incremental))
+        drift = max((abs(expected[t] - actual.get(t, 0)) for t in expected), default=0.0)
+        if drift > 1e-6:
+            self.stdout.write(self.style.ERROR(f"Verifikasi gagal: selisih rating maks {drift:.6f}."))
+        else:
+            self.stdout.write(self.style.SUCCESS("Verifikasi: rating inkremental == replay penuh."))
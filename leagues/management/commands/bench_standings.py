@@ -0,0 +1,48 @@
+import random
+from django.core.management.base import BaseCommand, CommandError
+from leagues.benchmarks import DEFAULT_CSV, format_summary, load_dataset, rolled_back, timed
+from leagues.models import Match
+from leagues.services import recompute_standings_for_league, verify_standings_for_league
+
+
+class Command(BaseCommand):
+    help = "Benchmark latency per edit: update klasemen inkremental vs rebuild penuh (data di-rollback)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--csv", default=str(DEFAULT_CSV), help="Path ke football_matches.csv")
+        parser.add_argument("--edits", type=int, default=50, help="Jumlah edit skor yang diukur")
+        parser.add_argument("--rebuilds", type=int, default=5, help="Jumlah rebuild penuh yang diukur")
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **opts):
+        rng = random.Random(opts["seed"])
+
+        with rolled_back():
+            league = load_dataset(opts["csv"])
+            match_ids = list(
+                Match.objects.filter(league=league, status=Match.Status.FINISHED).values_list("pk", flat=True)
+            )
+            if not match_ids:
+                raise CommandError("Dataset tidak berisi match FINISHED.")
+            self.stdout.write(f"Dataset: {len(match_ids)} match FINISHED")
+
+            incremental = []
+            for pk in rng.sample(match_ids, min(opts["edits"], len(match_ids))):
+                m = Match.objects.get(pk=pk)
+                m.home_score = (m.home_score + 1) % 6
+                _, elapsed = timed(m.save)  # signal -> apply_standings_delta
+                incremental.append(elapsed)
+
+            mismatches = verify_standings_for_league(league)
+
+            rebuild = []
+            for _ in range(opts["rebuilds"]):
+                _, elapsed = timed(recompute_standings_for_league, league)
+                rebuild.append(elapsed)
+
+        self.stdout.write(format_summary("incremental (save+delta)", incremental))
+        self.stdout.write(format_summary("full rebuild", rebuild))
+        if mismatches:
+            self.stdout.write(self.style.ERROR(f"Verifikasi gagal: {len(mismatches)} baris berbeda."))
+        else:
+            self.stdout.write(self.style.SUCCESS("Verifikasi: klasemen inkremental == rebuild penuh."))
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+from leagues.benchmarks import DEFAULT_CSV, format_summary, load_dataset, rolled_back, scale_dataset, timed
+from leagues.models import Match
+from leagues.services import STANDINGS_ENGINES
+
+
+class Command(BaseCommand):
+    help = "Benchmark engine hitung klasemen (python vs numpy) pada data 1x/10x/100x (data di-rollback)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--csv", default=str(DEFAULT_CSV), help="Path ke football_matches.csv")
+        parser.add_argument("--scales", default="1,10,100", help="Daftar faktor skala, dipisah koma")
+        parser.add_argument("--repeat", type=int, default=3, help="Jumlah pengulangan per engine per skala")
+
+    def handle(self, *args, **opts):
+        try:
+            scales = sorted({int(x) for x in opts["scales"].split(",") if x.strip()})
+        except ValueError:
+            raise CommandError("--scales harus berupa daftar angka, mis. 1,10,100")
+
+        with rolled_back():
+            league = load_dataset(opts["csv"])
+            current = 1
+            for factor in scales:
+                # tambah salinan secara bertahap: 1x -> 10x -> 100x
+                scale_dataset(league, factor, start=current)
+                current = max(current, factor)
+                n = Match.objects.filter(league=league, status=Match.Status.FINISHED).count()
+                self.stdout.write(self.style.MIGRATE_HEADING(f"Skala {factor}x ({n} match FINISHED)"))
+
+                tables = {}
+                for name, engine in STANDINGS_ENGINES.items():
+                    samples = []
+                    for _ in range(opts["repeat"]):
+                        tables[name], elapsed = timed(engine, league)
+                        samples.append(elapsed)
+                    self.stdout.write("  " + format_summary(name, samples))
+
+                results = [{k: dict(v) for k, v in t.items()} for t in tables.values()]
+                if any(r != results[0] for r in results[1:]):
+                    raise CommandError(f"Hasil engine berbeda pada skala {factor}x.")
+
+        self.stdout.write(self.style.SUCCESS("Semua engine menghasilkan klasemen yang sama."))
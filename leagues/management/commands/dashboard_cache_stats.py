@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from leagues.dashboard import dashboard_cache_stats, reset_dashboard_cache_stats
+
+
+class Command(BaseCommand):
+    help = "Tampilkan hit/miss cache snapshot dashboard liga (gabungan semua worker)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reset", action="store_true", help="Nolkan counter setelah ditampilkan")
+
+    def handle(self, *args, **opts):
+        stats = dashboard_cache_stats()
+        ratio = "-" if stats["hit_ratio"] is None else f"{stats['hit_ratio']:.2%}"
+        self.stdout.write(f"hits={stats['hits']} misses={stats['misses']} hit_ratio={ratio}")
+        if opts["reset"]:
+            reset_dashboard_cache_stats()
+            self.stdout.write(self.style.SUCCESS("Counter direset."))
@@ -0,0 +1,39 @@
+import shutil
+
+from django.core.management.base import BaseCommand, CommandError
+from leagues.columnar import get_columnar_export
+from leagues.models import League
+from leagues.seasons import get_seasons
+
+
+class Command(BaseCommand):
+    help = "Tulis ekspor kolumnar Match (.npz) satu season atau semua season (di-cache per versi data)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--league-name", default=None, help="Nama liga; default liga pertama")
+        parser.add_argument("--season", default=None, help="Label season; default semua season dalam satu file")
+        parser.add_argument("--per-season", action="store_true", help="Satu file per season (ditambah file semua season)")
+        parser.add_argument("--output", default=None, help="Salin hasil ke path ini (hanya untuk satu file)")
+
+    def handle(self, *args, **opts):
+        leagues = League.objects.order_by("pk")
+        league = leagues.filter(name=opts["league_name"]).first() if opts["league_name"] else leagues.first()
+        if league is None:
+            raise CommandError(f"Liga tidak ditemukan: {opts['league_name'] or '-'}")
+
+        seasons = get_seasons(league)
+        if opts["season"] and opts["season"] not in seasons:
+            raise CommandError(f"Season tidak ditemukan: {opts['season']}")
+        if opts["per_season"] and opts["output"]:
+            raise CommandError("--output tidak bisa dipakai bersama --per-season.")
+
+        targets = [opts["season"]]
+        if opts["per_season"]:
+            targets = [None, *seasons]
+
+        for season in targets:
+            path = get_columnar_export(league.pk, season)
+            if opts["output"]:
+                shutil.copyfile(path, opts["output"])
+                path = opts["output"]
+            self.stdout.write(self.style.SUCCESS(f"{league.name} [{season or 'semua season'}]: {path}"))
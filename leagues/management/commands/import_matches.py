@@ -1,9 +1,18 @@
 import csv
+import glob
+import os
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import datetime
+from itertools import islice
+import django
 from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
 from django.utils import timezone
 from leagues.models import League, Team, Match
-from leagues.services import recompute_standings_for_league
+from leagues.services import STANDINGS_ENGINES, recompute_standings_for_league, suspend_incremental_sync
 
 CSV_TO_MATCH_FIELDS = {
     "season": "season",
@@ -39,80 +48,131 @@ CSV_TO_MATCH_FIELDS = {
     "away_yellow_cards": "away_yellow_cards",
 }
 
+try:
+    import resource
+except ImportError:  # Windows: tidak ada modul resource, pakai tracemalloc
+    resource = None
+
+REQUIRED_COLUMNS = {"season","date","home_team","away_team","goal_home_ft","goal_away_ft"}
+
+
+def parse_row(row):
+    """
+    Ubah satu baris CSV menjadi (home_name, away_name, payload field Match).
+    Mengembalikan None jika nama tim kosong.
+    """
+    home_name = row["home_team"].strip()
+    away_name = row["away_team"].strip()
+    if not home_name or not away_name:
+        return None
+
+    # parse date (naive), Django akan convert ke UTC karena USE_TZ=True
+    date_str = row["date"].strip()
+    dt = datetime.strptime(date_str, "%Y-%m-%d")
+
+    payload = {
+        "season": row["season"].strip(),
+        "date": dt,
+        "status": Match.Status.FINISHED,
+    }
+
+    for csv_key, model_field in CSV_TO_MATCH_FIELDS.items():
+        if csv_key in ("season","date"):
+            continue
+
+        val = (row.get(csv_key) or "").strip()
+        if val == "":
+            if model_field in ("home_possession","away_possession"):
+                payload[model_field] = 0.0
+            else:
+                payload[model_field] = 0
+        else:
+            if model_field in ("home_possession","away_possession"):
+                payload[model_field] = float(val)
+            else:
+                payload[model_field] = int(val)
+
+    return home_name, away_name, payload
+
+
+def parse_file(path):
+    """
+    Parse & validasi satu file CSV (dijalankan di process pool, tanpa akses DB).
+    Mengembalikan (list hasil parse_row, durasi detik). ValueError jika file tidak valid.
+    """
+    started = time.perf_counter()
+    with open(path, "r", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        missing = REQUIRED_COLUMNS - set(reader.fieldnames or [])
+        if missing:
+            raise ValueError(f"CSV missing required columns: {missing}")
+
+        parsed = []
+        for line_no, row in enumerate(reader, start=2):
+            try:
+                item = parse_row(row)
+            except (KeyError, TypeError, ValueError) as e:
+                raise ValueError(f"baris {line_no}: {e}")
+            if item is not None:
+                parsed.append(item)
+    return parsed, time.perf_counter() - started
+
+
+def _init_parse_worker():
+    # worker hasil spawn (Windows/macOS) perlu setup Django sebelum unpickle task
+    django.setup()
+
+
+def resolve_csv_paths(path):
+    """Direktori -> semua *.csv di dalamnya; selain itu diperlakukan sebagai glob."""
+    if os.path.isdir(path):
+        return sorted(glob.glob(os.path.join(path, "*.csv")))
+    return sorted(p for p in glob.glob(path) if os.path.isfile(p))
+
+
 class Command(BaseCommand):
-    help = "Import matches from a CSV file and recompute standings per season."
+    help = "Import matches from a CSV file (or a directory/glob of CSVs) and recompute standings per season."
 
     def add_arguments(self, parser):
-        parser.add_argument("--csv", required=True, help="Path to football_matches.csv")
-        parser.add_argument("--league-name", default="Dataset League")
+        source = parser.add_mutually_exclusive_group(required=True)
+        source.add_argument("--csv", help="Path to football_matches.csv")
+        source.add_argument("--path", help="Direktori atau glob berisi banyak CSV (satu liga per file)")
+        parser.add_argument("--league-name", default=None,
+                            help="Nama liga (default: 'Dataset League'; untuk --path default: nama file)")
         parser.add_argument("--country", default="")
+        parser.add_argument("--engine", choices=sorted(STANDINGS_ENGINES), default="python",
+                            help="Engine untuk rebuild klasemen (python=loop dict, numpy=vektor)")
+        parser.add_argument("--bulk", action="store_true",
+                            help="Mode bulk: baca CSV per chunk dan tulis dengan bulk_create")
+        parser.add_argument("--chunk-size", type=int, default=1000,
+                            help="Jumlah baris per chunk/transaksi untuk mode --bulk dan --path")
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                            help="Jumlah proses untuk parse/validasi file pada mode --path")
+        parser.add_argument("--writers", type=int, default=1,
+                            help="Jumlah liga yang ditulis paralel pada mode --path (satu writer per liga)")
 
     def handle(self, *args, **opts):
+        if opts["path"]:
+            return self.handle_batch(opts)
+
         csv_path = opts["csv"]
-        league_name = opts["league_name"]
+        league_name = opts["league_name"] or "Dataset League"
         country = opts["country"]
 
         league, _ = League.objects.get_or_create(name=league_name, defaults={"country": country})
 
-        created_matches = 0
-        skipped_dup = 0
-
         try:
-            with open(csv_path, "r", encoding="utf-8") as f:
+            # klasemen dibangun ulang sekali di akhir, jadi update inkremental per baris dimatikan
+            with suspend_incremental_sync(), open(csv_path, "r", encoding="utf-8") as f:
                 reader = csv.DictReader(f)
-                required = {"season","date","home_team","away_team","goal_home_ft","goal_away_ft"}
-                missing = required - set(reader.fieldnames or [])
+                missing = REQUIRED_COLUMNS - set(reader.fieldnames or [])
                 if missing:
                     raise CommandError(f"CSV missing required columns: {missing}")
 
-                for row in reader:
-                    home_name = row["home_team"].strip()
-                    away_name = row["away_team"].strip()
-                    if not home_name or not away_name:
-                        continue
-
-                    home_team, _ = Team.objects.get_or_create(league=league, name=home_name)
-                    away_team, _ = Team.objects.get_or_create(league=league, name=away_name)
-
-                    # parse date (naive), Django akan convert ke UTC karena USE_TZ=True
-                    date_str = row["date"].strip()
-                    dt = datetime.strptime(date_str, "%Y-%m-%d")
-
-                    payload = {
-                        "league": league,
-                        "season": row["season"].strip(),
-                        "date": dt,
-                        "home_team": home_team,
-                        "away_team": away_team,
-                        "status": Match.Status.FINISHED,
-                    }
-
-                    for csv_key, model_field in CSV_TO_MATCH_FIELDS.items():
-                        if csv_key in ("season","date"):
-                            continue
-
-                        val = row.get(csv_key, "").strip()
-                        if val == "":
-                            if model_field in ("home_possession","away_possession"):
-                                payload[model_field] = 0.0
-                            else:
-                                payload[model_field] = 0
-                        else:
-                            if model_field in ("home_possession","away_possession"):
-                                payload[model_field] = float(val)
-                            else:
-                                payload[model_field] = int(val)
-
-                    obj, created = Match.objects.get_or_create(
-                        league=league,
-                        season=payload["season"],
-                        date=payload["date"],
-                        home_team=payload["home_team"],
-                        away_team=payload["away_team"],
-                        defaults=payload,
-                    )
-                    created_matches += int(created)
-                    skipped_dup += int(not created)
+                if opts["bulk"]:
+                    created_matches, skipped_dup = self.import_bulk(league, reader, opts["chunk_size"])
+                else:
+                    created_matches, skipped_dup = self.import_rows(league, reader)
 
         except FileNotFoundError:
             raise CommandError(f"File not found: {csv_path}")
@@ -121,5 +181,207 @@ class Command(BaseCommand):
             f"Imported: {created_matches}, Skipped duplicates: {skipped_dup}"
         ))
 
-        recompute_standings_for_league(league)
+        recompute_standings_for_league(league, engine=opts["engine"])
         self.stdout.write(self.style.SUCCESS("Standings recomputed."))
+
+    def import_rows(self, league, reader):
+        """Mode default: get_or_create per baris (Team x2 + Match x1)."""
+        created_matches = 0
+        skipped_dup = 0
+
+        for row in reader:
+            parsed = parse_row(row)
+            if parsed is None:
+                continue
+            home_name, away_name, payload = parsed
+
+            home_team, _ = Team.objects.get_or_create(league=league, name=home_name)
+            away_team, _ = Team.objects.get_or_create(league=league, name=away_name)
+            payload.update(league=league, home_team=home_team, away_team=away_team)
+
+            obj, created = Match.objects.get_or_create(
+                league=league,
+                season=payload["season"],
+                date=payload["date"],
+                home_team=payload["home_team"],
+                away_team=payload["away_team"],
+                defaults=payload,
+            )
+            created_matches += int(created)
+            skipped_dup += int(not created)
+
+        return created_matches, skipped_dup
+
+    def import_bulk(self, league, reader, chunk_size):
+        """
+        Mode bulk: CSV dibaca sebagai stream lalu ditulis per chunk lewat write_bulk.
+        Di akhir dilaporkan rows/s dan puncak memori.
+        """
+        if chunk_size < 1:
+            raise CommandError("--chunk-size harus >= 1")
+
+        if resource is None:
+            tracemalloc.start()
+        started = time.perf_counter()
+        rows_read = 0
+
+        def parsed_rows():
+            nonlocal rows_read
+            for row in reader:
+                rows_read += 1
+                item = parse_row(row)
+                if item is not None:
+                    yield item
+
+        try:
+            created_matches, skipped_dup = write_bulk(league, parsed_rows(), chunk_size)
+        finally:
+            peak = _peak_memory_bytes()
+
+        elapsed = time.perf_counter() - started
+        rate = rows_read / elapsed if elapsed > 0 else float(rows_read)
+        self.stdout.write(
+            f"Bulk import: {rows_read} rows in {elapsed:.2f}s ({rate:,.0f} rows/s), "
+            f"peak memory {peak / (1024 * 1024):.1f} MiB"
+        )
+        return created_matches, skipped_dup
+
+    def handle_batch(self, opts):
+        """
+        Mode --path: semua file di-parse & divalidasi paralel di process pool,
+        lalu ditulis oleh satu writer per liga. Klasemen dihitung ulang sekali
+        per liga di akhir. File yang gagal dilaporkan tanpa menghentikan batch.
+        """
+        if opts["chunk_size"] < 1:
+            raise CommandError("--chunk-size harus >= 1")
+        paths = resolve_csv_paths(opts["path"])
+        if not paths:
+            raise CommandError(f"No CSV files found: {opts['path']}")
+
+        # hasil per file: path -> dict(league, parse_s, write_s, created, skipped, error)
+        results = {p: {"league": opts["league_name"] or os.path.splitext(os.path.basename(p))[0]} for p in paths}
+        parsed_by_league = {}
+
+        workers = max(1, min(opts["workers"], len(paths)))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_parse_worker) as pool:
+            futures = {pool.submit(parse_file, p): p for p in paths}
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    parsed, results[path]["parse_s"] = future.result()
+                except Exception as e:
+                    results[path]["error"] = str(e)
+                    continue
+                parsed_by_league.setdefault(results[path]["league"], []).append((path, parsed))
+
+        writers = max(1, min(opts["writers"], len(parsed_by_league) or 1))
+
+        def write_league(league_name, files):
+            try:
+                league, _ = League.objects.get_or_create(name=league_name, defaults={"country": opts["country"]})
+                for path, parsed in sorted(files):
+                    started = time.perf_counter()
+                    try:
+                        with suspend_incremental_sync():
+                            created, skipped = write_bulk(league, parsed, opts["chunk_size"])
+                    except Exception as e:
+                        results[path]["error"] = f"write: {e}"
+                        continue
+                    results[path].update(created=created, skipped=skipped,
+                                         write_s=time.perf_counter() - started)
+                if any("error" not in results[p] for p, _ in files):
+                    recompute_standings_for_league(league, engine=opts["engine"])
+            finally:
+                if writers > 1:
+                    connection.close()
+
+        if writers == 1:
+            for league_name, files in sorted(parsed_by_league.items()):
+                write_league(league_name, files)
+        else:
+            with ThreadPoolExecutor(max_workers=writers) as pool:
+                for future in [pool.submit(write_league, name, files) for name, files in parsed_by_league.items()]:
+                    future.result()
+
+        failed = 0
+        for path in paths:
+            r = results[path]
+            name = os.path.basename(path)
+            if "error" in r:
+                failed += 1
+                self.stderr.write(self.style.ERROR(f"FAILED {name} [{r['league']}]: {r['error']}"))
+            else:
+                self.stdout.write(
+                    f"OK {name} [{r['league']}]: imported {r['created']}, skipped {r['skipped']}, "
+                    f"parse {r['parse_s']:.2f}s, write {r['write_s']:.2f}s"
+                )
+
+        leagues_done = sorted({results[p]["league"] for p in paths if "error" not in results[p]})
+        self.stdout.write(self.style.SUCCESS(
+            f"Files: {len(paths) - failed} ok, {failed} failed. Standings recomputed for: {', '.join(leagues_done) or '-'}"
+        ))
+        if failed:
+            raise CommandError(f"{failed} of {len(paths)} files failed to import.")
+
+
+def write_bulk(league, parsed_rows, chunk_size):
+    """
+    Tulis hasil parse_row ke DB: tim di-resolve sekali ke map nama->id, natural
+    key match (season, date, home, away) yang sudah ada dimuat ke set untuk
+    dedup, lalu data ditulis per chunk dengan bulk_create dalam transaksinya sendiri.
+    """
+    created_matches = 0
+    skipped_dup = 0
+
+    team_ids = dict(Team.objects.filter(league=league).values_list("name", "id"))
+    existing = set(
+        Match.objects.filter(league=league).order_by()
+        .values_list("season", "date", "home_team_id", "away_team_id")
+    )
+
+    rows = iter(parsed_rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+
+        with transaction.atomic():
+            new_names = {n for h, a, _ in chunk for n in (h, a)} - team_ids.keys()
+            if new_names:
+                Team.objects.bulk_create(
+                    [Team(league=league, name=n) for n in sorted(new_names)],
+                    ignore_conflicts=True,
+                )
+                team_ids.update(
+                    Team.objects.filter(league=league, name__in=new_names).values_list("name", "id")
+                )
+
+            to_create = []
+            for home_name, away_name, payload in chunk:
+                payload = dict(payload, date=timezone.make_aware(payload["date"]))
+                key = (payload["season"], payload["date"], team_ids[home_name], team_ids[away_name])
+                if key in existing:
+                    skipped_dup += 1
+                    continue
+                existing.add(key)
+                to_create.append(Match(
+                    league=league, home_team_id=key[2], away_team_id=key[3], **payload
+                ))
+            Match.objects.bulk_create(to_create, batch_size=chunk_size)
+            created_matches += len(to_create)
+
+    return created_matches, skipped_dup
+
+
+def _peak_memory_bytes():
+    """
+    Puncak memori proses (RSS) dalam byte. Di platform tanpa modul resource,
+    dipakai puncak alokasi tracemalloc selama import.
+    """
+    if resource is None:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return peak
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux melaporkan KiB, macOS melaporkan byte
+    return peak if sys.platform == "darwin" else peak * 1024
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+from leagues.models import League
+from leagues.ratings import rebuild_ratings_for_league
+
+
+class Command(BaseCommand):
+    help = "Replay penuh rating Elo dari semua match FINISHED (per liga)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--league-name", default=None, help="Nama liga; default semua liga")
+
+    def handle(self, *args, **opts):
+        leagues = League.objects.order_by("pk")
+        if opts["league_name"]:
+            leagues = leagues.filter(name=opts["league_name"])
+            if not leagues.exists():
+                raise CommandError(f"Liga tidak ditemukan: {opts['league_name']}")
+
+        for league in leagues:
+            replayed = rebuild_ratings_for_league(league.pk)
+            self.stdout.write(self.style.SUCCESS(f"{league.name}: {replayed} match di-replay."))
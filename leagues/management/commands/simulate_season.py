@@ -0,0 +1,48 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from leagues.benchmarks import timed
+from leagues.models import League, SeasonSimulation
+from leagues.seasons import get_seasons
+from leagues.simulation import DEFAULT_SEED, DEFAULT_SIMULATIONS, MAX_SIMULATIONS, run_simulation
+
+
+class Command(BaseCommand):
+    help = "Simulasi Monte Carlo sisa season (peluang juara / 4 besar / degradasi); hasil disimpan untuk API."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--league-name", default=None, help="Nama liga; default liga pertama")
+        parser.add_argument("--season", default=None, help="Label season; default season terbaru")
+        parser.add_argument("--simulations", type=int, default=DEFAULT_SIMULATIONS, help="Jumlah simulasi")
+        parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Seed acak (hasil deterministik)")
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                            help="Jumlah proses ProcessPoolExecutor")
+
+    def handle(self, *args, **opts):
+        if not 1 <= opts["simulations"] <= MAX_SIMULATIONS:
+            raise CommandError(f"--simulations harus 1..{MAX_SIMULATIONS}")
+        if opts["seed"] < 0:
+            raise CommandError("--seed tidak boleh negatif")
+
+        leagues = League.objects.order_by("pk")
+        league = leagues.filter(name=opts["league_name"]).first() if opts["league_name"] else leagues.first()
+        if league is None:
+            raise CommandError(f"Liga tidak ditemukan: {opts['league_name'] or '-'}")
+        seasons = get_seasons(league)
+        season = opts["season"] or (seasons[-1] if seasons else None)
+        if season not in seasons:
+            raise CommandError(f"Season tidak ditemukan: {season or '-'}")
+
+        result, elapsed = timed(run_simulation, league.pk, season, opts["simulations"], opts["seed"],
+                                max(1, opts["workers"]))
+        SeasonSimulation.objects.update_or_create(
+            league=league, season=season, simulations=opts["simulations"], seed=opts["seed"],
+            defaults={"result": result},
+        )
+
+        self.stdout.write(f"{league.name} [{season}]: {opts['simulations']} simulasi, "
+                          f"{result['remaining_matches']} match tersisa, {elapsed * 1000:.0f} ms")
+        for team in result["teams"]:
+            self.stdout.write(f"{team['team_name']:<28} pts={team['points']:<4} xPts={team['expected_points']:<7} "
+                              f"juara={team['title']:.1%} top4={team['top4']:.1%} degradasi={team['relegation']:.1%}")
+        self.stdout.write(self.style.SUCCESS("Hasil simulasi disimpan."))
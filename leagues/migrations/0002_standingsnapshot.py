@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-16 21:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leagues', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StandingSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('season', models.CharField(max_length=20)),
+                ('matchday', models.PositiveSmallIntegerField()),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('points', models.IntegerField(default=0)),
+                ('gd', models.IntegerField(default=0)),
+                ('league', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='standing_snapshots', to='leagues.league')),
+                ('team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='standing_snapshots', to='leagues.team')),
+            ],
+            options={
+                'ordering': ['season', 'matchday', 'rank'],
+                'unique_together': {('league', 'season', 'team', 'matchday')},
+            },
+        ),
+    ]
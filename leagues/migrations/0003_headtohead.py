@@ -0,0 +1,70 @@
+# Generated by Django 5.2.18 on 2026-10-16 21:14
+
+from collections import defaultdict
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# jumlah id pertemuan terakhir yang disimpan per pasangan
+H2H_RECENT_LIMIT = 5
+
+
+def backfill_head_to_head(apps, schema_editor):
+    # rekap H2H dari match FINISHED yang sudah ada (seperti rebuild_head_to_head_for_league)
+    Match = apps.get_model('leagues', 'Match')
+    HeadToHead = apps.get_model('leagues', 'HeadToHead')
+    pairs = defaultdict(list)
+    rows = (
+        Match.objects.filter(status='FINISHED').order_by('-date', '-id')
+        .values_list('league_id', 'id', 'home_team_id', 'away_team_id', 'home_score', 'away_score')
+    )
+    for league_id, match_id, home_id, away_id, hs, as_ in rows.iterator(chunk_size=2000):
+        low, high = sorted((home_id, away_id))
+        pairs[(league_id, low, high)].append((match_id, home_id, hs, as_))
+
+    bulk = []
+    for (league_id, low, high), meetings in pairs.items():
+        h2h = HeadToHead(league_id=league_id, team_low_id=low, team_high_id=high, meetings=len(meetings))
+        for _, home_id, hs, as_ in meetings:
+            low_score, high_score = (hs, as_) if home_id == low else (as_, hs)
+            h2h.low_goals += low_score
+            h2h.high_goals += high_score
+            if low_score > high_score:
+                h2h.low_wins += 1
+            elif low_score < high_score:
+                h2h.high_wins += 1
+            else:
+                h2h.draws += 1
+        h2h.recent_match_ids = [row[0] for row in meetings[:H2H_RECENT_LIMIT]]
+        bulk.append(h2h)
+    HeadToHead.objects.bulk_create(bulk, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leagues', '0002_standingsnapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HeadToHead',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('meetings', models.PositiveIntegerField(default=0)),
+                ('low_wins', models.PositiveIntegerField(default=0)),
+                ('high_wins', models.PositiveIntegerField(default=0)),
+                ('draws', models.PositiveIntegerField(default=0)),
+                ('low_goals', models.PositiveIntegerField(default=0)),
+                ('high_goals', models.PositiveIntegerField(default=0)),
+                ('recent_match_ids', models.JSONField(blank=True, default=list)),
+                ('league', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='head_to_heads', to='leagues.league')),
+                ('team_high', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='leagues.team')),
+                ('team_low', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='leagues.team')),
+            ],
+            options={
+                'unique_together': {('team_low', 'team_high')},
+            },
+        ),
+        migrations.RunPython(backfill_head_to_head, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,85 @@
+# Generated by Django 5.2.18 on 2026-10-16 21:16
+
+from collections import defaultdict
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+# kolom statistik per sisi di Match saat migration ini ditulis
+STAT_FIELDS = (
+    'clearances', 'corners', 'fouls_conceded', 'offsides', 'passes', 'possession',
+    'red_cards', 'shots', 'shots_on_target', 'tackles', 'touches', 'yellow_cards',
+)
+
+
+def _season_totals(base):
+    combined = defaultdict(lambda: {'matches': 0, 'for': defaultdict(int), 'against': defaultdict(int)})
+    for side, other in (('home', 'away'), ('away', 'home')):
+        rows = base.values('season', f'{side}_team_id').annotate(
+            n=Count('id'),
+            **{f'for_{name}': Sum(f'{side}_{name}') for name in STAT_FIELDS},
+            **{f'against_{name}': Sum(f'{other}_{name}') for name in STAT_FIELDS},
+        )
+        for row in rows:
+            entry = combined[(row['season'], row[f'{side}_team_id'])]
+            entry['matches'] += row['n']
+            for name in STAT_FIELDS:
+                entry['for'][name] += row[f'for_{name}'] or 0
+                entry['against'][name] += row[f'against_{name}'] or 0
+    return combined
+
+
+def backfill_team_season_stats(apps, schema_editor):
+    # statistik season per tim dari match FINISHED yang sudah ada, per liga
+    League = apps.get_model('leagues', 'League')
+    Match = apps.get_model('leagues', 'Match')
+    TeamSeasonStats = apps.get_model('leagues', 'TeamSeasonStats')
+
+    def clean(totals):
+        return {name: round(totals.get(name) or 0, 2) for name in STAT_FIELDS}
+
+    def averages(totals, matches):
+        return {name: round(totals[name] / matches, 2) if matches else 0 for name in STAT_FIELDS}
+
+    for league_id in League.objects.values_list('pk', flat=True):
+        combined = _season_totals(Match.objects.filter(league_id=league_id, status='FINISHED').order_by())
+        bulk = []
+        for (season, team_id), entry in combined.items():
+            totals_for, totals_against = clean(entry['for']), clean(entry['against'])
+            bulk.append(TeamSeasonStats(
+                league_id=league_id, season=season, team_id=team_id, matches=entry['matches'],
+                totals_for=totals_for, totals_against=totals_against,
+                avg_for=averages(totals_for, entry['matches']),
+                avg_against=averages(totals_against, entry['matches']),
+            ))
+        TeamSeasonStats.objects.bulk_create(bulk, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leagues', '0003_headtohead'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TeamSeasonStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('season', models.CharField(max_length=20)),
+                ('matches', models.PositiveIntegerField(default=0)),
+                ('totals_for', models.JSONField(default=dict)),
+                ('totals_against', models.JSONField(default=dict)),
+                ('avg_for', models.JSONField(default=dict)),
+                ('avg_against', models.JSONField(default=dict)),
+                ('league', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='team_season_stats', to='leagues.league')),
+                ('team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='season_stats', to='leagues.team')),
+            ],
+            options={
+                'ordering': ['season', 'team__name'],
+                'unique_together': {('league', 'season', 'team')},
+            },
+        ),
+        migrations.RunPython(backfill_team_season_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,101 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:23
+
+import math
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# parameter Elo awal (rating tim baru, faktor K, keunggulan kandang)
+ELO_BASE = 1500.0
+ELO_K = 20.0
+ELO_HOME_ADVANTAGE = 60.0
+
+
+def _elo_delta(home_rating, away_rating, home_score, away_score):
+    expected = 1.0 / (1.0 + 10 ** ((away_rating - home_rating - ELO_HOME_ADVANTAGE) / 400.0))
+    if home_score > away_score:
+        actual = 1.0
+    elif home_score < away_score:
+        actual = 0.0
+    else:
+        actual = 0.5
+    margin = math.log(abs(home_score - away_score) + 1) + 1
+    return ELO_K * margin * (actual - expected)
+
+
+def _replay_ratings(rows):
+    ratings, counts, history = {}, {}, []
+    for match_id, date, home, away, hs, as_ in rows:
+        rh, ra = ratings.get(home, ELO_BASE), ratings.get(away, ELO_BASE)
+        delta = _elo_delta(rh, ra, hs, as_)
+        ratings[home], ratings[away] = rh + delta, ra - delta
+        counts[home] = counts.get(home, 0) + 1
+        counts[away] = counts.get(away, 0) + 1
+        history.append((home, match_id, date, rh, rh + delta))
+        history.append((away, match_id, date, ra, ra - delta))
+    return ratings, counts, history
+
+
+def backfill_ratings(apps, schema_editor):
+    # replay Elo penuh per liga dari match FINISHED yang sudah ada (seperti rebuild_ratings_for_league)
+    League = apps.get_model('leagues', 'League')
+    Match = apps.get_model('leagues', 'Match')
+    Team = apps.get_model('leagues', 'Team')
+    TeamRating = apps.get_model('leagues', 'TeamRating')
+    RatingHistory = apps.get_model('leagues', 'RatingHistory')
+    for league_id in League.objects.values_list('pk', flat=True):
+        rows = (
+            Match.objects.filter(league_id=league_id, status='FINISHED').order_by('date', 'id')
+            .values_list('id', 'date', 'home_team_id', 'away_team_id', 'home_score', 'away_score')
+        )
+        ratings, counts, history = _replay_ratings(rows.iterator(chunk_size=2000))
+        TeamRating.objects.bulk_create([
+            TeamRating(league_id=league_id, team_id=team_id,
+                       rating=ratings.get(team_id, ELO_BASE), matches=counts.get(team_id, 0))
+            for team_id in Team.objects.filter(league_id=league_id).values_list('pk', flat=True)
+        ], batch_size=1000)
+        RatingHistory.objects.bulk_create([
+            RatingHistory(league_id=league_id, team_id=team_id, match_id=match_id, date=date,
+                          rating_before=before, rating_after=after)
+            for team_id, match_id, date, before, after in history
+        ], batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leagues', '0004_teamseasonstats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TeamRating',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rating', models.FloatField(default=1500.0)),
+                ('matches', models.PositiveIntegerField(default=0)),
+                ('league', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='team_ratings', to='leagues.league')),
+                ('team', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='rating', to='leagues.team')),
+            ],
+            options={
+                'ordering': ['-rating', 'team__name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='RatingHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateTimeField()),
+                ('rating_before', models.FloatField()),
+                ('rating_after', models.FloatField()),
+                ('league', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rating_history', to='leagues.league')),
+                ('match', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rating_changes', to='leagues.match')),
+                ('team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rating_history', to='leagues.team')),
+            ],
+            options={
+                'ordering': ['date', 'match_id'],
+                'unique_together': {('team', 'match')},
+            },
+        ),
+        migrations.RunPython(backfill_ratings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:32
+
+from collections import defaultdict, deque
+
+from django.db import migrations, models
+
+FORM_LENGTH = 5
+FORM_POINTS = {'W': 3, 'D': 1, 'L': 0}
+
+
+def _form_letter(goals_for, goals_against):
+    if goals_for > goals_against:
+        return 'W'
+    if goals_for < goals_against:
+        return 'L'
+    return 'D'
+
+
+def backfill_form(apps, schema_editor):
+    # form guide dari FORM_LENGTH match FINISHED terakhir tiap tim per season (seperti compute_form_table)
+    Match = apps.get_model('leagues', 'Match')
+    Standing = apps.get_model('leagues', 'Standing')
+    recent = defaultdict(lambda: deque(maxlen=FORM_LENGTH))
+    rows = (
+        Match.objects.filter(status='FINISHED').order_by('date', 'id')
+        .values_list('league_id', 'season', 'home_team_id', 'away_team_id', 'home_score', 'away_score')
+    )
+    for league_id, season, home, away, hs, as_ in rows.iterator(chunk_size=2000):
+        recent[(league_id, season, home)].append(_form_letter(hs, as_))
+        recent[(league_id, season, away)].append(_form_letter(as_, hs))
+
+    standings = list(Standing.objects.only('id', 'league_id', 'season', 'team_id'))
+    for standing in standings:
+        form = ''.join(recent.get((standing.league_id, standing.season, standing.team_id), ()))
+        standing.form, standing.form_points = form, sum(FORM_POINTS[c] for c in form)
+    Standing.objects.bulk_update(standings, ['form', 'form_points'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leagues', '0005_teamrating'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='standing',
+            name='form',
+            field=models.CharField(blank=True, default='', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='standing',
+            name='form_points',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_form, migrations.RunPython.noop),
+    ]
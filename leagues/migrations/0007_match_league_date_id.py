@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leagues', '0006_standing_form'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['league', 'date', 'id'], name='match_league_date_id'),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:57
+
+import re
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# dua digit >= pivot dianggap 19xx ("99/00" -> 1999), selain itu 20xx
+TWO_DIGIT_PIVOT = 70
+_leading_year = re.compile(r'\s*(\d+)')
+
+
+def _season_start_year(label):
+    found = _leading_year.match(label or '')
+    if not found:
+        return 0
+    year = int(found.group(1))
+    if len(found.group(1)) <= 2:
+        year += 1900 if year >= TWO_DIGIT_PIVOT else 2000
+    return year
+
+
+def populate_seasons(apps, schema_editor):
+    # isi registry dari season yang sudah ada di Match
+    Match = apps.get_model('leagues', 'Match')
+    Season = apps.get_model('leagues', 'Season')
+    pairs = Match.objects.values_list('league_id', 'season').distinct()
+    Season.objects.bulk_create(
+        [Season(league_id=league_id, name=name, start_year=_season_start_year(name)) for league_id, name in pairs],
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leagues', '0007_match_league_date_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Season',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=20)),
+                ('start_year', models.PositiveSmallIntegerField()),
+                ('league', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='seasons', to='leagues.league')),
+            ],
+            options={
+                'ordering': ['start_year', 'name'],
+                'indexes': [models.Index(fields=['league', 'start_year', 'name'], name='season_league_order')],
+                'unique_together': {('league', 'name')},
+            },
+        ),
+        migrations.RunPython(populate_seasons, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leagues', '0008_season'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['league', 'status', 'date'], name='match_league_status_date'),
+        ),
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['league', 'season', 'home_team'], name='match_league_season_home'),
+        ),
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['league', 'season', 'away_team'], name='match_league_season_away'),
+        ),
+        migrations.AddIndex(
+            model_name='standing',
+            index=models.Index(fields=['league', 'season', '-points', '-gd', '-gf'], name='standing_table_order'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leagues', '0009_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeasonSimulation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('season', models.CharField(max_length=20)),
+                ('simulations', models.PositiveIntegerField()),
+                ('seed', models.PositiveIntegerField()),
+                ('result', models.JSONField(default=dict)),
+                ('created_at', models.DateTimeField(auto_now=True)),
+                ('league', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='simulations', to='leagues.league')),
+            ],
+            options={
+                'unique_together': {('league', 'season', 'simulations', 'seed')},
+            },
+        ),
+    ]
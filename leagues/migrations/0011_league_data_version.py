@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leagues', '0010_seasonsimulation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='league',
+            name='data_version',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+    ]
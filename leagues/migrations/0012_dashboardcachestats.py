@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leagues', '0011_league_data_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardCacheStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hits', models.BigIntegerField(default=0)),
+                ('misses', models.BigIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -1,9 +1,11 @@
-from django.db import models
+from django.db import models, router, transaction
 from django.core.validators import MinValueValidator
 
 class League(models.Model):
     name = models.CharField(max_length=100, unique=True, default="Dataset League")
     country = models.CharField(max_length=100, blank=True)
+    # versi data liga untuk ETag & key cache (lihat versioning.py), dibagi semua worker
+    data_version = models.BigIntegerField(default=0, editable=False)
 
     def __str__(self):
         return self.name
@@ -20,6 +22,12 @@ class Team(models.Model):
     def __str__(self):
         return self.name
     
+# kolom statistik per sisi di Match (home_<nama> / away_<nama>)
+MATCH_STAT_FIELDS = (
+    "clearances", "corners", "fouls_conceded", "offsides", "passes", "possession",
+    "red_cards", "shots", "shots_on_target", "tackles", "touches", "yellow_cards",
+)
+
 class Match(models.Model):
     class Status(models.TextChoices):
         SCHEDULED = "SCHEDULED", "Scheduled"
@@ -74,10 +82,26 @@ class Match(models.Model):
         constraints = [
             models.CheckConstraint(check=~models.Q(home_team=models.F('away_team')), name='not_same_team'),
         ]
+        indexes = [
+            # paginasi keyset (date, id) per liga; juga "akan datang" (date > now) urut date
+            models.Index(fields=['league', 'date', 'id'], name='match_league_date_id'),
+            # match FINISHED terbaru (dashboard, replay rating)
+            models.Index(fields=['league', 'status', 'date'], name='match_league_status_date'),
+            # match satu tim dalam satu season (form guide, statistik season, registry season)
+            models.Index(fields=['league', 'season', 'home_team'], name='match_league_season_home'),
+            models.Index(fields=['league', 'season', 'away_team'], name='match_league_season_away'),
+        ]
         ordering = ['date']
 
     def __str__(self):
         return f"[{self.season}] {self.home_team} vs {self.away_team} ({self.date:%Y-%m-%d})"
+
+    def save(self, *args, **kwargs):
+        # UPDATE match + selisih klasemen & data turunan (signal pre/post_save) dalam satu
+        # transaksi; pre_save mengunci baris lama (select_for_update) sehingga dua edit
+        # bersamaan tidak menghitung selisih dari state lama yang sama
+        with transaction.atomic(using=kwargs.get("using") or router.db_for_write(Match, instance=self)):
+            super().save(*args, **kwargs)
     
 class Standing(models.Model):
     league = models.ForeignKey(League, on_delete=models.CASCADE, related_name='standings')
@@ -93,9 +117,176 @@ class Standing(models.Model):
     gd = models.IntegerField(default=0)   # goal difference
     points = models.IntegerField(default=0)
 
+    # hasil match FINISHED terakhir di season ini, urut lama -> baru (mis. "WWDLW")
+    form = models.CharField(max_length=10, blank=True, default="")
+    form_points = models.PositiveSmallIntegerField(default=0)
+
     class Meta:
         unique_together = ('league', 'season', 'team')
         ordering = ['-points', '-gd', '-gf', 'team__name']
+        indexes = [
+            # tabel klasemen satu season sudah terurut langsung dari indeks
+            models.Index(fields=['league', 'season', '-points', '-gd', '-gf'], name='standing_table_order'),
+        ]
+
+    def __str__(self):
+        return f"[{self.season}] {self.team.name} - {self.points} pts"
+
+
+class StandingSnapshot(models.Model):
+    """Posisi tim di klasemen setelah tiap matchday (untuk grafik posisi per season)."""
+    league = models.ForeignKey(League, on_delete=models.CASCADE, related_name='standing_snapshots')
+    season = models.CharField(max_length=20)
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='standing_snapshots')
+    matchday = models.PositiveSmallIntegerField()
+
+    rank = models.PositiveSmallIntegerField()
+    points = models.IntegerField(default=0)
+    gd = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('league', 'season', 'team', 'matchday')
+        ordering = ['season', 'matchday', 'rank']
+
+    def __str__(self):
+        return f"[{self.season}] MD{self.matchday} #{self.rank} {self.team.name}"
+
+class HeadToHead(models.Model):
+    """
+    Rekap pertemuan dua tim (pasangan tak berurut, team_low.id < team_high.id)
+    atas semua match FINISHED, dijaga oleh signal Match.
+    """
+    league = models.ForeignKey(League, on_delete=models.CASCADE, related_name='head_to_heads')
+    team_low = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='+')
+    team_high = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='+')
+
+    meetings = models.PositiveIntegerField(default=0)
+    low_wins = models.PositiveIntegerField(default=0)
+    high_wins = models.PositiveIntegerField(default=0)
+    draws = models.PositiveIntegerField(default=0)
+    low_goals = models.PositiveIntegerField(default=0)
+    high_goals = models.PositiveIntegerField(default=0)
+
+    # id match pertemuan terakhir, terbaru lebih dulu
+    recent_match_ids = models.JSONField(default=list, blank=True)
+
+    class Meta:
+        unique_together = ('team_low', 'team_high')
+
+    def __str__(self):
+        return f"{self.team_low.name} vs {self.team_high.name} ({self.meetings}x)"
+
+class TeamSeasonStats(models.Model):
+    """
+    Total & rata-rata per match semua statistik Match untuk satu tim dalam satu season,
+    dari sisi tim itu (for) dan lawannya (against). Hanya match FINISHED yang dihitung.
+    """
+    league = models.ForeignKey(League, on_delete=models.CASCADE, related_name='team_season_stats')
+    season = models.CharField(max_length=20)
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='season_stats')
+    matches = models.PositiveIntegerField(default=0)
+
+    # {nama_stat: nilai}, nama_stat dari MATCH_STAT_FIELDS
+    totals_for = models.JSONField(default=dict)
+    totals_against = models.JSONField(default=dict)
+    avg_for = models.JSONField(default=dict)
+    avg_against = models.JSONField(default=dict)
+
+    class Meta:
+        unique_together = ('league', 'season', 'team')
+        ordering = ['season', 'team__name']
+
+    def stat_rows(self):
+        """Baris per statistik untuk ditampilkan (template / API)."""
+        return [
+            {
+                "name": name,
+                "label": name.replace("_", " ").capitalize(),  # "shots_on_target" -> "Shots on target"
+                "total_for": self.totals_for.get(name, 0),
+                "total_against": self.totals_against.get(name, 0),
+                "avg_for": self.avg_for.get(name, 0),
+                "avg_against": self.avg_against.get(name, 0),
+            }
+            for name in MATCH_STAT_FIELDS
+        ]
+
+    def __str__(self):
+        return f"[{self.season}] {self.team.name} stats ({self.matches} match)"
+
+class TeamRating(models.Model):
+    """Rating Elo terkini satu tim, hasil replay semua match FINISHED di liganya."""
+    league = models.ForeignKey(League, on_delete=models.CASCADE, related_name='team_ratings')
+    team = models.OneToOneField(Team, on_delete=models.CASCADE, related_name='rating')
+    rating = models.FloatField(default=1500.0)
+    matches = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-rating', 'team__name']
+
+    def __str__(self):
+        return f"{self.team.name} {self.rating:.0f}"
+
+class RatingHistory(models.Model):
+    """Perubahan rating satu tim akibat satu match (untuk grafik rating)."""
+    league = models.ForeignKey(League, on_delete=models.CASCADE, related_name='rating_history')
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='rating_history')
+    match = models.ForeignKey(Match, on_delete=models.CASCADE, related_name='rating_changes')
+    date = models.DateTimeField()  # salinan Match.date, urutan replay (date, match_id)
+
+    rating_before = models.FloatField()
+    rating_after = models.FloatField()
+
+    class Meta:
+        unique_together = ('team', 'match')
+        ordering = ['date', 'match_id']
+
+    def __str__(self):
+        return f"{self.team.name} {self.rating_before:.0f} -> {self.rating_after:.0f}"
+
+class Season(models.Model):
+    """
+    Daftar season per liga (satu baris per label Match.season), terurut kronologis
+    lewat start_year: "99/00" -> 1999 berada sebelum "10/11" -> 2010.
+    """
+    league = models.ForeignKey(League, on_delete=models.CASCADE, related_name='seasons')
+    name = models.CharField(max_length=20)  # sama formatnya dengan di Match.season
+    start_year = models.PositiveSmallIntegerField()
+
+    class Meta:
+        unique_together = ('league', 'name')
+        ordering = ['start_year', 'name']
+        indexes = [
+            models.Index(fields=['league', 'start_year', 'name'], name='season_league_order'),
+        ]
+
+    def __str__(self):
+        return f"{self.league.name} {self.name}"
+
+class SeasonSimulation(models.Model):
+    """
+    Hasil simulasi Monte Carlo sisa season (peluang juara / 4 besar / degradasi).
+    Dihapus oleh signal saat hasil atau jadwal match liga berubah, lalu dihitung ulang saat diminta.
+    """
+    league = models.ForeignKey(League, on_delete=models.CASCADE, related_name='simulations')
+    season = models.CharField(max_length=20)
+    simulations = models.PositiveIntegerField()
+    seed = models.PositiveIntegerField()
+    result = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('league', 'season', 'simulations', 'seed')
+
+    def __str__(self):
+        return f"[{self.season}] {self.league.name} x{self.simulations}"
+
+class DashboardCacheStats(models.Model):
+    """
+    Counter hit/miss cache snapshot dashboard (satu baris, pk=1), dibagi semua
+    worker; tiap proses menampung counter lalu menambahkannya ke sini (lihat dashboard.py).
+    """
+    hits = models.BigIntegerField(default=0)
+    misses = models.BigIntegerField(default=0)
 
     def __str__(self):
-        return f"[{self.season}] {self.team.name} - {self.points} pts"
\ No newline at end of file
+        return f"hits={self.hits} misses={self.misses}"
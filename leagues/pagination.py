@@ -0,0 +1,75 @@
+# leagues/pagination.py
+"""
+Keyset (cursor) pagination atas Match berdasarkan (date, id).
+
+Halaman berikutnya diambil dengan WHERE (date, id) < / > posisi terakhir,
+sehingga DB cukup melakukan range scan pada indeks (league, date, id)
+tanpa OFFSET. Posisi dikirim ke client sebagai token opaque (base64url).
+"""
+import base64
+import json
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class InvalidPage(ValueError):
+    """Parameter cursor / limit tidak valid."""
+
+
+def encode_cursor(row):
+    # row: instance Match atau dict dari .values() (minimal berisi date & id)
+    date, pk = (row["date"], row["id"]) if isinstance(row, dict) else (row.date, row.pk)
+    raw = json.dumps([date.isoformat(), pk], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        date_str, pk = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        date = parse_datetime(date_str)
+        if date is None or not isinstance(pk, int):
+            raise ValueError
+    except (ValueError, TypeError):
+        raise InvalidPage("Cursor tidak valid.")
+    return date, pk
+
+
+def parse_limit(value, default=DEFAULT_PAGE_SIZE):
+    """Ukuran halaman dari query string, dibatasi MAX_PAGE_SIZE."""
+    if value in (None, ""):
+        return default
+    try:
+        limit = int(value)
+    except ValueError:
+        raise InvalidPage("Parameter limit tidak valid.")
+    if limit < 1:
+        raise InvalidPage("Parameter limit tidak valid.")
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def keyset_page(qs, cursor=None, limit=DEFAULT_PAGE_SIZE, descending=True):
+    """
+    Satu halaman qs terurut (date, id) setelah `cursor`.
+    Mengembalikan (list objek, token halaman berikutnya atau None).
+    """
+    if descending:
+        qs = qs.order_by("-date", "-id")
+    else:
+        qs = qs.order_by("date", "id")
+
+    if cursor:
+        date, pk = decode_cursor(cursor)
+        if descending:
+            qs = qs.filter(Q(date__lt=date) | Q(date=date, id__lt=pk))
+        else:
+            qs = qs.filter(Q(date__gt=date) | Q(date=date, id__gt=pk))
+
+    rows = list(qs[:limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return rows, (encode_cursor(rows[-1]) if has_more else None)
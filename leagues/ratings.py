@@ -0,0 +1,160 @@
+# leagues/ratings.py
+"""
+Rating kekuatan tim (Elo) atas riwayat match sebuah liga.
+
+Semua match FINISHED liga di-replay sekali secara kronologis (date, id);
+rating terkini disimpan di TeamRating dan tiap perubahannya di RatingHistory.
+Match baru yang selesai *setelah* match terakhir yang sudah dirating cukup
+diterapkan sebagai satu langkah Elo. Perubahan pada match lama (skor, tanggal,
+tim, status, hapus) mengubah semua rating sesudahnya, jadi liga di-replay penuh.
+"""
+import math
+
+from django.db import transaction
+from django.db.models import Q
+
+from .deferred import on_commit_once
+from .models import Match, RatingHistory, Team, TeamRating
+
+ELO_BASE = 1500.0
+ELO_K = 20.0
+ELO_HOME_ADVANTAGE = 60.0
+
+
+def elo_delta(home_rating, away_rating, home_score, away_score):
+    """
+    Perubahan rating tim kandang (tim tandang mendapat kebalikannya).
+    Bobot selisih gol: ln(|selisih| + 1) + 1, seperti World Football Elo.
+    """
+    expected = 1.0 / (1.0 + 10 ** ((away_rating - home_rating - ELO_HOME_ADVANTAGE) / 400.0))
+    if home_score > away_score:
+        actual = 1.0
+    elif home_score < away_score:
+        actual = 0.0
+    else:
+        actual = 0.5
+    margin = math.log(abs(home_score - away_score) + 1) + 1
+    return ELO_K * margin * (actual - expected)
+
+
+def replay_ratings(rows, ratings=None):
+    """
+    Replay Elo atas rows (match_id, date, home_id, away_id, home_score, away_score)
+    yang sudah terurut. Mengembalikan (ratings, counts, history) dengan
+    history berisi (team_id, match_id, date, rating_before, rating_after).
+    """
+    ratings = dict(ratings or {})
+    counts = {}
+    history = []
+    for match_id, date, home, away, hs, as_ in rows:
+        rh, ra = ratings.get(home, ELO_BASE), ratings.get(away, ELO_BASE)
+        delta = elo_delta(rh, ra, hs, as_)
+        ratings[home], ratings[away] = rh + delta, ra - delta
+        counts[home] = counts.get(home, 0) + 1
+        counts[away] = counts.get(away, 0) + 1
+        history.append((home, match_id, date, rh, rh + delta))
+        history.append((away, match_id, date, ra, ra - delta))
+    return ratings, counts, history
+
+
+def _finished_rows(league_id):
+    return (Match.objects
+            .filter(league_id=league_id, status=Match.Status.FINISHED)
+            .order_by("date", "id")
+            .values_list("id", "date", "home_team_id", "away_team_id", "home_score", "away_score"))
+
+
+def rebuild_ratings_for_league(league_id):
+    """Replay penuh rating liga dari awal (clear & rebuild). Mengembalikan jumlah match."""
+    ratings, counts, history = replay_ratings(_finished_rows(league_id).iterator(chunk_size=2000))
+    team_ids = Team.objects.filter(league_id=league_id).values_list("id", flat=True)
+
+    with transaction.atomic():
+        RatingHistory.objects.filter(league_id=league_id).delete()
+        TeamRating.objects.filter(league_id=league_id).delete()
+        TeamRating.objects.bulk_create([
+            TeamRating(league_id=league_id, team_id=team_id,
+                       rating=ratings.get(team_id, ELO_BASE), matches=counts.get(team_id, 0))
+            for team_id in team_ids
+        ], batch_size=1000)
+        RatingHistory.objects.bulk_create([
+            RatingHistory(league_id=league_id, team_id=team_id, match_id=match_id, date=date,
+                          rating_before=before, rating_after=after)
+            for team_id, match_id, date, before, after in history
+        ], batch_size=2000)
+    return len(history) // 2
+
+
+def is_latest_rated(match):
+    """True jika tidak ada match yang sudah dirating setelah `match` (urutan date, id)."""
+    later = Q(date__gt=match.date) | Q(date=match.date, match_id__gt=match.pk)
+    return not RatingHistory.objects.filter(league_id=match.league_id).filter(later).exists()
+
+
+def apply_match_rating(match):
+    """Terapkan satu langkah Elo untuk match FINISHED terbaru liga (tanpa replay)."""
+    with transaction.atomic():
+        current = {
+            r.team_id: r for r in TeamRating.objects.select_for_update()
+            .filter(team_id__in=(match.home_team_id, match.away_team_id))
+        }
+        home, away = (
+            current.get(team_id) or TeamRating(league_id=match.league_id, team_id=team_id, rating=ELO_BASE)
+            for team_id in (match.home_team_id, match.away_team_id)
+        )
+        _, _, history = replay_ratings(
+            [(match.pk, match.date, home.team_id, away.team_id, match.home_score, match.away_score)],
+            {home.team_id: home.rating, away.team_id: away.rating},
+        )
+        for rating, (team_id, match_id, date, before, after) in zip((home, away), history):
+            rating.rating = after
+            rating.matches += 1
+            rating.save()
+            RatingHistory.objects.create(league_id=match.league_id, team_id=team_id, match_id=match_id,
+                                         date=date, rating_before=before, rating_after=after)
+
+
+def _rating_key(match):
+    if match is None or match.status != Match.Status.FINISHED:
+        return None
+    return (match.league_id, match.date, match.home_team_id, match.away_team_id,
+            match.home_score, match.away_score)
+
+
+def schedule_replay(league_id):
+    """Jadwalkan replay penuh setelah transaksi commit, paling banyak sekali per liga."""
+    on_commit_once(("ratings", league_id), lambda: rebuild_ratings_for_league(league_id))
+
+
+def sync_ratings(previous, current):
+    """
+    Dipanggil signal Match. Match yang baru selesai dan paling akhir di liganya
+    diterapkan inkremental; perubahan lain yang memengaruhi rating memicu replay penuh.
+    """
+    old, new = _rating_key(previous), _rating_key(current)
+    if old == new:
+        return
+    if old is None and new is not None and is_latest_rated(current):
+        apply_match_rating(current)
+        return
+    for league_id in sorted({key[0] for key in (old, new) if key is not None}):
+        schedule_replay(league_id)
+
+
+def get_ratings(league):
+    """Ranking rating liga: list dict terurut rating tertinggi lebih dulu."""
+    qs = TeamRating.objects.filter(league=league).select_related("team")
+    return [
+        {"rank": i, "team_id": r.team_id, "team_name": r.team.name,
+         "rating": round(r.rating, 1), "matches": r.matches}
+        for i, r in enumerate(qs, start=1)
+    ]
+
+
+def get_rating_history(team):
+    """Riwayat rating satu tim: list {match_id, date, rating}."""
+    return [
+        {"match_id": match_id, "date": date.isoformat(), "rating": round(after, 1)}
+        for match_id, date, after in (RatingHistory.objects.filter(team=team)
+                                      .values_list("match_id", "date", "rating_after"))
+    ]
@@ -0,0 +1,82 @@
+# leagues/search.py
+"""
+Pencarian nama tim (?q= / ?team=) lewat indeks trigram in-memory per liga.
+
+Nama tim dinormalisasi (huruf kecil, tanpa aksen & tanda baca) lalu dipecah
+menjadi trigram. Teks pencarian diterjemahkan dulu menjadi daftar id tim,
+sehingga filter match cukup memakai home_team_id IN / away_team_id IN (terindeks)
+tanpa JOIN + LIKE ke tabel Team. Indeks di-cache per versi data liga, jadi
+otomatis dibangun ulang setelah ada penulisan Team.
+"""
+import re
+import unicodedata
+from collections import defaultdict
+
+from django.core.cache import cache
+
+from .models import Team
+from .versioning import get_data_version
+
+INDEX_TIMEOUT = 60 * 60 * 24
+
+_non_alnum = re.compile(r"[^0-9a-z]+")
+
+
+def normalize_team_name(text):
+    """Kunci pencarian: "Atlético  Madrid." -> "atletico madrid"."""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(ch for ch in text if not unicodedata.combining(ch)).casefold()
+    return _non_alnum.sub(" ", text).strip()
+
+
+def _trigrams(key):
+    return {key[i:i + 3] for i in range(len(key) - 2)}
+
+
+class TeamSearchIndex:
+    """Trigram -> id tim, untuk pencarian substring atas nama yang dinormalisasi."""
+
+    def __init__(self, teams):
+        self.keys = {pk: normalize_team_name(name) for pk, name in teams}
+        self.grams = defaultdict(set)
+        for pk, key in self.keys.items():
+            for gram in _trigrams(key):
+                self.grams[gram].add(pk)
+
+    def search(self, text):
+        """
+        Id tim yang namanya memuat `text` (setelah normalisasi), kecocokan prefix
+        lebih dulu. None (tanpa filter) hanya jika `text` kosong/spasi saja; teks
+        yang habis saat dinormalisasi (mis. hanya tanda baca) tidak cocok dengan apa pun.
+        """
+        needle = normalize_team_name(text)
+        if not needle:
+            return [] if text and text.strip() else None
+        grams = _trigrams(needle)
+        if grams:
+            postings = sorted((self.grams.get(gram, set()) for gram in grams), key=len)
+            candidates = set.intersection(*postings)
+        else:
+            candidates = self.keys  # kurang dari 3 huruf: cukup scan daftar nama (kecil)
+        hits = [pk for pk in candidates if needle in self.keys[pk]]
+
+        def rank(pk):
+            # 0: nama diawali needle, 1: ada kata berawalan needle, 2: substring biasa
+            key = self.keys[pk]
+            return (0 if key.startswith(needle) else 1 if f" {needle}" in key else 2, key, pk)
+        return sorted(hits, key=rank)
+
+
+def get_team_search_index(league):
+    league_id = getattr(league, "pk", league)
+    key = f"leagues:team-search:{league_id}:{get_data_version(league_id)}"
+    index = cache.get(key)
+    if index is None:
+        index = TeamSearchIndex(Team.objects.filter(league_id=league_id).values_list("id", "name"))
+        cache.set(key, index, INDEX_TIMEOUT)
+    return index
+
+
+def search_team_ids(league, text):
+    """Id tim liga yang cocok dengan teks pencarian (None = tanpa filter)."""
+    return get_team_search_index(league).search(text)
@@ -0,0 +1,107 @@
+# leagues/seasons.py
+"""
+Registry season per liga (model Season) dan daftar season ter-cache.
+
+Daftar season dibaca dari tabel Season (terindeks per liga, urut start_year)
+dan disimpan di cache Django, sehingga view tidak lagi menjalankan DISTINCT
+atas seluruh tabel Match lalu mengurutkan string ("99/00" > "10/11").
+Registry dijaga oleh signal Match (inkremental) dan rebuild klasemen (import).
+
+Key cache memuat versi data liga (versioning.py): perubahan registry menaikkan
+versi setelah commit, sehingga daftar lama tidak terpakai lagi di worker mana pun.
+"""
+import re
+
+from django.core.cache import cache
+
+from .models import Match, Season
+from .versioning import bump_data_version, get_data_version
+
+SEASONS_TIMEOUT = 60 * 60 * 24
+
+# dua digit >= pivot dianggap 19xx ("99/00" -> 1999), selain itu 20xx ("10/11" -> 2010)
+TWO_DIGIT_PIVOT = 70
+
+_leading_year = re.compile(r"\s*(\d+)")
+
+
+def season_start_year(label):
+    """Tahun mulai dari label season: "10/11" -> 2010, "99/00" -> 1999, "2010/2011" -> 2010."""
+    found = _leading_year.match(label or "")
+    if not found:
+        return 0
+    year = int(found.group(1))
+    if len(found.group(1)) <= 2:
+        year += 1900 if year >= TWO_DIGIT_PIVOT else 2000
+    return year
+
+
+def season_sort_key(label):
+    return (season_start_year(label), label)
+
+
+def sort_seasons(labels):
+    """Urutkan label season secara kronologis (untuk daftar di luar registry, mis. per tim)."""
+    return sorted(set(labels), key=season_sort_key)
+
+
+def _seasons_key(league_id):
+    return f"leagues:seasons:{league_id}:{get_data_version(league_id)}"
+
+
+def invalidate_seasons(league_id):
+    bump_data_version(league_id)
+
+
+def get_seasons(league):
+    """Label season liga, urut lama -> baru (dari cache; miss -> satu query terindeks)."""
+    league_id = getattr(league, "pk", league)
+    seasons = cache.get(_seasons_key(league_id))
+    if seasons is None:
+        seasons = list(Season.objects.filter(league_id=league_id)
+                       .order_by("start_year", "name").values_list("name", flat=True))
+        cache.set(_seasons_key(league_id), seasons, SEASONS_TIMEOUT)
+    return seasons
+
+
+def get_latest_season(league):
+    seasons = get_seasons(league)
+    return seasons[-1] if seasons else None
+
+
+def register_season(league_id, name):
+    """Pastikan season ada di registry (dipanggil saat Match ditulis)."""
+    # sengaja tidak memakai cache: cache bisa basi setelah rollback, registry tidak boleh
+    _, created = Season.objects.get_or_create(league_id=league_id, name=name,
+                                              defaults={"start_year": season_start_year(name)})
+    if created:
+        invalidate_seasons(league_id)
+
+
+def prune_season(league_id, name):
+    """Hapus season dari registry jika tidak ada Match tersisa di season tsb."""
+    if Match.objects.filter(league_id=league_id, season=name).exists():
+        return
+    if Season.objects.filter(league_id=league_id, name=name).delete()[0]:
+        invalidate_seasons(league_id)
+
+
+def sync_seasons(previous, current):
+    """Sesuaikan registry setelah Match dibuat/diubah/dihapus (state lama & baru)."""
+    if current is not None:
+        register_season(current.league_id, current.season)
+    if previous is not None and (current is None or
+                                 (previous.league_id, previous.season) != (current.league_id, current.season)):
+        prune_season(previous.league_id, previous.season)
+
+
+def rebuild_seasons_for_league(league_id):
+    """Samakan registry dengan season yang ada di Match (setelah import / bulk write)."""
+    names = set(Match.objects.filter(league_id=league_id).values_list("season", flat=True).distinct())
+    existing = set(Season.objects.filter(league_id=league_id).values_list("name", flat=True))
+    Season.objects.filter(league_id=league_id, name__in=existing - names).delete()
+    Season.objects.bulk_create(
+        [Season(league_id=league_id, name=name, start_year=season_start_year(name)) for name in names - existing],
+        ignore_conflicts=True,
+    )
+    invalidate_seasons(league_id)
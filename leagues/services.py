@@ -1,13 +1,154 @@
-from collections import defaultdict
+import logging
+import threading
+from collections import defaultdict, deque, namedtuple
+from contextlib import contextmanager
+import numpy as np
 from django.db import transaction
-from .models import Match, Standing
+from django.db.models import Case, Count, F, Q, Sum, When
+from .models import MATCH_STAT_FIELDS, HeadToHead, League, Match, Standing, StandingSnapshot, Team, TeamSeasonStats
+from .ratings import rebuild_ratings_for_league
+from .seasons import rebuild_seasons_for_league
+from .simulation import invalidate_simulations
+from .timeline import (
+    build_season_timeline, get_season_timeline, invalidate_league_timelines, invalidate_season_timeline,
+)
+from .versioning import bump_data_version
 
-def recompute_standings_for_league(league):
+logger = logging.getLogger(__name__)
+
+STANDING_FIELDS = ("played", "win", "draw", "loss", "gf", "ga", "gd", "points")
+
+# jumlah id pertemuan terakhir yang disimpan di HeadToHead
+H2H_RECENT_LIMIT = 5
+
+# panjang form guide (jumlah hasil terakhir) di Standing.form
+FORM_LENGTH = 5
+FORM_POINTS = {"W": 3, "D": 1, "L": 0}
+
+# Potongan data Match yang cukup untuk menghitung kontribusinya ke klasemen
+MatchResult = namedtuple(
+    "MatchResult",
+    ["league_id", "season", "home_team_id", "away_team_id", "home_score", "away_score"],
+)
+
+_sync_state = threading.local()
+
+
+def match_result(match):
     """
-    Hitung ulang klasemen per season berdasarkan semua Match.status=FINISHED.
-    Idempotent: akan 'clear & rebuild' Standing untuk league tsb.
+    Ambil MatchResult dari sebuah Match. None jika match tidak dihitung
+    di klasemen (status selain FINISHED).
+    """
+    if match is None or match.status != Match.Status.FINISHED:
+        return None
+    return MatchResult(
+        match.league_id, match.season, match.home_team_id, match.away_team_id,
+        match.home_score, match.away_score,
+    )
+
+
+def _result_rows(result):
+    """
+    Kontribusi satu hasil pertandingan untuk tim kandang dan tandang,
+    dalam bentuk {(league_id, season, team_id): {field: nilai}}.
+    """
+    hs, as_ = result.home_score, result.away_score
+    home = {"played": 1, "win": 0, "draw": 0, "loss": 0, "gf": hs, "ga": as_, "gd": hs - as_, "points": 0}
+    away = {"played": 1, "win": 0, "draw": 0, "loss": 0, "gf": as_, "ga": hs, "gd": as_ - hs, "points": 0}
+    if hs > as_:
+        home["win"], away["loss"], home["points"] = 1, 1, 3
+    elif hs < as_:
+        away["win"], home["loss"], away["points"] = 1, 1, 3
+    else:
+        home["draw"], away["draw"] = 1, 1
+        home["points"], away["points"] = 1, 1
+    return {
+        (result.league_id, result.season, result.home_team_id): home,
+        (result.league_id, result.season, result.away_team_id): away,
+    }
+
+
+@contextmanager
+def suspend_incremental_sync():
+    """
+    Matikan sementara update klasemen inkremental dari signal Match
+    (mis. saat import massal yang diakhiri dengan rebuild penuh).
+    """
+    depth = getattr(_sync_state, "suspended", 0)
+    _sync_state.suspended = depth + 1
+    try:
+        yield
+    finally:
+        _sync_state.suspended = depth
+
+
+def incremental_sync_enabled():
+    return not getattr(_sync_state, "suspended", 0)
+
+
+def apply_standings_delta(old, new):
+    """
+    Terapkan selisih klasemen akibat perubahan satu Match:
+    kontribusi hasil lama (old) dikeluarkan, hasil baru (new) dimasukkan.
+    old/new berupa MatchResult atau None. Hanya baris Standing
+    (league, season, team) yang terdampak yang disentuh, dalam satu transaksi.
+    """
+    if old == new:
+        return
+
+    deltas = defaultdict(lambda: dict.fromkeys(STANDING_FIELDS, 0))
+    for sign, result in ((-1, old), (1, new)):
+        if result is None:
+            continue
+        for key, row in _result_rows(result).items():
+            for field, value in row.items():
+                deltas[key][field] += sign * value
+
+    with transaction.atomic():
+        for (league_id, season, team_id), delta in sorted(deltas.items()):
+            if not any(delta.values()):
+                continue
+
+            standing = (Standing.objects.select_for_update()
+                        .filter(league_id=league_id, season=season, team_id=team_id)
+                        .first())
+            if standing is None:
+                if delta["played"] <= 0:
+                    # baris sudah tidak ada (mis. ikut terhapus cascade), tidak ada yang dikurangi
+                    continue
+                standing = Standing(league_id=league_id, season=season, team_id=team_id)
+
+            values = {f: getattr(standing, f) + delta[f] for f in STANDING_FIELDS}
+            if any(values[f] < 0 for f in ("played", "win", "draw", "loss", "gf", "ga")):
+                # Standing tidak konsisten dengan data Match (mis. diedit manual) -> rebuild penuh
+                logger.warning(
+                    "Standing %s/%s/%s tidak konsisten, klasemen liga dibangun ulang.",
+                    league_id, season, team_id,
+                )
+                transaction.on_commit(lambda lid=league_id: _repair_league(lid))
+                continue
+
+            if values["played"] == 0:
+                if standing.pk:
+                    standing.delete()
+                continue
+
+            for field, value in values.items():
+                setattr(standing, field, value)
+            standing.save()
+
+
+def _repair_league(league_id):
+    league = League.objects.filter(pk=league_id).first()
+    if league is not None:
+        recompute_standings_for_league(league)
+
+
+def compute_standings_table(league, season=None):
+    """
+    Hitung klasemen per (season, team_id) dari semua Match.status=FINISHED
+    (atau hanya satu season) tanpa menyimpan apa pun.
     """
-    # Kumpulkan data per (season, team)
     table = defaultdict(lambda: {
         "played": 0, "win": 0, "draw": 0, "loss": 0,
         "gf": 0, "ga": 0, "gd": 0, "points": 0,
@@ -15,6 +156,8 @@ def recompute_standings_for_league(league):
 
     matches = Match.objects.filter(league=league, status=Match.Status.FINISHED) \
                            .select_related("home_team", "away_team")
+    if season is not None:
+        matches = matches.filter(season=season)
 
     for m in matches:
         key_home = (m.season, m.home_team_id)
@@ -48,6 +191,127 @@ def recompute_standings_for_league(league):
     for k, v in table.items():
         v["gd"] = v["gf"] - v["ga"]
 
+    return table
+
+
+def compute_standings_table_numpy(league):
+    """
+    Versi vektor dari compute_standings_table: hanya mengambil
+    (season, home_team_id, away_team_id, home_score, away_score) lalu
+    menghitung semua season & tim sekaligus dengan NumPy (satu grouped pass).
+    """
+    rows = list(
+        Match.objects.filter(league=league, status=Match.Status.FINISHED)
+        .order_by()
+        .values_list("season", "home_team_id", "away_team_id", "home_score", "away_score")
+    )
+    if not rows:
+        return {}
+
+    n = len(rows)
+    seasons, home_ids, away_ids, home_scores, away_scores = zip(*rows)
+    season_labels, season_idx = np.unique(np.array(seasons), return_inverse=True)
+    team_ids, team_idx = np.unique(
+        np.fromiter(home_ids + away_ids, dtype=np.int64, count=2 * n), return_inverse=True
+    )
+    hs = np.fromiter(home_scores, dtype=np.int64, count=n)
+    as_ = np.fromiter(away_scores, dtype=np.int64, count=n)
+
+    # satu baris per (match, sisi): kandang lalu tandang
+    n_teams = len(team_ids)
+    keys = np.concatenate([season_idx, season_idx]) * n_teams + team_idx
+    gf = np.concatenate([hs, as_])
+    ga = np.concatenate([as_, hs])
+
+    groups, group_idx = np.unique(keys, return_inverse=True)
+    size = len(groups)
+    played = np.bincount(group_idx, minlength=size)
+    win = np.bincount(group_idx, weights=gf > ga, minlength=size).astype(np.int64)
+    draw = np.bincount(group_idx, weights=gf == ga, minlength=size).astype(np.int64)
+    goals_for = np.bincount(group_idx, weights=gf, minlength=size).astype(np.int64)
+    goals_against = np.bincount(group_idx, weights=ga, minlength=size).astype(np.int64)
+    loss = played - win - draw
+    points = 3 * win + draw
+
+    table = {}
+    for i, key in enumerate(groups.tolist()):
+        season = str(season_labels[key // n_teams])
+        team_id = int(team_ids[key % n_teams])
+        table[(season, team_id)] = {
+            "played": int(played[i]), "win": int(win[i]), "draw": int(draw[i]), "loss": int(loss[i]),
+            "gf": int(goals_for[i]), "ga": int(goals_against[i]),
+            "gd": int(goals_for[i] - goals_against[i]), "points": int(points[i]),
+        }
+    return table
+
+
+# engine yang bisa dipilih untuk rebuild penuh
+STANDINGS_ENGINES = {
+    "python": compute_standings_table,
+    "numpy": compute_standings_table_numpy,
+}
+
+
+def _form_letter(goals_for, goals_against):
+    if goals_for > goals_against:
+        return "W"
+    if goals_for < goals_against:
+        return "L"
+    return "D"
+
+
+def _form_fields(letters):
+    form = "".join(letters)
+    return {"form": form, "form_points": sum(FORM_POINTS[c] for c in form)}
+
+
+def compute_form_table(league, season=None):
+    """
+    Form guide semua tim per season dalam satu pass atas match FINISHED (urut date, id).
+    Mengembalikan {(season, team_id): {"form": ..., "form_points": ...}}.
+    """
+    matches = Match.objects.filter(league=league, status=Match.Status.FINISHED)
+    if season is not None:
+        matches = matches.filter(season=season)
+    recent = defaultdict(lambda: deque(maxlen=FORM_LENGTH))
+    for match_season, home, away, hs, as_ in (
+        matches.order_by("date", "id")
+        .values_list("season", "home_team_id", "away_team_id", "home_score", "away_score")
+    ):
+        recent[(match_season, home)].append(_form_letter(hs, as_))
+        recent[(match_season, away)].append(_form_letter(as_, hs))
+    return {key: _form_fields(letters) for key, letters in recent.items()}
+
+
+def refresh_team_form(league_id, season, team_id):
+    """Hitung ulang Standing.form satu tim dari FORM_LENGTH match FINISHED terakhirnya di season tsb."""
+    rows = list(
+        Match.objects.filter(league_id=league_id, season=season, status=Match.Status.FINISHED)
+        .filter(Q(home_team_id=team_id) | Q(away_team_id=team_id))
+        .order_by("-date", "-id")
+        .values_list("home_team_id", "home_score", "away_score")[:FORM_LENGTH]
+    )
+    letters = [
+        _form_letter(hs, as_) if home_id == team_id else _form_letter(as_, hs)
+        for home_id, hs, as_ in reversed(rows)
+    ]
+    fields = _form_fields(letters)
+    Standing.objects.filter(league_id=league_id, season=season, team_id=team_id).update(**fields)
+    return fields["form"]
+
+
+def recompute_standings_for_league(league, engine="python"):
+    """
+    Hitung ulang klasemen per season berdasarkan semua Match.status=FINISHED.
+    Idempotent: akan 'clear & rebuild' Standing untuk league tsb.
+    Dipakai sebagai jalur verifikasi/perbaikan untuk update inkremental.
+    engine: "python" (loop dict) atau "numpy" (vektor).
+    """
+    if engine not in STANDINGS_ENGINES:
+        raise ValueError(f"Engine klasemen tidak dikenal: {engine}")
+    table = STANDINGS_ENGINES[engine](league)
+    forms = compute_form_table(league)
+
     # simpan ke DB (clear & rebuild)
     with transaction.atomic():
         Standing.objects.filter(league=league).delete()
@@ -65,5 +329,281 @@ def recompute_standings_for_league(league):
                 ga=agg["ga"],
                 gd=agg["gd"],
                 points=agg["points"],
+                **forms.get((season, team_id), {}),
             ))
         Standing.objects.bulk_create(bulk, batch_size=1000)
+
+    # import/bulk write tidak lewat signal, jadi data turunan per season ikut di-reset
+    invalidate_league_timelines(league.pk)
+    StandingSnapshot.objects.filter(league=league).delete()
+    rebuild_head_to_head_for_league(league)
+    rebuild_team_season_stats_for_league(league)
+    rebuild_ratings_for_league(league.pk)
+    rebuild_seasons_for_league(league.pk)
+    invalidate_simulations(league.pk)
+    bump_data_version(league.pk)
+
+
+def refresh_season(league, season):
+    """
+    Bangun ulang data turunan satu season dari Match: Standing (+ form),
+    TeamSeasonStats, timeline & snapshot posisi. Dipakai setelah penulisan
+    massal tanpa signal (mis. batch API), cukup sekali per season terdampak.
+    """
+    table = compute_standings_table(league, season=season)
+    forms = compute_form_table(league, season=season)
+    with transaction.atomic():
+        Standing.objects.filter(league=league, season=season).delete()
+        Standing.objects.bulk_create([
+            Standing(league=league, season=season, team_id=team_id, **agg, **forms.get((season, team_id), {}))
+            for (_, team_id), agg in table.items()
+        ])
+        team_ids = {team_id for _, team_id in table} | set(
+            TeamSeasonStats.objects.filter(league=league, season=season).values_list("team_id", flat=True)
+        )
+        for team_id in sorted(team_ids):
+            refresh_team_season_stats(league.pk, season, team_id)
+
+    invalidate_season_timeline(league.pk, season)
+    StandingSnapshot.objects.filter(league=league, season=season).delete()
+
+
+def verify_standings_for_league(league):
+    """
+    Bandingkan Standing di DB dengan hasil hitung ulang penuh.
+    Mengembalikan list (season, team_id, expected, actual); list kosong berarti konsisten.
+    """
+    expected = {k: dict(v) for k, v in compute_standings_table(league).items()}
+    actual = {
+        (row["season"], row["team_id"]): {f: row[f] for f in STANDING_FIELDS}
+        for row in Standing.objects.filter(league=league).values("season", "team_id", *STANDING_FIELDS)
+    }
+
+    mismatches = []
+    for key in sorted(set(expected) | set(actual)):
+        if expected.get(key) != actual.get(key):
+            mismatches.append((key[0], key[1], expected.get(key), actual.get(key)))
+    return mismatches
+
+
+def rebuild_rank_history(league, season):
+    """
+    Bangun ulang StandingSnapshot (rank, poin, GD tiap tim setelah tiap matchday)
+    untuk satu season. Season hanya di-replay sekali (lewat SeasonTimeline),
+    lalu tiap matchday cukup mengambil irisan prefix sum-nya. Timeline dibangun
+    langsung dari DB, bukan dari cache: snapshot disimpan permanen, jadi tidak
+    boleh berasal dari timeline yang mungkin sudah basi.
+    """
+    timeline = build_season_timeline(league.pk, season)
+    names = dict(Team.objects.filter(pk__in=timeline.team_ids).values_list("id", "name"))
+
+    bulk = []
+    for matchday in range(1, timeline.max_matchday + 1):
+        rows = timeline.table_at(timeline.index_for_matchday(matchday), names)
+        for row in rows:
+            bulk.append(StandingSnapshot(
+                league=league,
+                season=season,
+                team_id=row["team_id"],
+                matchday=matchday,
+                rank=row["rank"],
+                points=row["points"],
+                gd=row["gd"],
+            ))
+
+    with transaction.atomic():
+        StandingSnapshot.objects.filter(league=league, season=season).delete()
+        StandingSnapshot.objects.bulk_create(bulk, batch_size=1000)
+    return len(bulk)
+
+
+def get_rank_history(league, season, team_ids=None):
+    """
+    Riwayat posisi per tim untuk satu season, dibangun ulang (sekali sweep)
+    jika snapshot belum ada atau sudah di-invalidate oleh perubahan match.
+    Season tanpa match FINISHED tidak punya snapshot; hasil kosong itu diketahui
+    dari SeasonTimeline yang ter-cache (invalidasinya sama), tanpa rebuild ulang.
+    Mengembalikan (matchdays, {team_id: [(matchday, rank, points, gd), ...]}).
+    """
+    qs = StandingSnapshot.objects.filter(league=league, season=season)
+    if not qs.exists():
+        if not get_season_timeline(league, season).max_matchday:
+            return [], {}
+        rebuild_rank_history(league, season)
+    if team_ids:
+        qs = qs.filter(team_id__in=team_ids)
+
+    history = defaultdict(list)
+    matchdays = set()
+    for team_id, matchday, rank, points, gd in (
+        qs.order_by("team_id", "matchday").values_list("team_id", "matchday", "rank", "points", "gd")
+    ):
+        history[team_id].append((matchday, rank, points, gd))
+        matchdays.add(matchday)
+    return sorted(matchdays), dict(history)
+
+
+def team_pair(team_a_id, team_b_id):
+    """Kunci pasangan tak berurut (id kecil, id besar)."""
+    return (team_a_id, team_b_id) if team_a_id < team_b_id else (team_b_id, team_a_id)
+
+
+def _head_to_head_from_rows(league_id, low, high, rows):
+    """
+    Bentuk HeadToHead dari baris (id, home_team_id, home_score, away_score)
+    yang sudah terurut dari pertemuan terbaru. None jika belum pernah bertemu.
+    """
+    if not rows:
+        return None
+    h2h = HeadToHead(league_id=league_id, team_low_id=low, team_high_id=high, meetings=len(rows))
+    for _, home_id, hs, as_ in rows:
+        low_score, high_score = (hs, as_) if home_id == low else (as_, hs)
+        h2h.low_goals += low_score
+        h2h.high_goals += high_score
+        if low_score > high_score:
+            h2h.low_wins += 1
+        elif low_score < high_score:
+            h2h.high_wins += 1
+        else:
+            h2h.draws += 1
+    h2h.recent_match_ids = [row[0] for row in rows[:H2H_RECENT_LIMIT]]
+    return h2h
+
+
+def refresh_head_to_head(team_a_id, team_b_id):
+    """
+    Hitung ulang rekap satu pasangan tim dari match FINISHED keduanya
+    (hanya baris milik pasangan itu, bukan seluruh Match).
+    """
+    low, high = team_pair(team_a_id, team_b_id)
+    rows = list(
+        Match.objects.filter(status=Match.Status.FINISHED)
+        .filter(Q(home_team_id=low, away_team_id=high) | Q(home_team_id=high, away_team_id=low))
+        .order_by("-date", "-id")
+        .values_list("league_id", "id", "home_team_id", "home_score", "away_score")
+    )
+    h2h = _head_to_head_from_rows(rows[0][0], low, high, [r[1:] for r in rows]) if rows else None
+
+    with transaction.atomic():
+        HeadToHead.objects.filter(team_low_id=low, team_high_id=high).delete()
+        if h2h is not None:
+            h2h.save()
+    return h2h
+
+
+def rebuild_head_to_head_for_league(league):
+    """Bangun ulang semua HeadToHead sebuah liga dalam satu pass atas Match."""
+    pairs = defaultdict(list)
+    for match_id, home_id, away_id, hs, as_ in (
+        Match.objects.filter(league=league, status=Match.Status.FINISHED)
+        .order_by("-date", "-id")
+        .values_list("id", "home_team_id", "away_team_id", "home_score", "away_score")
+    ):
+        pairs[team_pair(home_id, away_id)].append((match_id, home_id, hs, as_))
+
+    bulk = [_head_to_head_from_rows(league.pk, low, high, rows) for (low, high), rows in pairs.items()]
+    with transaction.atomic():
+        HeadToHead.objects.filter(league=league).delete()
+        HeadToHead.objects.bulk_create(bulk, batch_size=1000)
+    return len(bulk)
+
+
+def get_head_to_head(team_a, team_b):
+    """
+    Rekap pertemuan dari sudut pandang team_a, dibaca dari indeks HeadToHead.
+    Mengembalikan dict: meetings, draws, a_wins, b_wins, a_goals, b_goals, recent_match_ids.
+    """
+    low, high = team_pair(team_a.pk, team_b.pk)
+    h2h = HeadToHead.objects.filter(team_low_id=low, team_high_id=high).first()
+    if h2h is None:
+        h2h = HeadToHead(team_low_id=low, team_high_id=high)
+    a_is_low = team_a.pk == low
+    return {
+        "meetings": h2h.meetings,
+        "draws": h2h.draws,
+        "a_wins": h2h.low_wins if a_is_low else h2h.high_wins,
+        "b_wins": h2h.high_wins if a_is_low else h2h.low_wins,
+        "a_goals": h2h.low_goals if a_is_low else h2h.high_goals,
+        "b_goals": h2h.high_goals if a_is_low else h2h.low_goals,
+        "recent_match_ids": list(h2h.recent_match_ids),
+    }
+
+
+def _team_season_stats(league_id, season, team_id, matches, totals_for, totals_against):
+    def averages(totals):
+        return {name: round(totals[name] / matches, 2) if matches else 0 for name in MATCH_STAT_FIELDS}
+
+    def clean(totals):
+        return {name: round(totals.get(name) or 0, 2) for name in MATCH_STAT_FIELDS}
+
+    totals_for, totals_against = clean(totals_for), clean(totals_against)
+    return TeamSeasonStats(
+        league_id=league_id, season=season, team_id=team_id, matches=matches,
+        totals_for=totals_for, totals_against=totals_against,
+        avg_for=averages(totals_for), avg_against=averages(totals_against),
+    )
+
+
+def _team_season_totals(base):
+    """
+    Total statistik per (season, team_id) dari queryset match FINISHED `base`:
+    satu GROUP BY untuk sisi kandang dan satu untuk sisi tandang, lalu digabung.
+    """
+    combined = defaultdict(lambda: {"matches": 0, "for": defaultdict(int), "against": defaultdict(int)})
+    for side, other in (("home", "away"), ("away", "home")):
+        rows = base.values("season", f"{side}_team_id").annotate(
+            n=Count("id"),
+            **{f"for_{name}": Sum(f"{side}_{name}") for name in MATCH_STAT_FIELDS},
+            **{f"against_{name}": Sum(f"{other}_{name}") for name in MATCH_STAT_FIELDS},
+        )
+        for row in rows:
+            entry = combined[(row["season"], row[f"{side}_team_id"])]
+            entry["matches"] += row["n"]
+            for name in MATCH_STAT_FIELDS:
+                entry["for"][name] += row[f"for_{name}"] or 0
+                entry["against"][name] += row[f"against_{name}"] or 0
+    return combined
+
+
+def rebuild_team_season_stats_for_league(league):
+    """Bangun ulang TeamSeasonStats sebuah liga dengan agregasi di DB (_team_season_totals)."""
+    combined = _team_season_totals(Match.objects.filter(league=league, status=Match.Status.FINISHED).order_by())
+    bulk = [
+        _team_season_stats(league.pk, season, team_id, entry["matches"], entry["for"], entry["against"])
+        for (season, team_id), entry in combined.items()
+    ]
+    with transaction.atomic():
+        TeamSeasonStats.objects.filter(league=league).delete()
+        TeamSeasonStats.objects.bulk_create(bulk, batch_size=1000)
+    return len(bulk)
+
+
+def refresh_team_season_stats(league_id, season, team_id):
+    """
+    Hitung ulang TeamSeasonStats satu tim/season dalam satu query agregat:
+    kolom home_/away_ dipilih dengan Case/When sesuai sisi tim di tiap match.
+    """
+    is_home = Q(home_team_id=team_id)
+    agg = (
+        Match.objects.filter(league_id=league_id, season=season, status=Match.Status.FINISHED)
+        .filter(is_home | Q(away_team_id=team_id))
+        .aggregate(
+            n=Count("id"),
+            **{f"for_{name}": Sum(Case(When(is_home, then=F(f"home_{name}")), default=F(f"away_{name}")))
+               for name in MATCH_STAT_FIELDS},
+            **{f"against_{name}": Sum(Case(When(is_home, then=F(f"away_{name}")), default=F(f"home_{name}")))
+               for name in MATCH_STAT_FIELDS},
+        )
+    )
+
+    with transaction.atomic():
+        TeamSeasonStats.objects.filter(league_id=league_id, season=season, team_id=team_id).delete()
+        if not agg["n"]:
+            return None
+        stats = _team_season_stats(
+            league_id, season, team_id, agg["n"],
+            {name: agg[f"for_{name}"] for name in MATCH_STAT_FIELDS},
+            {name: agg[f"against_{name}"] for name in MATCH_STAT_FIELDS},
+        )
+        stats.save()
+    return stats
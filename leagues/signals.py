@@ -0,0 +1,157 @@
+# leagues/signals.py
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from .models import MATCH_STAT_FIELDS, League, Match, Season, Standing, StandingSnapshot, Team
+from .services import (
+    match_result, apply_standings_delta, incremental_sync_enabled, rebuild_head_to_head_for_league,
+    refresh_head_to_head, refresh_season, refresh_team_form, refresh_team_season_stats, team_pair,
+)
+from .dashboard import refresh_dashboard_snapshot
+from .deferred import on_commit_once
+from .live import publish_match_change
+from .ratings import sync_ratings
+from .seasons import invalidate_seasons, prune_season, sync_seasons
+from .simulation import invalidate_simulations, sync_simulations
+from .timeline import invalidate_season_timeline
+from .versioning import bump_data_version
+
+
+def _invalidate_season_caches(*matches):
+    # klasemen per-tanggal & riwayat posisi hanya bergantung pada match FINISHED di season tsb
+    seasons = {(m.league_id, m.season) for m in matches if m is not None and m.status == Match.Status.FINISHED}
+    for league_id, season in seasons:
+        invalidate_season_timeline(league_id, season)
+        StandingSnapshot.objects.filter(league_id=league_id, season=season).delete()
+
+
+def _refresh_head_to_heads(previous, current):
+    # rekap H2H hanya berubah jika hasil atau urutan (tanggal) match FINISHED berubah
+    if previous is not None and current is not None \
+            and match_result(previous) == match_result(current) and previous.date == current.date:
+        return
+    pairs = {team_pair(m.home_team_id, m.away_team_id)
+             for m in (previous, current) if m is not None and m.status == Match.Status.FINISHED}
+    for low, high in pairs:
+        refresh_head_to_head(low, high)
+
+
+def _finished_team_seasons(*matches):
+    # (league_id, season, team_id) kedua tim dari match FINISHED, terurut
+    targets = set()
+    for m in matches:
+        if m is not None and m.status == Match.Status.FINISHED:
+            targets.add((m.league_id, m.season, m.home_team_id))
+            targets.add((m.league_id, m.season, m.away_team_id))
+    return sorted(targets)
+
+
+def _refresh_forms(previous, current):
+    # form guide hanya berubah jika hasil atau urutan (tanggal) match FINISHED berubah
+    if previous is not None and current is not None \
+            and match_result(previous) == match_result(current) and previous.date == current.date:
+        return
+    for league_id, season, team_id in _finished_team_seasons(previous, current):
+        refresh_team_form(league_id, season, team_id)
+
+
+def _stats_key(match):
+    return (
+        match.status, match.league_id, match.season, match.home_team_id, match.away_team_id,
+        *(getattr(match, f"{side}_{name}") for side in ("home", "away") for name in MATCH_STAT_FIELDS),
+    )
+
+
+def _refresh_team_season_stats(previous, current):
+    # hitung ulang statistik season tim yang terdampak (sisi lama & baru)
+    if previous is not None and current is not None and _stats_key(previous) == _stats_key(current):
+        return
+    for league_id, season, team_id in _finished_team_seasons(previous, current):
+        refresh_team_season_stats(league_id, season, team_id)
+
+
+def _rebuild_season_after_delete(league_id, season):
+    # satu rebuild per season terdampak; liga bisa sudah ikut terhapus (cascade)
+    league = League.objects.filter(pk=league_id).first()
+    if league is None:
+        return
+    refresh_season(league, season)
+    prune_season(league_id, season)
+    refresh_dashboard_snapshot(league_id)
+
+
+def _rebuild_head_to_heads_after_delete(league_id):
+    league = League.objects.filter(pk=league_id).first()
+    if league is not None:
+        rebuild_head_to_head_for_league(league)
+
+
+@receiver(pre_save, sender=Match)
+def remember_previous_state(sender, instance, raw=False, **kwargs):
+    # simpan state lama (sebelum save) agar selisihnya bisa dihitung di post_save;
+    # baris dikunci sampai transaksi Match.save selesai (edit bersamaan menunggu)
+    if raw or not incremental_sync_enabled():
+        return
+    previous = None
+    if instance.pk:
+        previous = Match.objects.select_for_update().filter(pk=instance.pk).first()
+    instance._previous_state = previous
+
+
+@receiver(post_save, sender=Match)
+def sync_standings_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw or not incremental_sync_enabled():
+        return
+    previous = getattr(instance, "_previous_state", None)
+    sync_seasons(previous, instance)
+    apply_standings_delta(match_result(previous), match_result(instance))
+    _refresh_forms(previous, instance)
+    _invalidate_season_caches(previous, instance)
+    _refresh_head_to_heads(previous, instance)
+    _refresh_team_season_stats(previous, instance)
+    sync_ratings(previous, instance)
+    sync_simulations(previous, instance)
+    publish_match_change(previous, instance)
+    instance._previous_state = None
+
+
+@receiver(post_delete, sender=Match)
+def sync_standings_on_delete(sender, instance, **kwargs):
+    # hapus tim/liga meng-cascade ratusan match dalam satu transaksi: alih-alih rantai
+    # per match, data turunan dibangun ulang sekali per season / liga setelah commit
+    if not incremental_sync_enabled():
+        return
+    league_id, season = instance.league_id, instance.season
+    on_commit_once(("season-rebuild", league_id, season), lambda: _rebuild_season_after_delete(league_id, season))
+    if instance.status == Match.Status.FINISHED:
+        on_commit_once(("head-to-head", league_id), lambda: _rebuild_head_to_heads_after_delete(league_id))
+    on_commit_once(("simulations", league_id), lambda: invalidate_simulations(league_id))
+    sync_ratings(instance, None)
+
+
+@receiver(post_save, sender=Match)
+@receiver(post_delete, sender=Match)
+@receiver(post_save, sender=Team)
+@receiver(post_delete, sender=Team)
+@receiver(post_save, sender=Standing)
+@receiver(post_delete, sender=Standing)
+def bump_league_version(sender, instance, **kwargs):
+    # ETag API baca liga & key snapshot dashboard berubah setiap ada penulisan data liga
+    league_id = instance.league_id
+    bump_data_version(league_id)
+    # write-through: snapshot dashboard dibangun ulang sekali setelah commit perubahan Match
+    # (Standing ikut berubah lewat signal Match; import massal diakhiri rebuild sendiri)
+    if sender is Match and incremental_sync_enabled():
+        on_commit_once(("dashboard", league_id), lambda: refresh_dashboard_snapshot(league_id))
+
+
+@receiver(post_save, sender=League)
+@receiver(post_delete, sender=League)
+def bump_league_version_on_league_change(sender, instance, **kwargs):
+    bump_data_version(instance.pk)
+
+
+@receiver(post_save, sender=Season)
+@receiver(post_delete, sender=Season)
+def forget_cached_seasons(sender, instance, **kwargs):
+    # termasuk cascade saat liga dihapus
+    invalidate_seasons(instance.league_id)
@@ -0,0 +1,109 @@
+# leagues/similarity.py
+"""
+Pencarian "match yang mirip secara statistik" (nearest neighbour).
+
+Vektor statistik semua match FINISHED liga (24 kolom home_/away_) dinormalisasi
+z-score per kolom lalu disimpan sebagai matriks float32 .npy di disk, dengan
+nama yang memuat versi data liga: setelah ada penulisan, matriks dibangun ulang
+sekali pada request berikutnya. Request membuka file via mmap (di-cache per
+proses) dan menghitung jarak ke semua baris sekaligus, tanpa scan DB.
+
+Seperti ekspor kolumnar, file versi lama baru dihapus setelah tidak dipakai
+selama masa tenggang, dan file yang terhapus sebelum sempat dibuka dibangun ulang.
+"""
+import os
+import tempfile
+from functools import lru_cache
+
+import numpy as np
+
+from .columnar import OPEN_ATTEMPTS, export_dir, prune_stale_files, touch_if_exists
+from .models import MATCH_STAT_FIELDS, Match
+from .versioning import get_data_version
+
+STAT_COLUMNS = tuple(f"{side}_{name}" for side in ("home", "away") for name in MATCH_STAT_FIELDS)
+DEFAULT_SIMILAR_K = 10
+MAX_SIMILAR_K = 50
+
+
+class NotIndexed(LookupError):
+    """Match tidak ada di indeks (belum FINISHED atau bukan liga tsb)."""
+
+
+def _paths(league_id):
+    base = export_dir() / f"league-{league_id}"
+    version = get_data_version(league_id)
+    return base / f"similar.{version}.ids.npy", base / f"similar.{version}.npy"
+
+
+def build_stat_matrix(league_id):
+    """(ids int64, matriks float32 ter-normalisasi z-score per kolom)."""
+    rows = list(
+        Match.objects.filter(league_id=league_id, status=Match.Status.FINISHED)
+        .order_by("id").values_list("id", *STAT_COLUMNS)
+    )
+    if not rows:
+        return np.zeros(0, dtype=np.int64), np.zeros((0, len(STAT_COLUMNS)), dtype=np.float32)
+    data = np.array(rows, dtype=np.float64)
+    ids, stats = data[:, 0].astype(np.int64), data[:, 1:]
+    std = stats.std(axis=0)
+    std[std == 0] = 1.0  # kolom konstan (mis. belum terisi) tidak ikut membedakan
+    return ids, ((stats - stats.mean(axis=0)) / std).astype(np.float32)
+
+
+def _save_atomic(path, array):
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, array)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def ensure_similarity_index(league_id):
+    """Path (ids, matriks) untuk versi data terkini; dibangun jika belum ada."""
+    ids_path, matrix_path = _paths(league_id)
+    if touch_if_exists(ids_path) and touch_if_exists(matrix_path):
+        return ids_path, matrix_path
+
+    matrix_path.parent.mkdir(parents=True, exist_ok=True)
+    ids, matrix = build_stat_matrix(league_id)
+    _save_atomic(ids_path, ids)
+    _save_atomic(matrix_path, matrix)
+
+    prune_stale_files(matrix_path.parent, "similar.*.npy", keep={ids_path, matrix_path})
+    return ids_path, matrix_path
+
+
+@lru_cache(maxsize=8)
+def _load(ids_path, matrix_path):
+    ids = np.load(ids_path)
+    matrix = np.load(matrix_path, mmap_mode="r" if len(ids) else None)  # file kosong tidak bisa di-mmap
+    return ids, matrix, {int(pk): row for row, pk in enumerate(ids)}
+
+
+def similar_matches(league_id, match_id, k=DEFAULT_SIMILAR_K):
+    """k match FINISHED terdekat (jarak Euklides atas z-score): list (match_id, jarak)."""
+    for attempt in range(OPEN_ATTEMPTS):
+        try:
+            ids, matrix, rows = _load(*(str(p) for p in ensure_similarity_index(league_id)))
+            break
+        except FileNotFoundError:
+            # dihapus worker lain di antara pengecekan & open -> bangun ulang
+            if attempt == OPEN_ATTEMPTS - 1:
+                raise
+    row = rows.get(match_id)
+    if row is None:
+        raise NotIndexed(match_id)
+
+    diff = matrix - matrix[row]
+    distances = np.einsum("ij,ij->i", diff, diff)
+    distances[row] = np.inf  # match itu sendiri
+    k = min(k, len(ids) - 1)
+    if k <= 0:
+        return []
+    nearest = np.argpartition(distances, k - 1)[:k]
+    nearest = nearest[np.argsort(distances[nearest], kind="stable")]
+    return [(int(ids[i]), float(np.sqrt(distances[i]))) for i in nearest]
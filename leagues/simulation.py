@@ -0,0 +1,207 @@
+# leagues/simulation.py
+"""
+Simulasi Monte Carlo sisa season: peluang juara, 4 besar dan degradasi.
+
+Kekuatan tim (serangan/pertahanan) di-fit dari semua match FINISHED liga
+dengan bobot peluruhan waktu; gol tiap sisa match diambil dari distribusi
+Poisson. Klasemen awal adalah baris Standing season tsb. Simulasi berjalan
+per chunk ter-vektor NumPy dengan seed turunan SeedSequence(seed) per chunk,
+sehingga hasil identik berapa pun jumlah worker ProcessPoolExecutor.
+Hasil disimpan di SeasonSimulation dan dihapus saat hasil/jadwal match berubah.
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+import numpy as np
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
+from .models import Match, SeasonSimulation, Standing, Team
+
+DEFAULT_SIMULATIONS = 10000
+MAX_SIMULATIONS = 100000
+DEFAULT_SEED = 2024
+CHUNK_SIZE = 1000
+
+TOP_POSITIONS = 4
+RELEGATION_SPOTS = 3
+
+HALF_LIFE_DAYS = 365.0
+PRIOR_GOALS = 5.0  # pseudo-gol yang menarik kekuatan tim dengan sedikit data ke rata-rata
+
+
+def fit_team_strengths(league_id):
+    """
+    Model Poisson sederhana: lambda_kandang = rata2_kandang * serang_kandang * bertahan_tandang.
+    Mengembalikan ({team_id: (serang, bertahan)}, rata2 gol kandang, rata2 gol tandang).
+    """
+    rows = list(
+        Match.objects.filter(league_id=league_id, status=Match.Status.FINISHED)
+        .values_list("home_team_id", "away_team_id", "home_score", "away_score", "date")
+    )
+    if not rows:
+        return {}, 1.5, 1.2
+
+    home, away, hs, as_, dates = zip(*rows)
+    # acuan umur = match terakhir (bukan "sekarang") agar hasil deterministik
+    days = np.array([d.timestamp() for d in dates]) / 86400.0
+    w = 0.5 ** ((days.max() - days) / HALF_LIFE_DAYS)
+    hs, as_ = np.array(hs, dtype=float), np.array(as_, dtype=float)
+    home_avg, away_avg = (w * hs).sum() / w.sum(), (w * as_).sum() / w.sum()
+
+    teams, idx = np.unique(np.concatenate([home, away]), return_inverse=True)
+    h_idx, a_idx = idx[:len(rows)], idx[len(rows):]
+    scored, conceded, exp_scored, exp_conceded = (np.zeros(len(teams)) for _ in range(4))
+    np.add.at(scored, h_idx, w * hs)
+    np.add.at(scored, a_idx, w * as_)
+    np.add.at(conceded, h_idx, w * as_)
+    np.add.at(conceded, a_idx, w * hs)
+    np.add.at(exp_scored, h_idx, w * home_avg)
+    np.add.at(exp_scored, a_idx, w * away_avg)
+    np.add.at(exp_conceded, h_idx, w * away_avg)
+    np.add.at(exp_conceded, a_idx, w * home_avg)
+
+    attack = (scored + PRIOR_GOALS) / (exp_scored + PRIOR_GOALS)
+    defence = (conceded + PRIOR_GOALS) / (exp_conceded + PRIOR_GOALS)
+    strengths = {int(t): (float(a), float(d)) for t, a, d in zip(teams, attack, defence)}
+    return strengths, float(home_avg), float(away_avg)
+
+
+def simulate_chunk(base, home_idx, away_idx, lam_home, lam_away, n, seed):
+    """
+    n simulasi sisa match sekaligus. base: array (3, T) poin/selisih gol/gol awal.
+    Mengembalikan (counts[team, posisi], total poin akhir per tim).
+    """
+    rng = np.random.default_rng(seed)
+    n_teams, n_fixtures = base.shape[1], len(home_idx)
+    gh = rng.poisson(lam_home, size=(n, n_fixtures))
+    ga = rng.poisson(lam_away, size=(n, n_fixtures))
+
+    home_of = np.zeros((n_fixtures, n_teams))
+    away_of = np.zeros((n_fixtures, n_teams))
+    home_of[np.arange(n_fixtures), home_idx] = 1
+    away_of[np.arange(n_fixtures), away_idx] = 1
+
+    home_pts = np.where(gh > ga, 3, np.where(gh == ga, 1, 0))
+    away_pts = np.where(ga > gh, 3, np.where(gh == ga, 1, 0))
+    points = base[0] + home_pts @ home_of + away_pts @ away_of
+    gd = base[1] + (gh - ga) @ home_of + (ga - gh) @ away_of
+    gf = base[2] + gh @ home_of + ga @ away_of
+
+    # urutan klasemen: poin, selisih gol, gol, lalu undian
+    order = np.lexsort((rng.random((n, n_teams)), -gf, -gd, -points), axis=-1)
+    flat = order * n_teams + np.arange(n_teams)
+    counts = np.bincount(flat.ravel(), minlength=n_teams * n_teams).reshape(n_teams, n_teams)
+    return counts, points.sum(axis=0)
+
+
+def _init_worker():
+    # worker hasil spawn (Windows/macOS) perlu setup Django sebelum unpickle task
+    django.setup()
+
+
+def _chunk_sizes(simulations):
+    sizes = [CHUNK_SIZE] * (simulations // CHUNK_SIZE)
+    if simulations % CHUNK_SIZE:
+        sizes.append(simulations % CHUNK_SIZE)
+    return sizes
+
+
+def run_simulation(league_id, season, simulations=DEFAULT_SIMULATIONS, seed=DEFAULT_SEED, workers=1):
+    """Simulasikan sisa season; dict hasil per tim (tanpa menyimpan apa pun)."""
+    standings = list(Standing.objects.filter(league_id=league_id, season=season)
+                     .values_list("team_id", "points", "gd", "gf"))
+    fixtures = list(Match.objects.filter(league_id=league_id, season=season)
+                    .exclude(status=Match.Status.FINISHED).values_list("home_team_id", "away_team_id"))
+    team_ids = sorted({row[0] for row in standings} | {t for pair in fixtures for t in pair})
+    n_teams = len(team_ids)
+    position = {team_id: i for i, team_id in enumerate(team_ids)}
+
+    base = np.zeros((3, n_teams))
+    for team_id, points, gd, gf in standings:
+        base[:, position[team_id]] = (points, gd, gf)
+
+    strengths, home_avg, away_avg = fit_team_strengths(league_id)
+    attack = np.array([strengths.get(t, (1.0, 1.0))[0] for t in team_ids])
+    defence = np.array([strengths.get(t, (1.0, 1.0))[1] for t in team_ids])
+    home_idx = np.array([position[h] for h, _ in fixtures], dtype=np.intp)
+    away_idx = np.array([position[a] for _, a in fixtures], dtype=np.intp)
+    lam_home = home_avg * attack[home_idx] * defence[away_idx]
+    lam_away = away_avg * attack[away_idx] * defence[home_idx]
+
+    sizes = _chunk_sizes(simulations)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = [(base, home_idx, away_idx, lam_home, lam_away, n, s) for n, s in zip(sizes, seeds)]
+    counts, points_sum = np.zeros((n_teams, n_teams), dtype=np.int64), np.zeros(n_teams)
+    if workers > 1 and len(args) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(args)), initializer=_init_worker) as pool:
+            parts = list(pool.map(simulate_chunk, *zip(*args)))
+    else:
+        parts = [simulate_chunk(*a) for a in args]
+    for part_counts, part_points in parts:
+        counts += part_counts
+        points_sum += part_points
+
+    names = dict(Team.objects.filter(pk__in=team_ids).values_list("pk", "name"))
+    probs = counts / max(simulations, 1)
+    relegation_from = max(n_teams - RELEGATION_SPOTS, TOP_POSITIONS) if n_teams > RELEGATION_SPOTS else n_teams
+    teams = []
+    for i, team_id in enumerate(team_ids):
+        teams.append({
+            "team_id": team_id,
+            "team_name": names.get(team_id, ""),
+            "points": int(base[0, i]),
+            "expected_points": round(points_sum[i] / max(simulations, 1), 2),
+            "expected_position": round(float((probs[i] * np.arange(1, n_teams + 1)).sum()), 2),
+            "title": round(float(probs[i, 0]), 4) if n_teams else 0.0,
+            "top4": round(float(probs[i, :TOP_POSITIONS].sum()), 4),
+            "relegation": round(float(probs[i, relegation_from:].sum()), 4),
+            "positions": [round(float(p), 4) for p in probs[i]],
+        })
+    teams.sort(key=lambda t: (t["expected_position"], t["team_id"]))
+    return {
+        "season": season,
+        "simulations": simulations,
+        "seed": seed,
+        "remaining_matches": len(fixtures),
+        "teams": teams,
+    }
+
+
+def get_season_simulation(league, season, simulations=DEFAULT_SIMULATIONS, seed=DEFAULT_SEED, workers=None):
+    """Hasil tersimpan jika masih berlaku; jika belum ada, disimulasikan lalu disimpan."""
+    league_id = getattr(league, "pk", league)
+    params = {"league_id": league_id, "season": season, "simulations": simulations, "seed": seed}
+    stored = SeasonSimulation.objects.filter(**params).values_list("result", flat=True).first()
+    if stored is not None:
+        return stored
+
+    if workers is None:
+        workers = getattr(settings, "LEAGUES_SIMULATION_WORKERS", 1)
+    result = run_simulation(league_id, season, simulations, seed, workers)
+    try:
+        with transaction.atomic():
+            SeasonSimulation.objects.update_or_create(**params, defaults={"result": result})
+    except IntegrityError:
+        pass  # request lain menyimpan hasil yang sama lebih dulu
+    return result
+
+
+def invalidate_simulations(league_id):
+    SeasonSimulation.objects.filter(league_id=league_id).delete()
+
+
+def _simulation_key(match):
+    if match is None:
+        return None
+    return (match.league_id, match.season, match.status, match.date,
+            match.home_team_id, match.away_team_id, match.home_score, match.away_score)
+
+
+def sync_simulations(previous, current):
+    """Dipanggil signal Match: hasil simulasi basi jika hasil atau jadwal match berubah."""
+    old, new = _simulation_key(previous), _simulation_key(current)
+    if old == new:
+        return
+    for league_id in sorted({key[0] for key in (old, new) if key is not None}):
+        invalidate_simulations(league_id)
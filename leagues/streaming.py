@@ -0,0 +1,59 @@
+# leagues/streaming.py
+"""
+Respons JSON bertahap untuk endpoint dump (format serializer Django).
+
+Queryset dibaca per chunk lewat .iterator(chunk_size=...) dan tiap chunk
+langsung diserialisasi lalu dikirim, sehingga memori tetap datar berapa pun
+jumlah barisnya dan byte pertama terkirim sebelum query selesai dibaca.
+"""
+import json
+import re
+from itertools import islice
+
+from django.core import serializers
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_sequence
+
+STREAM_CHUNK_SIZE = 500
+
+_accepts_gzip = re.compile(r"\bgzip\b")
+
+
+def _chunks(rows, size):
+    rows = iter(rows)
+    while chunk := list(islice(rows, size)):
+        yield chunk
+
+
+def iter_serialized_json(rows, chunk_size=None):
+    """
+    Hasil sama dengan serializers.serialize("json", rows), tetapi sebagai
+    generator string per chunk. rows boleh queryset (dibaca via iterator) atau list.
+    """
+    chunk_size = chunk_size or STREAM_CHUNK_SIZE
+    if hasattr(rows, "iterator"):
+        rows = rows.iterator(chunk_size=chunk_size)
+    yield "["
+    first = True
+    for chunk in _chunks(rows, chunk_size):
+        parts = [json.dumps(obj, cls=DjangoJSONEncoder) for obj in serializers.serialize("python", chunk)]
+        yield ("" if first else ", ") + ", ".join(parts)
+        first = False
+    yield "]"
+
+
+def streaming_json_response(request, rows, chunk_size=None):
+    """
+    StreamingHttpResponse berisi dump JSON rows. Jika client mengirim
+    Accept-Encoding: gzip, tiap chunk dikompres (gzip streaming).
+    """
+    content = (part.encode() for part in iter_serialized_json(rows, chunk_size))
+    gzip = bool(_accepts_gzip.search(request.headers.get("accept-encoding", "")))
+    response = StreamingHttpResponse(compress_sequence(content) if gzip else content,
+                                     content_type="application/json")
+    if gzip:
+        response["Content-Encoding"] = "gzip"
+    patch_vary_headers(response, ("Accept-Encoding",))
+    return response
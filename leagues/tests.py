@@ -1,30 +1,60 @@
 # leagues/tests.py
 
 import datetime
+import asyncio
+import io
 import json # <-- Tambahkan untuk tes AJAX
-from django.test import TestCase, Client, RequestFactory
+import numpy as np
+from django.test import AsyncRequestFactory, TestCase, Client, RequestFactory, override_settings
 from django.contrib.auth.models import User, Permission
 from django.contrib.contenttypes.models import ContentType
 from django.urls import reverse
 from django.utils import timezone
 from django.db import IntegrityError
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.contrib.messages import get_messages
 from django.contrib import admin
 from unittest.mock import patch
+from asgiref.sync import async_to_sync
+from django.db.models import F
 
-from .models import League, Team, Match, Standing
+from .models import League, Team, Match, Standing, StandingSnapshot, HeadToHead, TeamSeasonStats, TeamRating, RatingHistory, Season, SeasonSimulation, DashboardCacheStats
 from .forms import MatchUpdateForm, MatchCreateForm
-from .services import recompute_standings_for_league
+from .services import (
+    recompute_standings_for_league, verify_standings_for_league, suspend_incremental_sync,
+    compute_standings_table, compute_standings_table_numpy,
+    rebuild_rank_history, get_rank_history,
+    get_head_to_head, rebuild_head_to_head_for_league,
+    rebuild_team_season_stats_for_league, compute_form_table,
+)
+from .timeline import standings_as_of, get_season_timeline
+from .ratings import ELO_BASE, rebuild_ratings_for_league
+from . import columnar
+from .columnar import STALE_GRACE_SECONDS, export_path, get_columnar_export, open_columnar_export
+from .versioning import bump_data_version, get_data_version
+from .analytics import compute_season_analytics, pearson_from_sums
+from . import similarity
+from .similarity import build_stat_matrix, ensure_similarity_index, similar_matches
+from .simulation import get_season_simulation, run_simulation
+from .live import CacheBroker, LocalBroker, get_broker
+from .search import TeamSearchIndex, get_team_search_index, normalize_team_name
+from .seasons import get_latest_season, get_seasons, season_start_year
+from .dashboard import _snapshot_key, dashboard_cache_stats, get_dashboard_snapshot, reset_dashboard_cache_stats
 # Import admin models untuk diuji
 from .admin import LeagueAdmin, TeamAdmin, MatchAdmin, StandingAdmin
 # Import view untuk tes AJAX langsung (opsional, tapi bisa berguna)
-from .views import _is_ajax
+from .views import _is_ajax, live_scores_sse
 
 from io import StringIO
 from django.core.management import call_command, CommandError
 from django.contrib.auth.models import Group
 import tempfile
 import os
+import time
+from importlib import import_module
+from django.apps import apps as django_apps
 
 # Fungsi helper untuk membuat data dummy agar tidak duplikat
 def create_test_data():
@@ -239,6 +269,1461 @@ class ServicesTests(TestCase):
         self.assertEqual(s_t2_new.draw, 1) # Draw bertambah 1
         self.assertEqual(s_t2_new.gd, -4) # GD tidak berubah (2-2)
 
+    def test_numpy_engine_matches_python_engine(self):
+        """Engine vektor (numpy) harus menghasilkan tabel yang sama dengan loop dict."""
+        expected = {k: dict(v) for k, v in compute_standings_table(self.league).items()}
+        self.assertEqual(compute_standings_table_numpy(self.league), expected)
+
+        recompute_standings_for_league(self.league, engine="numpy")
+        self.assertEqual(verify_standings_for_league(self.league), [])
+        self.assertEqual(Standing.objects.get(team=self.t1, season="2024/2025").points, 4)
+
+    def test_numpy_engine_empty_league(self):
+        empty = League.objects.create(name="Kosong")
+        self.assertEqual(compute_standings_table_numpy(empty), {})
+
+    def test_recompute_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            recompute_standings_for_league(self.league, engine="fortran")
+
+
+class IncrementalStandingsTests(TestCase):
+    """Tes update klasemen inkremental lewat signal Match (create/update/delete)."""
+    def setUp(self):
+        self.data = create_test_data()
+        self.league = self.data['league']
+        self.t1 = self.data['t1']
+        self.t2 = self.data['t2']
+        self.t3 = self.data['t3']
+
+    def assertConsistent(self):
+        self.assertEqual(verify_standings_for_league(self.league), [])
+
+    def test_create_matches_builds_standings(self):
+        """Match FINISHED yang dibuat langsung masuk klasemen tanpa recompute."""
+        self.assertConsistent()
+        s_t1 = Standing.objects.get(team=self.t1, season="2024/2025")
+        self.assertEqual(s_t1.points, 4)
+        self.assertEqual(s_t1.played, 2)
+
+    def test_update_score_applies_delta(self):
+        """Koreksi skor: hasil lama dikeluarkan, hasil baru dimasukkan."""
+        m1 = self.data['m1']
+        m1.home_score, m1.away_score = 0, 2 # t1 3-1 t2 -> t1 0-2 t2
+        m1.save()
+        self.assertConsistent()
+        s_t1 = Standing.objects.get(team=self.t1, season="2024/2025")
+        s_t2 = Standing.objects.get(team=self.t2, season="2024/2025")
+        self.assertEqual((s_t1.win, s_t1.loss, s_t1.points, s_t1.gd), (0, 1, 1, -2))
+        self.assertEqual((s_t2.win, s_t2.loss, s_t2.points, s_t2.gd), (1, 1, 3, 0))
+
+    def test_status_and_season_changes(self):
+        """Match yang berubah status/season berpindah atau keluar dari klasemen."""
+        m_old = self.data['m_old']
+        m_old.status = Match.Status.POSTPONED
+        m_old.save()
+        self.assertConsistent()
+        self.assertFalse(Standing.objects.filter(season="2023/2024").exists())
+
+        m_up = self.data['m_upcoming']
+        m_up.status = Match.Status.FINISHED
+        m_up.season = "2023/2024"
+        m_up.home_score, m_up.away_score = 1, 1
+        m_up.save()
+        self.assertConsistent()
+        self.assertEqual(Standing.objects.get(team=self.t2, season="2023/2024").draw, 1)
+
+    def test_failed_delta_rolls_back_match_save(self):
+        """Save match & selisih klasemen satu transaksi: jika delta gagal, match tidak berubah."""
+        m1 = self.data['m1']
+        m1.home_score, m1.away_score = 0, 2
+        with patch('leagues.signals.apply_standings_delta', side_effect=RuntimeError("gagal")):
+            with self.assertRaises(RuntimeError):
+                m1.save()
+        m1.refresh_from_db()
+        self.assertEqual((m1.home_score, m1.away_score), (3, 1))
+        self.assertConsistent()
+
+    def test_previous_state_read_with_row_lock(self):
+        """State lama dibaca dengan select_for_update di dalam transaksi save."""
+        m1 = self.data['m1']
+        m1.home_score = 5
+        with patch.object(Match.objects, 'select_for_update', wraps=Match.objects.select_for_update) as lock:
+            m1.save()
+        lock.assert_called_once_with()
+        self.assertConsistent()
+
+    def test_delete_match_removes_contribution(self):
+        """Hapus match mengurangi klasemen dua tim terkait."""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.data['m3'].delete()
+        self.assertConsistent()
+        self.assertEqual(Standing.objects.get(team=self.t3, season="2024/2025").played, 1)
+
+    def test_cascade_delete_rebuilds_once_per_season(self):
+        """Hapus tim (cascade match) membangun ulang tiap season terdampak sekali, setelah commit."""
+        from . import signals
+        with patch.object(signals, 'refresh_season', wraps=signals.refresh_season) as rebuild, \
+                patch.object(signals, 'rebuild_head_to_head_for_league',
+                             wraps=signals.rebuild_head_to_head_for_league) as h2h:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.t1.delete()
+                rebuild.assert_not_called()
+        self.assertEqual(sorted(c.args[1] for c in rebuild.call_args_list), ["2023/2024", "2024/2025"])
+        self.assertEqual(h2h.call_count, 1)
+        self.assertConsistent()
+        self.assertEqual(Standing.objects.get(team=self.t3, season="2024/2025").points, 3)
+        self.assertFalse(Season.objects.filter(league=self.league, name="2023/2024").exists())
+        self.assertEqual(HeadToHead.objects.filter(league=self.league).count(), 1)
+
+    def test_suspend_incremental_sync(self):
+        """Di dalam suspend_incremental_sync, klasemen tidak disentuh sampai rebuild."""
+        with suspend_incremental_sync():
+            Match.objects.create(
+                league=self.league, season="2024/2025", date=timezone.now(),
+                home_team=self.t2, away_team=self.t3, status=Match.Status.FINISHED,
+                home_score=4, away_score=0
+            )
+        self.assertNotEqual(verify_standings_for_league(self.league), [])
+        recompute_standings_for_league(self.league)
+        self.assertConsistent()
+
+
+class TimelineTests(TestCase):
+    """Tes klasemen per tanggal/matchday (prefix sum per season)."""
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.data = create_test_data()
+        self.league = self.data['league']
+        self.t1 = self.data['t1']
+        self.t2 = self.data['t2']
+        self.t3 = self.data['t3']
+        # urutan 2024/2025: m3 (t2 0-2 t3), m2 (t1 1-1 t3), m1 (t1 3-1 t2)
+
+    def test_final_table_matches_standings(self):
+        rows, info = standings_as_of(self.league, "2024/2025")
+        expected = list(Standing.objects.filter(league=self.league, season="2024/2025")
+                        .values_list("team_id", "points", "gd"))
+        self.assertEqual([(r["team_id"], r["points"], r["gd"]) for r in rows], expected)
+        self.assertEqual(info["matches_counted"], 3)
+        self.assertEqual(info["max_matchday"], 3) # 3 tim -> 1 match per matchday
+
+    def test_table_by_matchday_and_date(self):
+        rows, info = standings_as_of(self.league, "2024/2025", matchday=1)
+        self.assertEqual(info["matches_counted"], 1)
+        self.assertEqual(rows[0]["team_id"], self.t3.pk)
+        self.assertEqual((rows[0]["points"], rows[0]["played"], rows[0]["rank"]), (3, 1, 1))
+        # Alpha belum main, tetap muncul dengan 0 poin
+        alpha = next(r for r in rows if r["team_id"] == self.t1.pk)
+        self.assertEqual((alpha["played"], alpha["points"]), (0, 0))
+
+        day = self.data['m2'].date.date()
+        rows, info = standings_as_of(self.league, "2024/2025", day=day)
+        self.assertEqual(info["matches_counted"], 2)
+        self.assertEqual(info["matchday"], 2)
+        self.assertEqual(next(r for r in rows if r["team_id"] == self.t3.pk)["points"], 4)
+
+        rows, info = standings_as_of(self.league, "2024/2025", day=day - datetime.timedelta(days=30))
+        self.assertEqual(info["matches_counted"], 0)
+        self.assertIsNone(info["last_match_date"])
+
+    def test_timeline_refreshes_on_match_change(self):
+        standings_as_of(self.league, "2024/2025", matchday=1) # isi cache
+        m3 = self.data['m3']
+        m3.home_score, m3.away_score = 5, 0 # t2 menang
+        with self.captureOnCommitCallbacks(execute=True):
+            m3.save()
+        rows, _ = standings_as_of(self.league, "2024/2025", matchday=1)
+        self.assertEqual(rows[0]["team_id"], self.t2.pk)
+
+        # update massal tanpa signal -> cache baru di-reset oleh rebuild klasemen per liga
+        Match.objects.filter(pk=m3.pk).update(status=Match.Status.POSTPONED)
+        self.assertEqual(get_season_timeline(self.league, "2024/2025").match_count, 3)
+        with self.captureOnCommitCallbacks(execute=True):
+            recompute_standings_for_league(self.league)
+        self.assertEqual(get_season_timeline(self.league, "2024/2025").match_count, 2)
+
+    def test_timeline_follows_shared_version(self):
+        # penulisan di worker lain hanya terlihat lewat versi data liga di DB
+        self.assertEqual(get_season_timeline(self.league, "2024/2025").match_count, 3)
+        Match.objects.filter(pk=self.data['m3'].pk).update(status=Match.Status.POSTPONED)
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_data_version(self.league.pk)
+        self.assertEqual(get_season_timeline(self.league, "2024/2025").match_count, 2)
+
+    def test_standings_flutter_as_of(self):
+        url = reverse('leagues:standings_flutter')
+        response = self.client.get(url, {'season': '2024/2025', 'matchday': 1})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['matchday'], 1)
+        self.assertEqual(data['standings'][0]['team_name'], "Charlie Team")
+        self.assertEqual(data['standings'][0]['rank'], 1)
+
+        response = self.client.get(url, {'season': '2024/2025', 'date': 'kemarin'})
+        self.assertEqual(response.status_code, 400)
+
+        # tanpa parameter: tetap dari tabel Standing (kompatibel)
+        response = self.client.get(url, {'season': '2024/2025'})
+        self.assertNotIn('matchday', response.json())
+
+
+class RankHistoryTests(TestCase):
+    """Tes StandingSnapshot (riwayat posisi per matchday)."""
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.data = create_test_data()
+        self.league = self.data['league']
+        self.t1 = self.data['t1']
+        self.t2 = self.data['t2']
+        self.t3 = self.data['t3']
+
+    def test_rebuild_replays_season_once(self):
+        from . import timeline
+        with patch('leagues.services.build_season_timeline', wraps=timeline.build_season_timeline) as build:
+            created = rebuild_rank_history(self.league, "2024/2025")
+        self.assertEqual(build.call_count, 1)
+        self.assertEqual(created, 9) # 3 matchday x 3 tim
+
+        # matchday 1: hanya m3 (t2 0-2 t3) -> t3 peringkat 1
+        md1 = StandingSnapshot.objects.get(league=self.league, season="2024/2025", matchday=1, rank=1)
+        self.assertEqual((md1.team, md1.points, md1.gd), (self.t3, 3, 2))
+        # matchday terakhir sama dengan Standing
+        last = StandingSnapshot.objects.get(league=self.league, season="2024/2025", matchday=3, team=self.t2)
+        self.assertEqual(last.points, Standing.objects.get(season="2024/2025", team=self.t2).points)
+
+    def test_snapshots_not_built_from_cached_timeline(self):
+        # timeline ter-cache basi (mis. versi belum naik di worker ini) tidak boleh ikut disimpan
+        self.assertEqual(get_season_timeline(self.league, "2024/2025").match_count, 3)
+        Match.objects.filter(pk=self.data['m3'].pk).update(status=Match.Status.POSTPONED)
+        matchdays, history = get_rank_history(self.league, "2024/2025")
+        self.assertEqual(matchdays, [1, 2])
+        self.assertEqual([r[1] for r in history[self.t1.pk]], [1, 1])
+
+    def test_empty_season_not_rebuilt_every_call(self):
+        self.assertEqual(get_rank_history(self.league, "1999/2000"), ([], {}))
+        # cek snapshot + versi data liga (key timeline)
+        with patch('leagues.services.rebuild_rank_history') as rebuild, self.assertNumQueries(2):
+            self.assertEqual(get_rank_history(self.league, "1999/2000"), ([], {}))
+        rebuild.assert_not_called()
+
+    def test_history_invalidated_and_rebuilt_lazily(self):
+        matchdays, history = get_rank_history(self.league, "2024/2025")
+        self.assertEqual(matchdays, [1, 2, 3])
+        self.assertEqual([r[1] for r in history[self.t3.pk]], [1, 1, 2])
+
+        m1 = self.data['m1']
+        m1.home_score, m1.away_score = 0, 0
+        with self.captureOnCommitCallbacks(execute=True):
+            m1.save()
+        self.assertFalse(StandingSnapshot.objects.filter(league=self.league, season="2024/2025").exists())
+        # season lain tidak tersentuh
+        get_rank_history(self.league, "2023/2024")
+        m1.save()
+        self.assertTrue(StandingSnapshot.objects.filter(league=self.league, season="2023/2024").exists())
+
+        _, history = get_rank_history(self.league, "2024/2025", team_ids=[self.t3.pk])
+        self.assertEqual(list(history), [self.t3.pk])
+        self.assertEqual([r[1] for r in history[self.t3.pk]], [1, 1, 1])
+
+    def test_standings_history_endpoint(self):
+        url = reverse('leagues:standings_history_flutter')
+        response = self.client.get(url, {'season': '2024/2025'})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['matchdays'], [1, 2, 3])
+        self.assertEqual(len(data['teams']), 3)
+        charlie = next(t for t in data['teams'] if t['team_id'] == self.t3.pk)
+        self.assertEqual(charlie['team_name'], "Charlie Team")
+        self.assertEqual(charlie['rank'], [1, 1, 2])
+        self.assertEqual(charlie['points'], [3, 4, 4])
+
+        response = self.client.get(url, {'team': self.t1.pk})
+        self.assertEqual(response.json()['season'], '2024/2025') # default season terbaru
+        self.assertEqual([t['team_id'] for t in response.json()['teams']], [self.t1.pk])
+
+        self.assertEqual(self.client.get(url, {'team': 'abc'}).status_code, 400)
+
+
+class HeadToHeadTests(TestCase):
+    """Tes indeks HeadToHead dan endpoint api/h2h/."""
+    def setUp(self):
+        self.data = create_test_data()
+        self.t1 = self.data['t1']
+        self.t2 = self.data['t2']
+        self.t3 = self.data['t3']
+
+    def test_migration_backfill(self):
+        """Data migration 0003 mengisi rekap yang sama dengan indeks yang dijaga signal."""
+        fields = ('team_low', 'team_high', 'meetings', 'low_wins', 'high_wins', 'draws',
+                  'low_goals', 'high_goals', 'recent_match_ids')
+        expected = sorted(HeadToHead.objects.values_list(*fields))
+        HeadToHead.objects.all().delete()
+        import_module('leagues.migrations.0003_headtohead').backfill_head_to_head(django_apps, None)
+        self.assertEqual(sorted(HeadToHead.objects.values_list(*fields)), expected)
+
+    def test_maintained_on_create_edit_delete(self):
+        h2h = get_head_to_head(self.t2, self.t1)
+        self.assertEqual(h2h['meetings'], 2)
+        self.assertEqual((h2h['a_wins'], h2h['b_wins'], h2h['draws']), (0, 2, 0))
+        self.assertEqual((h2h['a_goals'], h2h['b_goals']), (1, 8))
+        self.assertEqual(h2h['recent_match_ids'], [self.data['m1'].pk, self.data['m_old'].pk])
+
+        # match SCHEDULED selesai -> masuk rekap sebagai pertemuan terbaru
+        upcoming = self.data['m_upcoming']
+        upcoming.status, upcoming.home_score, upcoming.away_score = Match.Status.FINISHED, 0, 2
+        upcoming.save()
+        h2h = get_head_to_head(self.t1, self.t2)
+        self.assertEqual((h2h['meetings'], h2h['a_wins'], h2h['b_wins']), (3, 2, 1))
+        self.assertEqual(h2h['recent_match_ids'][0], upcoming.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.data['m_old'].delete()
+        h2h = get_head_to_head(self.t1, self.t2)
+        self.assertEqual((h2h['meetings'], h2h['a_goals'], h2h['b_goals']), (2, 3, 3))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.data['m2'].delete()
+        self.assertEqual(get_head_to_head(self.t1, self.t3)['meetings'], 0)
+        self.assertFalse(HeadToHead.objects.filter(team_low=self.t1, team_high=self.t3).exists())
+
+    def test_rebuild_matches_incremental(self):
+        expected = {(h.team_low_id, h.team_high_id): (h.meetings, h.low_wins, h.high_wins, h.draws, h.recent_match_ids)
+                    for h in HeadToHead.objects.all()}
+        self.assertEqual(rebuild_head_to_head_for_league(self.data['league']), 3)
+        rebuilt = {(h.team_low_id, h.team_high_id): (h.meetings, h.low_wins, h.high_wins, h.draws, h.recent_match_ids)
+                   for h in HeadToHead.objects.all()}
+        self.assertEqual(rebuilt, expected)
+
+    def test_h2h_endpoint(self):
+        url = reverse('leagues:head_to_head_flutter', args=[self.t1.pk, self.t2.pk])
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['team_a'], {"id": self.t1.pk, "name": "Alpha Team", "wins": 2, "goals": 8})
+        self.assertEqual(data['team_b']['wins'], 0)
+        self.assertEqual(data['meetings'], 2)
+
+        same = reverse('leagues:head_to_head_flutter', args=[self.t1.pk, self.t1.pk])
+        self.assertEqual(self.client.get(same).status_code, 400)
+        missing = reverse('leagues:head_to_head_flutter', args=[self.t1.pk, 9999])
+        self.assertEqual(self.client.get(missing).status_code, 404)
+
+
+class TeamSeasonStatsTests(TestCase):
+    """Tes tabel TeamSeasonStats dan endpoint api/teams/<id>/stats/."""
+    def setUp(self):
+        self.data = create_test_data()
+        self.t1 = self.data['t1']
+        m1 = self.data['m1']
+        m1.home_shots, m1.away_shots, m1.home_possession, m1.away_possession = 10, 4, 60.0, 40.0
+        m1.save()
+        m2 = self.data['m2']
+        m2.home_shots, m2.away_shots, m2.home_possession, m2.away_possession = 6, 8, 45.5, 54.5
+        m2.save()
+
+    def _stats(self, team, season="2024/2025"):
+        return TeamSeasonStats.objects.get(league=self.data['league'], season=season, team=team)
+
+    def test_maintained_on_edit_and_delete(self):
+        stats = self._stats(self.t1)
+        self.assertEqual(stats.matches, 2)
+        self.assertEqual((stats.totals_for['shots'], stats.totals_against['shots']), (16, 12))
+        self.assertEqual((stats.avg_for['shots'], stats.avg_against['shots']), (8, 6))
+        self.assertEqual(stats.avg_for['possession'], 52.75)
+        # t3 tandang di m2 -> "for" diambil dari kolom away_
+        self.assertEqual(self._stats(self.data['t3']).totals_for['shots'], 8)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.data['m1'].delete()
+        stats = self._stats(self.t1)
+        self.assertEqual((stats.matches, stats.totals_for['shots']), (1, 6))
+
+        self.data['m2'].status = Match.Status.POSTPONED
+        self.data['m2'].save()
+        self.assertFalse(TeamSeasonStats.objects.filter(team=self.t1, season="2024/2025").exists())
+
+    def test_migration_backfill(self):
+        """Data migration 0004 mengisi statistik yang sama dengan tabel yang dijaga signal."""
+        fields = ('league', 'season', 'team', 'matches', 'totals_for', 'totals_against', 'avg_for', 'avg_against')
+        expected = sorted(TeamSeasonStats.objects.values_list(*fields), key=lambda row: row[:3])
+        TeamSeasonStats.objects.all().delete()
+        import_module('leagues.migrations.0004_teamseasonstats').backfill_team_season_stats(django_apps, None)
+        self.assertEqual(sorted(TeamSeasonStats.objects.values_list(*fields), key=lambda row: row[:3]), expected)
+
+    def test_rebuild_matches_incremental(self):
+        expected = {(s.season, s.team_id): (s.matches, s.totals_for, s.avg_against)
+                    for s in TeamSeasonStats.objects.all()}
+        self.assertEqual(rebuild_team_season_stats_for_league(self.data['league']), 5)
+        rebuilt = {(s.season, s.team_id): (s.matches, s.totals_for, s.avg_against)
+                   for s in TeamSeasonStats.objects.all()}
+        self.assertEqual(rebuilt, expected)
+
+    def test_team_stats_endpoint(self):
+        url = reverse('leagues:team_stats_flutter', args=[self.t1.pk])
+        data = self.client.get(url).json()
+        self.assertEqual(data['season'], '2024/2025')
+        self.assertEqual(data['seasons'], ['2023/2024', '2024/2025'])
+        shots = next(row for row in data['stats'] if row['name'] == 'shots')
+        self.assertEqual(shots, {"name": "shots", "label": "Shots", "total_for": 16, "total_against": 12,
+                                 "avg_for": 8, "avg_against": 6})
+
+        old = self.client.get(url, {'season': '2023/2024'}).json()
+        self.assertEqual(old['matches'], 1)
+
+        missing = reverse('leagues:team_stats_flutter', args=[9999])
+        self.assertEqual(self.client.get(missing).status_code, 404)
+
+        response = self.client.get(reverse('leagues:team_detail', args=[self.t1.pk]))
+        self.assertEqual(response.context['season_stats'].matches, 2)
+        self.assertContains(response, "Shots on target")
+
+
+class RatingTests(TestCase):
+    """Tes rating Elo: replay penuh, update inkremental, dan endpoint api/ratings/."""
+    def setUp(self):
+        # replay match lama dijadwalkan on_commit -> jalankan seperti saat commit
+        with self.captureOnCommitCallbacks(execute=True):
+            self.data = create_test_data()
+        self.league = self.data['league']
+
+    def _ratings(self):
+        return dict(TeamRating.objects.filter(league=self.league).values_list('team_id', 'rating'))
+
+    def test_replay_conserves_points(self):
+        self.assertEqual(rebuild_ratings_for_league(self.league.pk), 4)
+        ratings = self._ratings()
+        self.assertAlmostEqual(sum(ratings.values()), 3 * ELO_BASE)
+        self.assertEqual(max(ratings, key=ratings.get), self.data['t1'].pk)
+        self.assertEqual(RatingHistory.objects.filter(league=self.league).count(), 8)
+
+    def test_migration_backfill(self):
+        """Data migration 0005 menghasilkan rating & riwayat yang sama dengan replay penuh."""
+        rebuild_ratings_for_league(self.league.pk)
+        expected = self._ratings()
+        history = sorted(RatingHistory.objects.values_list('team_id', 'match_id', 'rating_after'))
+        RatingHistory.objects.all().delete()
+        TeamRating.objects.all().delete()
+        import_module('leagues.migrations.0005_teamrating').backfill_ratings(django_apps, None)
+        self.assertEqual(self._ratings(), expected)
+        self.assertEqual(sorted(RatingHistory.objects.values_list('team_id', 'match_id', 'rating_after')), history)
+
+    def test_latest_match_applied_incrementally(self):
+        upcoming = self.data['m_upcoming']
+        upcoming.status, upcoming.home_score, upcoming.away_score = Match.Status.FINISHED, 0, 2
+        with patch('leagues.ratings.rebuild_ratings_for_league') as rebuild:
+            upcoming.save()
+        rebuild.assert_not_called()
+        incremental = self._ratings()
+
+        rebuild_ratings_for_league(self.league.pk)
+        for team_id, rating in self._ratings().items():
+            self.assertAlmostEqual(incremental[team_id], rating)
+
+    def test_past_match_change_triggers_replay(self):
+        m_old = self.data['m_old']
+        m_old.home_score = 0
+        with patch('leagues.ratings.rebuild_ratings_for_league') as rebuild, \
+                self.captureOnCommitCallbacks(execute=True):
+            m_old.save()
+            self.data['m2'].delete()  # replay kedua di liga yang sama tidak dijadwalkan ulang
+        rebuild.assert_called_once_with(self.league.pk)
+
+        before = self._ratings()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.data['m_old'].delete()
+        self.assertNotEqual(self._ratings(), before)
+        self.assertEqual(TeamRating.objects.get(team=self.data['t1']).matches, 1)
+
+    def test_ratings_endpoint(self):
+        url = reverse('leagues:ratings_flutter')
+        data = self.client.get(url, {'team': self.data['t1'].pk}).json()
+        self.assertEqual([r['rank'] for r in data['ratings']], [1, 2, 3])
+        self.assertEqual(data['ratings'][0]['team_id'], self.data['t1'].pk)
+        self.assertEqual(len(data['history']['points']), 3)
+        self.assertEqual(self.client.get(url, {'team': 'abc'}).status_code, 400)
+
+    def test_rebuild_ratings_command(self):
+        out = StringIO()
+        call_command('rebuild_ratings', '--league-name', self.league.name, stdout=out)
+        self.assertIn('4 match', out.getvalue())
+        with self.assertRaises(CommandError):
+            call_command('rebuild_ratings', '--league-name', 'Nope', stdout=StringIO())
+
+
+class FormGuideTests(TestCase):
+    """Tes form guide (Standing.form) per season."""
+    def setUp(self):
+        self.data = create_test_data()
+        self.league = self.data['league']
+
+    def _form(self, team, season="2024/2025"):
+        s = Standing.objects.get(league=self.league, season=season, team=team)
+        return s.form, s.form_points
+
+    def test_migration_backfill(self):
+        """Data migration 0006 mengisi form yang sama dengan yang dijaga signal."""
+        expected = sorted(Standing.objects.values_list('season', 'team_id', 'form', 'form_points'))
+        Standing.objects.update(form='', form_points=0)
+        import_module('leagues.migrations.0006_standing_form').backfill_form(django_apps, None)
+        self.assertEqual(sorted(Standing.objects.values_list('season', 'team_id', 'form', 'form_points')), expected)
+
+    def test_form_maintained_by_signals(self):
+        # urut lama -> baru: m3 (t2 kalah), m2 (t1 seri), m1 (t1 menang)
+        self.assertEqual(self._form(self.data['t1']), ("DW", 4))
+        self.assertEqual(self._form(self.data['t2']), ("LL", 0))
+        self.assertEqual(self._form(self.data['t1'], "2023/2024"), ("W", 3))
+
+        upcoming = self.data['m_upcoming']
+        upcoming.status, upcoming.home_score, upcoming.away_score = Match.Status.FINISHED, 0, 1
+        upcoming.save()
+        self.assertEqual(self._form(self.data['t1']), ("DWL", 4))
+        self.assertEqual(self._form(self.data['t2']), ("LLW", 3))
+        self.assertEqual(self._form(self.data['t3']), ("WD", 4))  # tidak terlibat -> tetap
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.data['m1'].delete()
+        self.assertEqual(self._form(self.data['t1']), ("DL", 1))
+
+    def test_form_keeps_last_five(self):
+        t1, t2 = self.data['t1'], self.data['t2']
+        base = timezone.now() - datetime.timedelta(days=30)
+        for i in range(6):
+            Match.objects.create(league=self.league, season="2022/2023", date=base + datetime.timedelta(days=i),
+                                 home_team=t1, away_team=t2, home_score=i % 2, away_score=0)
+        self.assertEqual(self._form(t1, "2022/2023"), ("WDWDW", 11))
+
+    def test_rebuild_matches_incremental(self):
+        expected = {(s.season, s.team_id): (s.form, s.form_points) for s in Standing.objects.all()}
+        table = compute_form_table(self.league)
+        self.assertEqual({k: (v['form'], v['form_points']) for k, v in table.items()}, expected)
+        recompute_standings_for_league(self.league)
+        self.assertEqual({(s.season, s.team_id): (s.form, s.form_points) for s in Standing.objects.all()}, expected)
+
+    def test_form_in_standings_api(self):
+        response = self.client.get(reverse('leagues:standings_flutter'))
+        row = next(r for r in response.json()['standings'] if r['team_id'] == self.data['t1'].pk)
+        self.assertEqual((row['form'], row['form_points']), ("DW", 4))
+
+        dashboard = self.client.get(reverse('leagues:league_dashboard_flutter')).json()
+        self.assertIn('form', dashboard['standings'][0])
+
+
+class KeysetPaginationTests(TestCase):
+    """Tes paginasi cursor (date, id) untuk api/matches-page/ dan api/matches/."""
+    def setUp(self):
+        self.data = create_test_data()
+        # dua match dengan tanggal sama: urutan ditentukan id
+        self.same_day = [
+            Match.objects.create(league=self.data['league'], season="2024/2025", date=self.data['m1'].date,
+                                 home_team=self.data['t2'], away_team=self.data['t3'], home_score=1)
+            for _ in range(2)
+        ]
+
+    def _walk(self, url, **params):
+        ids, cursor = [], None
+        while True:
+            query = dict(params, limit=2, **({'cursor': cursor} if cursor else {}))
+            data = self.client.get(url, query).json()
+            ids.extend(m['id'] for m in data['matches'])
+            cursor = data['next']
+            if cursor is None:
+                return ids
+
+    def test_matches_flutter_pages_cover_all(self):
+        url = reverse('leagues:matches_flutter')
+        expected = list(Match.objects.order_by('-date', '-id').values_list('id', flat=True))
+        self.assertEqual(self._walk(url), expected)
+
+        upcoming = self._walk(url, tab='upcoming')
+        self.assertEqual(upcoming, [self.data['m_upcoming'].pk])
+        self.assertEqual(len(self._walk(url, tab='finished', q='Charlie')), 4)
+
+    def test_invalid_params(self):
+        url = reverse('leagues:matches_flutter')
+        self.assertEqual(self.client.get(url, {'cursor': 'xyz'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'limit': '0'}).status_code, 400)
+        self.assertEqual(len(self.client.get(url, {'limit': '1000'}).json()['matches']), 7)
+
+    def test_show_matches_json_cursor_header(self):
+        url = reverse('leagues:show_matches_json')
+        response = self.client.get(url, {'limit': 4})
+        self.assertEqual(len(json.loads(b''.join(response.streaming_content))), 4)
+        cursor = response['X-Next-Cursor']
+        self.assertIn('rel="next"', response['Link'])
+
+        last = self.client.get(url, {'limit': 4, 'cursor': cursor})
+        self.assertEqual(len(json.loads(b''.join(last.streaming_content))), 3)
+        self.assertNotIn('X-Next-Cursor', last)
+
+
+class ConditionalGetTests(TestCase):
+    """Tes ETag / Last-Modified dan 304 untuk API baca liga."""
+    def setUp(self):
+        cache.clear()
+        # bucket waktu dibekukan agar ETag tidak berganti di tengah tes
+        patcher = patch('leagues.versioning._time_bucket', return_value=1)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.data = create_test_data()
+        self.url = reverse('leagues:standings_flutter')
+
+    def test_not_modified_without_db_queries(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+        etag = first['ETag']
+        self.assertTrue(etag.startswith('"'))
+        self.assertIn('Last-Modified', first)
+
+        with self.assertNumQueries(1):  # hanya versi liga, tanpa query data
+            second = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(second.status_code, 304)
+
+        # query string berbeda -> representasi (dan ETag) berbeda
+        other = self.client.get(self.url, {'season': '2023/2024'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(other.status_code, 200)
+
+    def test_time_bucket_only_for_clock_dependent_views(self):
+        requests = [
+            (reverse('leagues:league_dashboard_flutter'), {}, True),
+            (reverse('leagues:matches_flutter'), {'tab': 'upcoming'}, True),
+            (reverse('leagues:matches_flutter'), {'tab': 'finished'}, False),
+            (self.url, {}, False),
+        ]
+        etags = [self.client.get(url, params)['ETag'] for url, params, _ in requests]
+        with patch('leagues.versioning._time_bucket', return_value=2):
+            for (url, params, depends_on_clock), etag in zip(requests, etags):
+                status = self.client.get(url, params, HTTP_IF_NONE_MATCH=etag).status_code
+                self.assertEqual(status, 200 if depends_on_clock else 304, (url, params))
+
+    def test_writes_change_etag(self):
+        for url in ('leagues:league_dashboard_flutter', 'leagues:teams_flutter', 'leagues:matches_flutter'):
+            etag = self.client.get(reverse(url))['ETag']
+            self.assertEqual(self.client.get(reverse(url), HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        etag = self.client.get(self.url)['ETag']
+        m1 = self.data['m1']
+        m1.home_score = 0
+        with self.captureOnCommitCallbacks(execute=True):
+            m1.save()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        etag = self.client.get(self.url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            Team.objects.create(league=self.data['league'], name="Delta Team")
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        etag = self.client.get(self.url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            recompute_standings_for_league(self.data['league'])
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_version_shared_across_processes(self):
+        # versi ada di DB, bukan cache lokal: worker lain (cache kosong/berbeda) melihat versi yang sama
+        league = self.data['league']
+        etag = self.client.get(self.url)['ETag']
+        before = get_data_version(league.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_data_version(league.pk)
+            self.assertEqual(get_data_version(league.pk), before)  # baru naik setelah commit
+        cache.clear()
+        self.assertGreater(get_data_version(league.pk), before)
+        self.assertEqual(get_data_version(league.pk), League.objects.get(pk=league.pk).data_version)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        # save League dengan nilai versi lama di memori tidak menurunkan versi
+        league.name = "Renamed League"
+        with self.captureOnCommitCallbacks(execute=True):
+            league.save()
+        self.assertGreater(get_data_version(league.pk), before)
+
+
+class DashboardSnapshotTests(TestCase):
+    """Tes snapshot dashboard di cache (hit/miss, invalidasi saat tulis, single rebuild)."""
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.data = create_test_data()
+        cache.clear()
+        reset_dashboard_cache_stats()
+        self.league = self.data['league']
+
+    def test_hit_after_first_build(self):
+        snapshot = get_dashboard_snapshot(self.league)
+        self.assertEqual(snapshot['latest_season'], '2024/2025')
+        self.assertEqual(snapshot['finished_recent'][0], self.data['m1'])
+        self.assertEqual(snapshot['upcoming'], [self.data['m_upcoming']])
+
+        with self.assertNumQueries(1):  # hanya versi data liga
+            get_dashboard_snapshot(self.league)
+        self.assertEqual(dashboard_cache_stats(), {'hits': 1, 'misses': 1, 'hit_ratio': 0.5})
+
+        out = StringIO()
+        call_command('dashboard_cache_stats', '--reset', stdout=out)
+        self.assertIn('hits=1 misses=1', out.getvalue())
+        self.assertEqual(dashboard_cache_stats()['hits'], 0)
+
+    def test_stats_shared_between_workers(self):
+        get_dashboard_snapshot(self.league)
+        # counter ditampung per proses lalu ditambahkan ke DB secara berkala
+        with patch('leagues.dashboard.STATS_FLUSH_EVERY', 3):
+            get_dashboard_snapshot(self.league)
+            get_dashboard_snapshot(self.league)
+        self.assertEqual(DashboardCacheStats.objects.values_list('hits', 'misses').get(), (2, 1))
+
+        # worker lain menambahkan counternya ke baris yang sama
+        DashboardCacheStats.objects.update(hits=F('hits') + 5, misses=F('misses') + 1)
+        out = StringIO()
+        call_command('dashboard_cache_stats', stdout=out)
+        self.assertIn('hits=7 misses=2', out.getvalue())
+
+    def test_write_rebuilds_snapshot(self):
+        get_dashboard_snapshot(self.league)
+        m1 = self.data['m1']
+        m1.home_score = 0
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            m1.save()
+        self.assertEqual(len([c for c in callbacks if getattr(c, 'key', None) == ('dashboard', self.league.pk)]), 1)
+
+        with self.assertNumQueries(1):  # hanya versi data liga
+            snapshot = get_dashboard_snapshot(self.league)
+        self.assertEqual(snapshot['finished_recent'][0].home_score, 0)
+
+    def test_version_bump_from_other_worker_invalidates(self):
+        get_dashboard_snapshot(self.league)
+        # worker lain menulis: hanya DB yang berubah, cache proses ini tidak tersentuh
+        with self.captureOnCommitCallbacks(execute=True):
+            Match.objects.filter(pk=self.data['m1'].pk).update(home_score=9)
+            bump_data_version(self.league.pk)
+        snapshot = get_dashboard_snapshot(self.league)
+        self.assertEqual(snapshot['finished_recent'][0].home_score, 9)
+
+    def test_expires_when_upcoming_match_starts(self):
+        get_dashboard_snapshot(self.league)
+        later = self.data['m_upcoming'].date + datetime.timedelta(minutes=1)
+        with patch('leagues.dashboard.timezone.now', return_value=later):
+            snapshot = get_dashboard_snapshot(self.league)
+        self.assertEqual(snapshot['upcoming'], [])
+        self.assertEqual(dashboard_cache_stats()['misses'], 2)
+
+    def test_concurrent_miss_waits_for_builder(self):
+        key = _snapshot_key(self.league.pk)
+        cache.add(f"{key}:lock", 1)  # request lain sedang membangun snapshot
+
+        def other_builder_finishes(_):
+            cache.set(key, {'valid_until': None, 'latest_season': 'X'})
+
+        with patch('leagues.dashboard.time.sleep', side_effect=other_builder_finishes), \
+                patch('leagues.dashboard.build_dashboard_snapshot') as build:
+            snapshot = get_dashboard_snapshot(self.league)
+        build.assert_not_called()
+        self.assertEqual(snapshot['latest_season'], 'X')
+
+    def test_dashboard_views_use_snapshot(self):
+        response = self.client.get(reverse('leagues:league_dashboard_flutter'))
+        self.assertEqual(response.json()['season'], '2024/2025')
+        self.assertEqual(len(response.json()['upcoming_matches']), 1)
+        self.assertEqual(dashboard_cache_stats()['misses'], 1)
+
+
+class StreamingExportTests(TestCase):
+    """Tes dump JSON streaming (api/matches/, api/teams/, api/standings/)."""
+    def setUp(self):
+        self.data = create_test_data()
+
+    def test_same_output_as_serializer(self):
+        from django.core import serializers
+        response = self.client.get(reverse('leagues:show_teams_json'))
+        self.assertTrue(response.streaming)
+        body = b''.join(response.streaming_content).decode()
+        self.assertEqual(body, serializers.serialize('json', Team.objects.order_by('pk')))
+
+        response = self.client.get(reverse('leagues:show_standings_json'))
+        standings = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(len(standings), Standing.objects.filter(league=self.data['league']).count())
+
+    def test_matches_export_all_in_chunks(self):
+        with patch('leagues.streaming.STREAM_CHUNK_SIZE', 2):
+            response = self.client.get(reverse('leagues:show_matches_json'), {'all': '1'})
+            chunks = list(response.streaming_content)
+        self.assertGreater(len(chunks), 3)
+        matches = json.loads(b''.join(chunks))
+        self.assertEqual([m['pk'] for m in matches],
+                         list(Match.objects.order_by('-date', '-id').values_list('pk', flat=True)))
+        self.assertEqual(matches[0]['fields']['home_team'], self.data['t1'].pk)
+
+    def test_gzip_when_accepted(self):
+        import gzip
+        response = self.client.get(reverse('leagues:show_teams_json'), HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        teams = json.loads(gzip.decompress(b''.join(response.streaming_content)))
+        self.assertEqual(len(teams), 3)
+
+        empty = self.client.get(reverse('leagues:show_teams_json'))
+        self.assertFalse(empty.has_header('Content-Encoding'))
+
+
+class SparseFieldsetTests(TestCase):
+    """Tes ?fields= pada api/matches-page/ dan api/matches/<id>/."""
+    def setUp(self):
+        self.data = create_test_data()
+        self.list_url = reverse('leagues:matches_flutter')
+        self.detail_url = reverse('leagues:match_detail_flutter', args=[self.data['m1'].pk])
+
+    def _match_queries(self, url, params=None):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, params or {})
+        return response, [q['sql'] for q in ctx.captured_queries if 'leagues_match' in q['sql']]
+
+    def test_list_default_skips_stat_columns(self):
+        response, queries = self._match_queries(self.list_url)
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('home_shots', queries[0])
+        first = response.json()['matches'][0]
+        self.assertEqual(set(first), {
+            'id', 'home_team', 'home_team_id', 'away_team', 'away_team_id', 'home_score',
+            'away_score', 'date', 'status', 'is_finished', 'season',
+        })
+
+    def test_list_projection_and_payload_size(self):
+        full, _ = self._match_queries(self.list_url)
+        slim, queries = self._match_queries(self.list_url, {'fields': 'date,home_score,away_score'})
+        self.assertEqual(set(slim.json()['matches'][0]), {'id', 'date', 'home_score', 'away_score'})
+        self.assertNotIn('leagues_team', queries[0])  # tanpa nama tim -> tanpa JOIN
+        self.assertLess(len(slim.content), len(full.content) // 2)
+
+        with_stats = self.client.get(self.list_url, {'fields': 'home_shots,away_possession'}).json()
+        self.assertIn('home_shots', with_stats['matches'][0])
+
+        bad = self.client.get(self.list_url, {'fields': 'id,password'})
+        self.assertEqual(bad.status_code, 400)
+        self.assertIn('password', bad.json()['message'])
+
+    def test_detail_default_shape_and_projection(self):
+        response, queries = self._match_queries(self.detail_url)
+        self.assertEqual(len(queries), 1)  # nama tim lewat JOIN, bukan lazy lookup
+        data = response.json()
+        self.assertEqual(len(data), 27)
+        self.assertEqual((data['home_team'], data['home_fouls']), ('Alpha Team', 0))
+
+        slim, queries = self._match_queries(self.detail_url, {'fields': 'home_score,away_score'})
+        self.assertEqual(slim.json(), {'id': self.data['m1'].pk, 'home_score': 3, 'away_score': 1})
+        self.assertNotIn('home_possession', queries[0])
+        self.assertLess(len(slim.content), len(response.content) // 4)
+
+
+class MatchBatchDetailTests(TestCase):
+    """Tes api/matches/batch/."""
+    def setUp(self):
+        self.data = create_test_data()
+        self.url = reverse('leagues:match_detail_batch_flutter')
+
+    def test_batch_single_query_keyed_by_id(self):
+        m1, m2 = self.data['m1'], self.data['m2']
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, {'ids': f'{m1.pk},{m2.pk},{m1.pk},9999,abc'})
+        data = response.json()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(data['matches']), {str(m1.pk), str(m2.pk)})
+        single = self.client.get(reverse('leagues:match_detail_flutter', args=[m1.pk])).json()
+        self.assertEqual(data['matches'][str(m1.pk)], single)
+        self.assertEqual(set(data['errors']), {'9999', 'abc'})
+
+        slim = self.client.get(self.url, {'ids': str(m1.pk), 'fields': 'home_score'}).json()
+        self.assertEqual(slim['matches'][str(m1.pk)], {'id': m1.pk, 'home_score': 3})
+
+    def test_batch_limits(self):
+        self.assertEqual(self.client.get(self.url).status_code, 400)
+        too_many = ','.join(str(i) for i in range(1, 102))
+        self.assertEqual(self.client.get(self.url, {'ids': too_many}).status_code, 400)
+
+
+class SeasonRegistryTests(TestCase):
+    """Tes registry Season & daftar season ter-cache."""
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.data = create_test_data()
+        self.league = self.data['league']
+
+    def _match(self, season, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Match.objects.create(
+                league=self.league, season=season, date=timezone.now() - datetime.timedelta(days=4000),
+                home_team=self.data['t1'], away_team=self.data['t2'], **kwargs,
+            )
+
+    def test_start_year(self):
+        self.assertEqual(season_start_year("99/00"), 1999)
+        self.assertEqual(season_start_year("10/11"), 2010)
+        self.assertEqual(season_start_year("2024/2025"), 2024)
+
+    def test_registry_follows_match_writes(self):
+        self.assertEqual(get_seasons(self.league), ["2023/2024", "2024/2025"])
+        old = self._match("99/00")
+        self._match("10/11")
+        self.assertEqual(get_seasons(self.league), ["99/00", "10/11", "2023/2024", "2024/2025"])
+        self.assertEqual(get_latest_season(self.league), "2024/2025")
+
+        old.season = "98/99"
+        with self.captureOnCommitCallbacks(execute=True):
+            old.save()
+        self.assertEqual(get_seasons(self.league)[:2], ["98/99", "10/11"])
+        with self.captureOnCommitCallbacks(execute=True):
+            old.delete()
+        self.assertNotIn("98/99", get_seasons(self.league))
+        self.assertFalse(Season.objects.filter(league=self.league, name="98/99").exists())
+
+    def test_cached_list_and_rebuild(self):
+        get_seasons(self.league)
+        with self.assertNumQueries(1):  # hanya versi data liga
+            self.assertEqual(get_seasons(self.league.pk), ["2023/2024", "2024/2025"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Season.objects.filter(league=self.league).delete()
+            recompute_standings_for_league(self.league)
+        self.assertEqual(get_seasons(self.league), ["2023/2024", "2024/2025"])
+
+    def test_cache_follows_shared_version(self):
+        # Worker lain menulis registry: cache lokal proses ini tidak dihapus,
+        # tetapi versi data yang dinaikkan membuat key lamanya tidak terpakai.
+        self.assertEqual(get_seasons(self.league), ["2023/2024", "2024/2025"])
+        Season.objects.bulk_create([Season(league=self.league, name="99/00", start_year=1999)])
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_data_version(self.league.pk)
+        self.assertEqual(get_seasons(self.league), ["99/00", "2023/2024", "2024/2025"])
+
+    def test_views_use_chronological_order(self):
+        self._match("99/00", status=Match.Status.SCHEDULED)
+        data = self.client.get(reverse('leagues:standings_flutter')).json()
+        self.assertEqual(data['seasons'], ["99/00", "2023/2024", "2024/2025"])
+        self.assertEqual(data['selected_season'], "2024/2025")
+        response = self.client.get(reverse('leagues:standings', args=[self.league.pk]))
+        self.assertEqual(response.context['selected_season'], "2024/2025")
+
+    def test_team_detail_seasons_without_match_scan(self):
+        url = reverse('leagues:team_detail', args=[self.data['t1'].pk])
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.context['seasons'], ["2023/2024", "2024/2025"])
+        self.assertEqual(response.context['standing'].points, 4)
+        self.assertFalse([q for q in queries if 'DISTINCT' in q['sql']])
+
+        # season yang baru berisi jadwal (belum ada klasemen) tetap muncul
+        self._match("2025/2026", status=Match.Status.SCHEDULED)
+        response = self.client.get(url)
+        self.assertEqual(response.context['seasons'], ["2023/2024", "2024/2025", "2025/2026"])
+        self.assertIsNone(response.context['standing'])
+        self.assertNotIn("2025/2026", self.client.get(
+            reverse('leagues:team_detail', args=[self.data['t3'].pk])).context['seasons'])
+
+
+class TeamSearchTests(TestCase):
+    """Tes pencarian nama tim lewat indeks trigram."""
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.data = create_test_data()
+        self.league = self.data['league']
+
+    def test_normalize_and_rank(self):
+        self.assertEqual(normalize_team_name("  Atlético   Madrid. "), "atletico madrid")
+        index = TeamSearchIndex([(1, "Real Madrid"), (2, "Atlético Madrid"), (3, "Madrid City"), (4, "Bravo")])
+        self.assertEqual(index.search("MADRID"), [3, 2, 1])
+        self.assertEqual(index.search("atletico"), [2])
+        self.assertEqual(index.search("ma"), [3, 2, 1])
+        self.assertEqual(index.search("xyz"), [])
+        self.assertEqual(index.search(" . "), [])  # hanya tanda baca: tidak cocok dengan tim mana pun
+        self.assertIsNone(index.search("  "))
+        self.assertIsNone(index.search(""))
+
+    def test_index_cached_until_team_write(self):
+        index = get_team_search_index(self.league)
+        with self.assertNumQueries(1):  # hanya versi data liga
+            self.assertIs(get_team_search_index(self.league.pk).__class__, TeamSearchIndex)
+        self.assertEqual(index.search("delta"), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            delta = Team.objects.create(league=self.league, name="Délta FC")
+        self.assertEqual(get_team_search_index(self.league).search("delta"), [delta.pk])
+
+    def test_filters_use_team_ids(self):
+        t3 = self.data['t3']
+        data = self.client.get(reverse('leagues:matches_flutter'), {'q': 'charlie'}).json()
+        self.assertEqual(
+            {m['id'] for m in data['matches']}, {self.data['m2'].pk, self.data['m3'].pk},
+        )
+        data = self.client.get(reverse('leagues:teams_flutter'), {'q': 'CHAR'}).json()
+        self.assertEqual([t['id'] for t in data['teams']], [t3.pk])
+        self.assertEqual(self.client.get(reverse('leagues:teams_flutter'), {'q': '!!!'}).json()['teams'], [])
+        self.assertEqual(self.client.get(reverse('leagues:matches_flutter'), {'q': '-'}).json()['matches'], [])
+
+        response = self.client.get(reverse('leagues:match_list', args=[self.league.pk]), {'team': 'bravo'})
+        self.assertEqual(len(response.context['matches']), 4)
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse('leagues:team_list', args=[self.league.pk]), {'q': 'alp'})
+        self.assertFalse(any('LIKE' in q['sql'] for q in ctx.captured_queries))
+
+
+class ColumnarExportTests(TestCase):
+    """Tes ekspor kolumnar .npz (api/matches/export.npz & export_columnar)."""
+    def setUp(self):
+        cache.clear()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        override = override_settings(LEAGUES_EXPORT_DIR=self.tmp.name)
+        override.enable()
+        self.addCleanup(override.disable)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.data = create_test_data()
+        self.league = self.data['league']
+        self.url = reverse('leagues:export_matches_npz')
+
+    def _load(self, response):
+        return np.load(io.BytesIO(b"".join(response.streaming_content)))
+
+    def test_season_arrays(self):
+        response = self.client.get(self.url, {'season': '2024/2025'})
+        self.assertEqual(response.status_code, 200)
+        arrays = self._load(response)
+        m1 = self.data['m1']
+        self.assertEqual(sorted(arrays['id'].tolist()), sorted(
+            [self.data[k].pk for k in ('m1', 'm2', 'm3', 'm_upcoming')]))
+        self.assertEqual(arrays['home_score'].dtype.name, 'int16')
+        self.assertEqual(arrays['home_possession'].dtype.name, 'float32')
+        row = arrays['id'].tolist().index(m1.pk)
+        self.assertEqual(arrays['home_score'][row], m1.home_score)
+        self.assertEqual(arrays['team_ids'][arrays['home_team'][row]], m1.home_team_id)
+        self.assertEqual(arrays['seasons'].tolist(), ['2024/2025'])
+
+        self.assertEqual(len(self._load(self.client.get(self.url))['id']), 5)
+        self.assertEqual(self.client.get(self.url, {'season': '1999/2000'}).status_code, 404)
+
+    def test_cached_per_data_version(self):
+        first = get_columnar_export(self.league.pk)
+        inode = first.stat().st_ino
+        with self.assertNumQueries(1):  # hanya versi data liga
+            self.assertEqual(get_columnar_export(self.league.pk), first)
+        self.assertEqual(first.stat().st_ino, inode)  # tidak ditulis ulang
+
+        m1 = self.data['m1']
+        m1.home_score = 7
+        with self.captureOnCommitCallbacks(execute=True):
+            m1.save()
+        second = get_columnar_export(self.league.pk)
+        self.assertNotEqual(second, first)
+        self.assertEqual(second, export_path(self.league.pk))
+        # versi lama mungkin masih dikirim worker lain: dihapus setelah masa tenggang
+        self.assertTrue(first.exists())
+        old = time.time() - STALE_GRACE_SECONDS - 1
+        os.utime(first, (old, old))
+        m1.home_score = 8
+        with self.captureOnCommitCallbacks(execute=True):
+            m1.save()
+        get_columnar_export(self.league.pk)
+        self.assertFalse(first.exists())
+
+    def test_open_rebuilds_file_removed_by_other_worker(self):
+        real = columnar.get_columnar_export
+        calls = []
+
+        def removed_after_lookup(league_id, season=None):
+            path = real(league_id, season)
+            if not calls:
+                path.unlink()  # worker lain menghapus file di antara lookup & open
+            calls.append(path)
+            return path
+
+        with patch('leagues.columnar.get_columnar_export', side_effect=removed_after_lookup):
+            with open_columnar_export(self.league.pk) as f:
+                arrays = np.load(f)
+                self.assertEqual(len(arrays['id']), 5)
+        self.assertEqual(len(calls), 2)
+
+    def test_command(self):
+        target = os.path.join(self.tmp.name, 'out.npz')
+        out = StringIO()
+        call_command('export_columnar', '--season', '2023/2024', '--output', target, stdout=out)
+        self.assertTrue(os.path.exists(target))
+        with self.assertRaises(CommandError):
+            call_command('export_columnar', '--season', 'nope', stdout=StringIO())
+
+
+class BulkMatchWriteTests(TestCase):
+    """Tes api/matches/bulk/ (create + update massal, rebuild sekali per season)."""
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.data = create_test_data()
+        self.league = self.data['league']
+        self.url = reverse('leagues:bulk_matches_flutter')
+        self.client.force_login(self.data['superuser'])
+
+    def _post(self, items):
+        return self.client.post(self.url, json.dumps({'matches': items}), content_type='application/json')
+
+    def test_bulk_create_and_update(self):
+        t1, t2, t3 = self.data['t1'], self.data['t2'], self.data['t3']
+        upcoming = self.data['m_upcoming']
+        items = [
+            {'season': '2025/2026', 'date': '2026-08-01T15:00:00', 'home_team_id': t1.pk, 'away_team_id': t3.pk,
+             'home_score': 2, 'away_score': 0, 'is_finished': True, 'home_shots': 11},
+            {'season': '2025/2026', 'date': '2026-08-01T17:00:00', 'home_team_id': t2.pk, 'away_team_id': t1.pk,
+             'status': 'SCHEDULED'},
+            {'id': upcoming.pk, 'home_score': 1, 'away_score': 1, 'status': 'FINISHED'},
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self._post(items)
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual([r['status'] for r in results], ['created', 'created', 'updated'])
+        self.assertEqual(Match.objects.get(pk=results[0]['id']).home_shots, 11)
+        self.assertEqual(Match.objects.get(pk=upcoming.pk).status, Match.Status.FINISHED)
+
+        self.assertEqual(verify_standings_for_league(self.league), [])
+        self.assertEqual(Standing.objects.get(season='2025/2026', team=t1).points, 3)
+        self.assertIn('2025/2026', get_seasons(self.league))
+        self.assertEqual(TeamSeasonStats.objects.get(season='2025/2026', team=t1).totals_for['shots'], 11)
+
+        ratings = dict(TeamRating.objects.values_list('team_id', 'rating'))
+        rebuild_ratings_for_league(self.league.pk)
+        self.assertEqual(ratings, dict(TeamRating.objects.values_list('team_id', 'rating')))
+
+    def test_invalid_item_rejects_whole_batch(self):
+        t1, t2 = self.data['t1'], self.data['t2']
+        before = Match.objects.count()
+        response = self._post([
+            {'season': '2025/2026', 'date': '2026-08-01T15:00:00', 'home_team_id': t1.pk, 'away_team_id': t2.pk},
+            {'season': '2025/2026', 'date': 'kemarin', 'home_team_id': t1.pk, 'away_team_id': t2.pk},
+            {'id': 999999, 'home_score': 1},
+            {'id': self.data['m1'].pk, 'home_team_id': self.data['m1'].away_team_id},
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([r['status'] for r in response.json()['results']], ['valid', 'error', 'error', 'error'])
+        self.assertEqual(Match.objects.count(), before)
+
+    def test_updates_locked_and_grouped_by_fields(self):
+        m1, m2 = self.data['m1'], self.data['m2']
+        with patch.object(Match.objects, 'select_for_update', wraps=Match.objects.select_for_update) as lock, \
+                patch.object(Match.objects, 'bulk_update', wraps=Match.objects.bulk_update) as bulk_update:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self._post([
+                    {'id': m1.pk, 'home_shots': 20},
+                    {'id': m2.pk, 'home_score': 0, 'away_score': 0},
+                ])
+        self.assertEqual(response.status_code, 200)
+        lock.assert_called_once_with()
+        # tiap match hanya menulis field yang diubah item-nya sendiri
+        self.assertEqual(
+            sorted((tuple(m.pk for m in c.args[0]), tuple(c.args[1])) for c in bulk_update.call_args_list),
+            sorted([((m1.pk,), ('home_shots',)), ((m2.pk,), ('away_score', 'home_score'))]),
+        )
+        self.assertEqual(verify_standings_for_league(self.league), [])
+
+    def test_requires_staff(self):
+        self.client.logout()
+        self.assertEqual(self._post([]).status_code, 403)
+        self.client.force_login(self.data['superuser'])
+        self.assertEqual(self._post([]).status_code, 400)
+
+
+class LiveScoreTests(TestCase):
+    """Tes hub live score & endpoint SSE."""
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.data = create_test_data()
+        self.league = self.data['league']
+        self.match = self.data['m_upcoming']
+
+    def _event(self, **kwargs):
+        return {'match_id': self.match.pk, 'league_id': self.league.pk, 'status': 'LIVE',
+                'home_score': 1, 'away_score': 0, **kwargs}
+
+    def test_local_broker_filters_by_match(self):
+        async def scenario():
+            broker = LocalBroker()
+            sub = broker.subscribe(self.league.pk, self.match.pk)
+            await asyncio.to_thread(broker.publish, self._event(match_id=-1))
+            await asyncio.to_thread(broker.publish, self._event())
+            events = await sub.next_events(1)
+            sub.close()
+            self.assertEqual(broker._subscribers, set())
+            return events, await sub.next_events(0.01)
+        events, empty = async_to_sync(scenario)()
+        self.assertEqual([e['match_id'] for e in events], [self.match.pk])
+        self.assertEqual(empty, [])
+
+    def test_cache_broker(self):
+        broker = CacheBroker()
+        broker.poll_interval = 0.01
+        sub = broker.subscribe(self.league.pk)
+        broker.publish(self._event(league_id=-1))
+        broker.publish(self._event(home_score=2))
+        events = async_to_sync(sub.next_events)(1)
+        self.assertEqual([e['home_score'] for e in events], [2])
+
+    def test_cache_broker_waits_for_event_written_after_seq(self):
+        broker = CacheBroker()
+        sub = broker.subscribe(self.league.pk)
+        # publisher sudah menaikkan nomor urut tapi belum menulis event-nya
+        cache.add(broker.SEQ_KEY, 0, None)
+        seq = cache.incr(broker.SEQ_KEY)
+        self.assertEqual(sub._poll(), [])
+        cache.set(broker.event_key(seq), self._event(home_score=4))
+        self.assertEqual([e['home_score'] for e in sub._poll()], [4])
+
+        # event yang tidak pernah ditulis dilewati setelah masa tunggu
+        broker.missing_grace = 0
+        cache.incr(broker.SEQ_KEY)
+        broker.publish(self._event(home_score=5))
+        self.assertEqual([e['home_score'] for e in sub._poll()], [5])
+
+    def test_local_broker_drops_subscriber_with_closed_loop(self):
+        broker = LocalBroker()
+        loop = asyncio.new_event_loop()
+
+        async def subscribe():
+            return broker.subscribe(self.league.pk)
+        sub = loop.run_until_complete(subscribe())
+        loop.close()
+        broker.publish(self._event())  # tidak boleh melempar RuntimeError ke penulis Match
+        self.assertNotIn(sub, broker._subscribers)
+
+    def test_match_writes_publish_after_commit(self):
+        published = []
+        with patch('leagues.live.get_broker') as get:
+            get.return_value.publish.side_effect = published.append
+            with self.captureOnCommitCallbacks(execute=True):
+                self.match.status = Match.Status.LIVE
+                self.match.save()
+                self.assertEqual(published, [])
+            with self.captureOnCommitCallbacks(execute=True):
+                self.match.home_score = 1
+                self.match.save()
+            with self.captureOnCommitCallbacks(execute=True):
+                self.data['m1'].home_score += 1  # match FINISHED biasa, bukan LIVE
+                self.data['m1'].save()
+        self.assertEqual([(e['status'], e['home_score']) for e in published], [('LIVE', 0), ('LIVE', 1)])
+
+    def test_sse_stream(self):
+        Match.objects.filter(pk=self.match.pk).update(status=Match.Status.LIVE)
+        request = AsyncRequestFactory().get(reverse('leagues:live_scores_sse'), {'match': self.match.pk})
+
+        async def scenario():
+            response = await live_scores_sse(request)
+            stream = response.streaming_content
+            first = await anext(stream)
+            await asyncio.to_thread(get_broker().publish, self._event(home_score=3))
+            second = await anext(stream)
+            await stream.aclose()
+            return response, first, second
+        response, first, second = async_to_sync(scenario)()
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertTrue(first.startswith(b'event: snapshot'))
+        self.assertEqual(json.loads(first.split(b'data: ')[1])['matches'][0]['match_id'], self.match.pk)
+        self.assertIn(b'"home_score": 3', second)
+        bad = AsyncRequestFactory().get(reverse('leagues:live_scores_sse'), {'match': 'x'})
+        self.assertEqual(async_to_sync(live_scores_sse)(bad).status_code, 400)
+
+    def test_sse_rejected_under_wsgi(self):
+        # WSGI tidak bisa melepas worker selama stream terbuka
+        self.assertEqual(self.client.get(reverse('leagues:live_scores_sse')).status_code, 501)
+
+    def test_sse_snapshot_error_unsubscribes(self):
+        Match.objects.filter(pk=self.match.pk).update(status=Match.Status.LIVE)
+        broker = LocalBroker()
+        request = AsyncRequestFactory().get(reverse('leagues:live_scores_sse'), {'match': self.match.pk})
+        with patch('leagues.views.get_broker', return_value=broker), \
+                patch('leagues.views.match_event', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                async_to_sync(live_scores_sse)(request)
+        self.assertEqual(broker._subscribers, set())
+
+
+class SeasonAnalyticsTests(TestCase):
+    """Tes api/seasons/<season>/analytics/."""
+    def setUp(self):
+        cache.clear()
+        self.data = create_test_data()
+        self.url = reverse('leagues:season_analytics_flutter', args=['2024/2025'])
+
+    def test_pearson_matches_numpy(self):
+        x = np.array([52.0, 61.0, 40.0, 45.0, 58.0])
+        y = np.array([1.0, 2.0, -1.0, 0.0, 1.0])
+        r = pearson_from_sums(len(x), [x.sum()], [y.sum()], [(x * x).sum()], [(y * y).sum()], [(x * y).sum()])
+        self.assertAlmostEqual(r[0], np.corrcoef(x, y)[0, 1])
+        self.assertTrue(np.isnan(pearson_from_sums(3, [3.0], [1.0], [3.0], [1.0], [1.0])[0]))
+
+    def test_single_query_and_cache(self):
+        finished = Match.objects.filter(season='2024/2025', status=Match.Status.FINISHED)
+        Match.objects.filter(pk=self.data['m1'].pk).update(home_possession=60, away_possession=40, home_yellow_cards=2)
+        Match.objects.filter(pk=self.data['m2'].pk).update(home_possession=45, away_possession=55)
+        Match.objects.filter(pk=self.data['m3'].pk).update(home_possession=50, away_possession=50)
+        with self.assertNumQueries(1):
+            stats = compute_season_analytics(self.data['league'].pk, '2024/2025')
+
+        rows = list(finished.values_list('home_score', 'away_score', 'home_possession', 'away_possession'))
+        self.assertEqual(stats['matches'], len(rows))
+        self.assertEqual(stats['goals_per_match'], round(sum(h + a for h, a, _, _ in rows) / len(rows), 3))
+        self.assertEqual(stats['cards_per_match'], round(2 / len(rows), 3))
+        x = np.array([hp - ap for _, _, hp, ap in rows])
+        y = np.sign(np.array([h - a for h, a, _, _ in rows], dtype=float))
+        self.assertAlmostEqual(stats['correlations']['possession_vs_result'], np.corrcoef(x, y)[0, 1], places=4)
+        self.assertAlmostEqual(stats['home_win_pct'] + stats['draw_pct'] + stats['away_win_pct'], 100.0, places=0)
+
+        data = self.client.get(self.url).json()
+        self.assertEqual(data['status'], 'success')
+        with self.assertNumQueries(4):  # versi (ETag), League.objects.first(), versi (key season & analytics); tanpa aggregate
+            self.client.get(self.url)
+        self.assertEqual(
+            self.client.get(reverse('leagues:season_analytics_flutter', args=['1999/2000'])).status_code, 404,
+        )
+
+
+class SimilarMatchTests(TestCase):
+    """Tes api/matches/<id>/similar/ (nearest neighbour atas vektor statistik)."""
+    def setUp(self):
+        cache.clear()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        override = override_settings(LEAGUES_EXPORT_DIR=self.tmp.name)
+        override.enable()
+        self.addCleanup(override.disable)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.data = create_test_data()
+        self.league = self.data['league']
+        stats = {'m1': (10, 60), 'm2': (11, 58), 'm3': (2, 30), 'm_old': (6, 50)}
+        for key, (shots, possession) in stats.items():
+            Match.objects.filter(pk=self.data[key].pk).update(
+                home_shots=shots, home_possession=possession, away_possession=100 - possession)
+
+    def test_nearest_neighbours(self):
+        m1, m2, m3, m_old = (self.data[k].pk for k in ('m1', 'm2', 'm3', 'm_old'))
+        result = similar_matches(self.league.pk, m1, k=2)
+        self.assertEqual([pk for pk, _ in result], [m2, m_old])
+
+        ids, matrix = build_stat_matrix(self.league.pk)
+        self.assertEqual(matrix.dtype, np.float32)
+        row = list(ids).index(m1)
+        expected = np.sqrt(((matrix - matrix[row]) ** 2).sum(axis=1))
+        self.assertAlmostEqual(result[0][1], float(expected[list(ids).index(m2)]), places=4)
+        self.assertEqual(len(similar_matches(self.league.pk, m3, k=50)), 3)
+
+    def test_endpoint_and_rebuild(self):
+        m1 = self.data['m1']
+        url = reverse('leagues:similar_matches_flutter', args=[m1.pk])
+        data = self.client.get(url, {'k': 1}).json()
+        self.assertEqual([row['id'] for row in data['similar']], [self.data['m2'].pk])
+        self.assertIn('distance', data['similar'][0])
+        with self.assertNumQueries(3):  # league_id match + versi data + ringkasan k match, tanpa scan statistik
+            self.client.get(url)
+
+        first = ensure_similarity_index(self.league.pk)[1]
+        m1.home_score += 1
+        with self.captureOnCommitCallbacks(execute=True):
+            m1.save()
+        self.assertNotEqual(ensure_similarity_index(self.league.pk)[1], first)
+        self.assertTrue(first.exists())  # masih dalam masa tenggang (mungkin di-mmap worker lain)
+        old = time.time() - STALE_GRACE_SECONDS - 1
+        os.utime(first, (old, old))
+        m1.home_score += 1
+        with self.captureOnCommitCallbacks(execute=True):
+            m1.save()
+        ensure_similarity_index(self.league.pk)
+        self.assertFalse(first.exists())
+
+        upcoming = reverse('leagues:similar_matches_flutter', args=[self.data['m_upcoming'].pk])
+        self.assertEqual(self.client.get(upcoming).status_code, 404)
+        self.assertEqual(self.client.get(url, {'k': 'x'}).status_code, 400)
+
+
+    def test_rebuilds_index_removed_by_other_worker(self):
+        m1, m2 = self.data['m1'].pk, self.data['m2'].pk
+        for path in ensure_similarity_index(self.league.pk):
+            path.unlink()  # worker lain memangkas file sebelum proses ini membukanya
+        self.assertEqual(similar_matches(self.league.pk, m1, k=1)[0][0], m2)
+
+        real = similarity.ensure_similarity_index
+        calls = []
+
+        def removed_after_lookup(league_id):
+            paths = real(league_id)
+            if not calls:
+                for path in paths:
+                    path.unlink()
+            calls.append(paths)
+            return paths
+
+        similarity._load.cache_clear()
+        with patch('leagues.similarity.ensure_similarity_index', side_effect=removed_after_lookup):
+            self.assertEqual(similar_matches(self.league.pk, m1, k=1)[0][0], m2)
+        self.assertEqual(len(calls), 2)
+
+
+class SeasonSimulationTests(TestCase):
+    """Tes simulasi Monte Carlo sisa season (api/simulation/ & simulate_season)."""
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.data = create_test_data()
+        self.league = self.data['league']
+        self.season = '2024/2025'
+
+    def test_deterministic_and_probabilities(self):
+        result = run_simulation(self.league.pk, self.season, simulations=2500, seed=7)
+        self.assertEqual(result['remaining_matches'], 1)
+        self.assertEqual(len(result['teams']), 3)
+        for key in ('title', 'top4', 'relegation'):
+            total = sum(team[key] for team in result['teams'])
+            self.assertAlmostEqual(total, {'title': 1.0, 'top4': 3.0, 'relegation': 0.0}[key], places=3)
+        for team in result['teams']:
+            self.assertAlmostEqual(sum(team['positions']), 1.0, places=3)
+
+        self.assertEqual(run_simulation(self.league.pk, self.season, simulations=2500, seed=7), result)
+        # chunk punya seed sendiri: hasil sama walau dibagi ke beberapa proses
+        self.assertEqual(run_simulation(self.league.pk, self.season, simulations=2500, seed=7, workers=2), result)
+        self.assertNotEqual(run_simulation(self.league.pk, self.season, simulations=2500, seed=8), result)
+
+    def test_stored_result_reused_and_invalidated(self):
+        first = get_season_simulation(self.league, self.season, simulations=500)
+        self.assertEqual(SeasonSimulation.objects.count(), 1)
+        with self.assertNumQueries(1):
+            self.assertEqual(get_season_simulation(self.league, self.season, simulations=500), first)
+
+        m_upcoming = self.data['m_upcoming']
+        m_upcoming.home_possession = 55  # bukan hasil/jadwal: simulasi tetap berlaku
+        m_upcoming.save()
+        self.assertEqual(SeasonSimulation.objects.count(), 1)
+
+        m_upcoming.status = Match.Status.FINISHED
+        m_upcoming.home_score, m_upcoming.away_score = 2, 0
+        with self.captureOnCommitCallbacks(execute=True):
+            m_upcoming.save()
+        self.assertFalse(SeasonSimulation.objects.exists())
+        self.assertEqual(get_season_simulation(self.league, self.season, simulations=500)['remaining_matches'], 0)
+
+    def test_endpoint(self):
+        url = reverse('leagues:season_simulation_flutter')
+        data = self.client.get(url).json()
+        self.assertEqual(data['status'], 'success')
+        self.assertEqual(data['season'], self.season)
+        self.assertEqual({team['team_id'] for team in data['teams']},
+                         {self.data[k].pk for k in ('t1', 't2', 't3')})
+        self.assertEqual(self.client.get(url, {'season': '1999/2000'}).status_code, 404)
+
+    def test_command_stores_result(self):
+        out = StringIO()
+        call_command('simulate_season', '--simulations', '1000', '--workers', '1', stdout=out)
+        self.assertIn('Alpha Team', out.getvalue())
+        stored = SeasonSimulation.objects.get(league=self.league)
+        self.assertEqual((stored.season, stored.simulations), (self.season, 1000))
+        with self.assertNumQueries(1):
+            get_season_simulation(self.league, self.season, simulations=1000)
+
 
 class FormsTests(TestCase):
     @classmethod
@@ -455,6 +1940,8 @@ class ViewTests(TestCase):
         recompute_standings_for_league(cls.league) # Pastikan standing ada
 
     def setUp(self):
+        # pk & versi liga berulang antar kelas tes (rollback), jadi cache lama harus dibuang
+        cache.clear()
         # Client biasa (anonim)
         self.client = Client()
         # Client user staff yang sudah login
@@ -1162,11 +2649,108 @@ class ManagementCommandTests(TestCase):
             self.assertIn("Imported: 2, Skipped duplicates: 0", output)
             self.assertIn("Standings recomputed.", output)
 
+            # 5. Import ulang dengan engine numpy: tidak ada duplikat, klasemen tetap sama
+            out = StringIO()
+            call_command(
+                'import_matches',
+                '--csv', temp_csv_path,
+                '--league-name', self.league.name,
+                '--engine', 'numpy',
+                stdout=out
+            )
+            self.assertIn("Imported: 0, Skipped duplicates: 2", out.getvalue())
+            self.assertEqual(verify_standings_for_league(self.league), [])
+
         finally:
             # 4. Hapus file temporer
             if os.path.exists(temp_csv_path):
                 os.remove(temp_csv_path)
 
+    def test_import_matches_command_bulk_mode(self):
+        """Tes mode --bulk: chunk kecil, tim baru dibuat, duplikat (CSV & DB) dilewati."""
+        csv_content = (
+            "season,date,home_team,away_team,goal_home_ft,goal_away_ft,home_possession,home_shots\n"
+            "2024/2025,2025-01-01,CSV Team A,CSV Team B,2,1,55.5,10\n"
+            "2024/2025,2025-01-08,CSV Team B,CSV Team C,0,0,,\n"
+            "2024/2025,2025-01-08,CSV Team B,CSV Team C,0,0,,\n"
+            "2024/2025,2025-01-15,CSV Team C,CSV Team A,1,3,40,4\n"
+            "2024/2025,2025-01-22,,CSV Team A,1,3,40,4\n"
+        )
+        temp_csv_path = os.path.join(tempfile.gettempdir(), "test_import_bulk.csv")
+
+        try:
+            with open(temp_csv_path, 'w', encoding='utf-8') as f:
+                f.write(csv_content)
+
+            out = StringIO()
+            call_command(
+                'import_matches', '--csv', temp_csv_path, '--league-name', self.league.name,
+                '--bulk', '--chunk-size', '2', stdout=out
+            )
+            output = out.getvalue()
+            self.assertIn("Imported: 3, Skipped duplicates: 1", output)
+            self.assertIn("rows/s", output)
+            self.assertIn("peak memory", output)
+
+            self.assertTrue(Team.objects.filter(league=self.league, name="CSV Team C").exists())
+            m = Match.objects.get(league=self.league, home_team__name="CSV Team A")
+            self.assertEqual((m.home_score, m.home_possession, m.home_shots), (2, 55.5, 10))
+            self.assertEqual(Standing.objects.filter(league=self.league).count(), 3)
+            self.assertEqual(verify_standings_for_league(self.league), [])
+
+            # Import ulang: semua dianggap duplikat dari DB
+            out = StringIO()
+            call_command(
+                'import_matches', '--csv', temp_csv_path, '--league-name', self.league.name,
+                '--bulk', stdout=out
+            )
+            self.assertIn("Imported: 0, Skipped duplicates: 4", out.getvalue())
+            self.assertEqual(Match.objects.filter(league=self.league).count(), 3)
+        finally:
+            if os.path.exists(temp_csv_path):
+                os.remove(temp_csv_path)
+
+    def test_import_matches_command_batch_path(self):
+        """Tes mode --path: banyak file/liga diparse paralel, file gagal tidak menghentikan batch."""
+        import shutil
+        temp_dir = tempfile.mkdtemp()
+        header = "season,date,home_team,away_team,goal_home_ft,goal_away_ft\n"
+        files = {
+            "liga_a.csv": header + "2024/2025,2025-01-01,A1,A2,2,1\n2024/2025,2025-01-08,A2,A1,0,0\n",
+            "liga_a_part2.csv": header + "2024/2025,2025-01-15,A1,A2,1,3\n",
+            "liga_b.csv": header + "2024/2025,2025-01-01,B1,B2,1,0\n",
+            "rusak.csv": header + "2024/2025,bukan-tanggal,X1,X2,1,0\n",
+        }
+        try:
+            for name, content in files.items():
+                with open(os.path.join(temp_dir, name), 'w', encoding='utf-8') as f:
+                    f.write(content)
+
+            out, err = StringIO(), StringIO()
+            with self.assertRaises(CommandError) as cm:
+                call_command('import_matches', '--path', temp_dir, '--workers', '2', stdout=out, stderr=err)
+            self.assertIn("1 of 4 files failed", str(cm.exception))
+            self.assertIn("FAILED rusak.csv", err.getvalue())
+            self.assertIn("OK liga_b.csv [liga_b]: imported 1", out.getvalue())
+
+            # Nama liga dari nama file; rusak.csv tidak membuat liga/match apa pun
+            self.assertEqual(Match.objects.filter(league__name="liga_a").count(), 2)
+            self.assertEqual(Match.objects.filter(league__name="liga_b").count(), 1)
+            self.assertFalse(League.objects.filter(name="rusak").exists())
+            self.assertEqual(verify_standings_for_league(League.objects.get(name="liga_b")), [])
+
+            # Glob + --league-name: semua file liga_a* masuk satu liga, standing sekali di akhir
+            out = StringIO()
+            call_command(
+                'import_matches', '--path', os.path.join(temp_dir, "liga_a*.csv"),
+                '--league-name', self.league.name, '--workers', '2', stdout=out
+            )
+            self.assertIn("Files: 2 ok, 0 failed", out.getvalue())
+            self.assertEqual(Match.objects.filter(league=self.league).count(), 3)
+            self.assertEqual(verify_standings_for_league(self.league), [])
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
     def test_import_matches_command_file_not_found(self):
         """Tes command import_matches jika file tidak ada."""
         
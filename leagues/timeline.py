@@ -0,0 +1,168 @@
+# leagues/timeline.py
+"""
+Klasemen "per tanggal / per matchday" dalam satu season.
+
+Untuk tiap (league, season) disiapkan prefix sum kumulatif per tim atas
+match FINISHED yang diurutkan (date, id). Query klasemen di titik mana pun
+cukup mengambil satu irisan array (O(jumlah tim)) lalu diurutkan, tanpa
+agregasi ulang data Match. Hasil precompute disimpan di cache Django dengan
+key yang memuat versi data liga (versioning.py): signal Match dan rebuild
+klasemen menaikkan versi setelah commit, sehingga timeline lama tidak terpakai
+lagi di worker mana pun.
+"""
+import bisect
+from datetime import datetime, time
+
+import numpy as np
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import Match, Team
+from .versioning import bump_data_version, get_data_version
+
+TIMELINE_FIELDS = ("played", "win", "draw", "loss", "gf", "ga", "points")
+_F = {name: i for i, name in enumerate(TIMELINE_FIELDS)}
+
+CACHE_TIMEOUT = 60 * 60 * 24
+
+
+class SeasonTimeline:
+    """
+    cumulative[k, t, f] = nilai field f milik tim team_ids[t] setelah k match
+    pertama season (urut date, id). cumulative[0] adalah klasemen kosong.
+    """
+
+    def __init__(self, season, team_ids, match_ids, dates, cumulative):
+        self.season = season
+        self.team_ids = team_ids
+        self.match_ids = match_ids
+        self.dates = dates          # list datetime (aware), terurut
+        self.cumulative = cumulative
+
+    @property
+    def match_count(self):
+        return len(self.match_ids)
+
+    @property
+    def matches_per_matchday(self):
+        # round-robin: tiap matchday berisi (jumlah tim / 2) pertandingan
+        return max(1, len(self.team_ids) // 2)
+
+    @property
+    def max_matchday(self):
+        return -(-self.match_count // self.matches_per_matchday) if self.match_count else 0
+
+    def index_for_matchday(self, matchday):
+        """Jumlah match yang sudah dimainkan di akhir matchday ke-n."""
+        if matchday < 0:
+            raise ValueError("matchday tidak boleh negatif")
+        return min(self.match_count, matchday * self.matches_per_matchday)
+
+    def index_for_date(self, day):
+        """Jumlah match yang sudah dimainkan sampai akhir tanggal `day` (inklusif)."""
+        end_of_day = timezone.make_aware(datetime.combine(day, time.max))
+        return bisect.bisect_right(self.dates, end_of_day)
+
+    def matchday_for_index(self, index):
+        return -(-index // self.matches_per_matchday)
+
+    def table_at(self, index, team_names=None):
+        """
+        Klasemen setelah `index` match pertama, terurut seperti Standing
+        (-points, -gd, -gf, nama tim). Mengembalikan list dict.
+        """
+        snapshot = self.cumulative[max(0, min(index, self.match_count))]
+        team_names = team_names or {}
+        rows = []
+        for t, team_id in enumerate(self.team_ids):
+            row = {name: int(snapshot[t, i]) for name, i in _F.items()}
+            row["gd"] = row["gf"] - row["ga"]
+            row["team_id"] = team_id
+            row["team_name"] = team_names.get(team_id, "")
+            rows.append(row)
+        rows.sort(key=lambda r: (-r["points"], -r["gd"], -r["gf"], r["team_name"]))
+        for rank, row in enumerate(rows, start=1):
+            row["rank"] = rank
+        return rows
+
+
+def build_season_timeline(league_id, season):
+    """Replay semua match FINISHED season sekali dan bentuk prefix sum per tim."""
+    rows = list(
+        Match.objects.filter(league_id=league_id, season=season, status=Match.Status.FINISHED)
+        .order_by("date", "id")
+        .values_list("id", "date", "home_team_id", "away_team_id", "home_score", "away_score")
+    )
+    if not rows:
+        return SeasonTimeline(season, [], [], [], np.zeros((1, 0, len(TIMELINE_FIELDS)), dtype=np.int32))
+
+    match_ids, dates, home_ids, away_ids, home_scores, away_scores = (list(c) for c in zip(*rows))
+    n = len(rows)
+    team_ids, team_idx = np.unique(np.array(home_ids + away_ids, dtype=np.int64), return_inverse=True)
+    home_idx, away_idx = team_idx[:n], team_idx[n:]
+    hs = np.array(home_scores, dtype=np.int32)
+    as_ = np.array(away_scores, dtype=np.int32)
+
+    step = np.zeros((n, len(team_ids), len(TIMELINE_FIELDS)), dtype=np.int32)
+    m = np.arange(n)
+    for idx, gf, ga in ((home_idx, hs, as_), (away_idx, as_, hs)):
+        step[m, idx, _F["played"]] = 1
+        step[m, idx, _F["win"]] = gf > ga
+        step[m, idx, _F["draw"]] = gf == ga
+        step[m, idx, _F["loss"]] = gf < ga
+        step[m, idx, _F["gf"]] = gf
+        step[m, idx, _F["ga"]] = ga
+        step[m, idx, _F["points"]] = 3 * (gf > ga) + (gf == ga)
+
+    cumulative = np.zeros((n + 1, len(team_ids), len(TIMELINE_FIELDS)), dtype=np.int32)
+    np.cumsum(step, axis=0, out=cumulative[1:])
+    return SeasonTimeline(season, [int(t) for t in team_ids], match_ids, dates, cumulative)
+
+
+def _timeline_key(league_id, season):
+    return f"leagues:timeline:{league_id}:{get_data_version(league_id)}:{season}"
+
+
+def get_season_timeline(league, season):
+    """Ambil SeasonTimeline dari cache, bangun ulang jika belum ada/invalid."""
+    league_id = getattr(league, "pk", league)
+    key = _timeline_key(league_id, season)
+    timeline = cache.get(key)
+    if timeline is None:
+        timeline = build_season_timeline(league_id, season)
+        cache.set(key, timeline, CACHE_TIMEOUT)
+    return timeline
+
+
+def invalidate_season_timeline(league_id, season):
+    bump_data_version(league_id)
+
+
+def invalidate_league_timelines(league_id):
+    """Invalidate semua season sebuah liga sekaligus (dipakai setelah rebuild/import)."""
+    bump_data_version(league_id)
+
+
+def standings_as_of(league, season, matchday=None, day=None):
+    """
+    Klasemen season pada akhir `matchday` atau akhir tanggal `day`.
+    Mengembalikan (rows, info) dengan info berisi matchday, max_matchday,
+    jumlah match yang dihitung dan tanggal match terakhir yang dihitung.
+    """
+    timeline = get_season_timeline(league, season)
+    if matchday is not None:
+        index = timeline.index_for_matchday(matchday)
+    elif day is not None:
+        index = timeline.index_for_date(day)
+    else:
+        index = timeline.match_count
+
+    names = dict(Team.objects.filter(pk__in=timeline.team_ids).values_list("id", "name"))
+    rows = timeline.table_at(index, names)
+    info = {
+        "matchday": timeline.matchday_for_index(index),
+        "max_matchday": timeline.max_matchday,
+        "matches_counted": index,
+        "last_match_date": timeline.dates[index - 1].isoformat() if index else None,
+    }
+    return rows, info
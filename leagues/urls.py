@@ -18,14 +18,25 @@ urlpatterns = [
     path('api/leagues/', views.show_leagues_json, name='show_leagues_json'),
     path('api/dashboard/', views.league_dashboard_flutter, name='league_dashboard_flutter'),
     path('api/standings-page/', views.standings_flutter, name='standings_flutter'),
+    path('api/standings/history/', views.standings_history_flutter, name='standings_history_flutter'),
+    path('api/h2h/<int:team_a>/<int:team_b>/', views.head_to_head_flutter, name='head_to_head_flutter'),
+    path('api/seasons/<path:season>/analytics/', views.season_analytics_flutter, name='season_analytics_flutter'),
+    path('api/simulation/', views.season_simulation_flutter, name='season_simulation_flutter'),
+    path('api/ratings/', views.ratings_flutter, name='ratings_flutter'),
     path('api/matches-page/', views.matches_flutter, name='matches_flutter'),
     path('api/teams-page/', views.teams_flutter, name='teams_flutter'),
     path('api/teams/', views.show_teams_json, name='show_teams_json'),
+    path('api/teams/<int:team_id>/stats/', views.team_stats_flutter, name='team_stats_flutter'),
     path('api/teams/create/', views.create_team_flutter, name='create_team_flutter'),
     path('api/teams/edit/<int:id>/', views.edit_team_flutter, name='edit_team_flutter'),
     path('api/teams/delete/<int:id>/', views.delete_team_flutter, name='delete_team_flutter'),
     path('api/matches/', views.show_matches_json, name='show_matches_json'),
+    path('api/matches/export.npz', views.export_matches_npz, name='export_matches_npz'),
+    path('api/matches/live/', views.live_scores_sse, name='live_scores_sse'),
+    path('api/matches/batch/', views.match_detail_batch_flutter, name='match_detail_batch_flutter'),
     path('api/matches/<int:id>/', views.match_detail_flutter, name='match_detail_flutter'),
+    path('api/matches/bulk/', views.bulk_matches_flutter, name='bulk_matches_flutter'),
+    path('api/matches/<int:id>/similar/', views.similar_matches_flutter, name='similar_matches_flutter'),
     path('api/matches/create/', views.create_match_flutter, name='create_match_flutter'),
     path('api/matches/edit/<int:id>/', views.edit_match_flutter, name='edit_match_flutter'),
     path('api/matches/delete/<int:id>/', views.delete_match_flutter, name='delete_match_flutter'),
@@ -0,0 +1,98 @@
+# leagues/versioning.py
+"""
+Versi data per liga untuk conditional GET (ETag / Last-Modified).
+
+Setiap penulisan Match, Team, Standing atau League menaikkan versi liganya.
+Versi disimpan di kolom League.data_version (bukan cache lokal proses) agar
+semua worker melihat nilai yang sama; nilainya timestamp nanodetik saat
+penulisan, dinaikkan di DB dengan Greatest(versi + 1, sekarang) sehingga selalu
+bertambah walau jam antar-worker sedikit berbeda.
+
+Kenaikan dijalankan setelah commit, sekali per transaksi: baris League tidak
+dikunci selama transaksi penulisan (penulisan match bersamaan tidak saling
+menunggu / deadlock di baris itu), dan rollback tidak mengubah versi.
+API baca mobile membandingkan If-None-Match / If-Modified-Since dengan versi
+ini dan menjawab 304 setelah satu query pk. Hanya view yang keluarannya
+bergantung pada waktu sekarang (match "akan datang") yang validatornya juga
+berganti per bucket waktu.
+"""
+import hashlib
+import time
+from datetime import datetime, timezone
+
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.views.decorators.http import condition
+
+from .deferred import on_commit_once
+from .models import League
+
+# representasi yang memfilter "upcoming" bergantung pada waktu sekarang, jadi validatornya
+# juga berganti tiap interval ini (hanya untuk view/request yang ditandai depends_on_clock)
+TIME_BUCKET_SECONDS = 300
+
+
+def get_data_version(league_id):
+    version = League.objects.filter(pk=league_id).values_list("data_version", flat=True).first()
+    return version or 0
+
+
+def _bump_now(league_id):
+    League.objects.filter(pk=league_id).update(
+        data_version=Greatest(F("data_version") + 1, Value(time.time_ns()))
+    )
+
+
+def bump_data_version(league_id):
+    on_commit_once(("data-version", league_id), lambda: _bump_now(league_id))
+
+
+def _default_league_version(request):
+    """(id, versi) liga yang dipakai API mobile (League.objects.first()); satu query per request."""
+    if not hasattr(request, "_league_version"):
+        request._league_version = League.objects.order_by("pk").values_list("pk", "data_version").first()
+    return request._league_version
+
+
+def _time_bucket():
+    return int(time.time() // TIME_BUCKET_SECONDS)
+
+
+def league_condition(depends_on_clock=None):
+    """
+    Decorator conditional GET untuk API baca liga default: ETag kuat + Last-Modified,
+    304 jika tidak berubah. `depends_on_clock(request)` menandai request yang
+    keluarannya bergantung pada waktu sekarang; hanya validator request itu yang
+    ikut berganti tiap TIME_BUCKET_SECONDS.
+    """
+    def bucket(request):
+        return _time_bucket() if depends_on_clock is not None and depends_on_clock(request) else None
+
+    def etag(request, *args, **kwargs):
+        state = _default_league_version(request)
+        if state is None:
+            return None
+        league_id, version = state
+        # representasi berbeda per query string (season, tab, cursor, ...)
+        variant = hashlib.sha1(request.get_full_path().encode()).hexdigest()[:16]
+        tag = f"{league_id}-{version}"
+        current = bucket(request)
+        if current is not None:
+            tag = f"{tag}-{current}"
+        return f"{tag}-{variant}"
+
+    def last_modified(request, *args, **kwargs):
+        state = _default_league_version(request)
+        if state is None:
+            return None
+        changed = state[1] / 1e9
+        current = bucket(request)
+        if current is not None:
+            changed = max(changed, current * TIME_BUCKET_SECONDS)
+        return datetime.fromtimestamp(changed, tz=timezone.utc)
+
+    return condition(etag_func=etag, last_modified_func=last_modified)
+
+
+# API baca yang keluarannya hanya bergantung pada data liga
+league_read_condition = league_condition()
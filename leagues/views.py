@@ -1,9 +1,9 @@
 from django.utils import timezone
 from django.views.generic import ListView, DetailView
 from django.shortcuts import get_object_or_404, redirect, render
-from .models import League, Match, Standing, Team
+from .models import League, Match, Season, Standing, Team, TeamSeasonStats
 from django.views.generic import TemplateView
-from django.db.models import Q, F
+from django.db.models import Exists, F, OuterRef, Q
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from .permissions import is_content_staff
 from django.urls import reverse_lazy
@@ -11,12 +11,29 @@ from django.views.generic import UpdateView, DeleteView, CreateView
 from .forms import MatchUpdateForm, MatchCreateForm
 from django.contrib import messages
 from django.http import JsonResponse, HttpResponseRedirect 
-from django.http import HttpResponse
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.core.handlers.asgi import ASGIRequest
 from django.core import serializers
 from .models import League, Team, Match, Standing
 import json
 from django.views.decorators.csrf import csrf_exempt
-from django.utils.dateparse import parse_datetime
+from django.utils.dateparse import parse_date, parse_datetime
+from .timeline import standings_as_of
+from .services import get_rank_history, get_head_to_head
+from .ratings import get_ratings, get_rating_history
+from .pagination import InvalidPage, keyset_page, parse_limit
+from .versioning import league_condition, league_read_condition
+from .dashboard import get_dashboard_snapshot
+from .streaming import streaming_json_response
+from .fields import MATCH_DETAIL_FIELDS, MATCH_LIST_FIELDS, InvalidFields, columns_for, parse_fields, project
+from .seasons import get_seasons, sort_seasons
+from .search import search_team_ids
+from .columnar import ALL_SEASONS, open_columnar_export
+from .batch import BATCH_LIMIT, apply_match_batch
+from .live import get_broker, match_event
+from .analytics import get_season_analytics
+from .simulation import get_season_simulation
+from .similarity import DEFAULT_SIMILAR_K, MAX_SIMILAR_K, NotIndexed, similar_matches
 
 def _is_ajax(request):
     """ Cek apakah request datang dari AJAX """
@@ -43,45 +60,12 @@ class LeagueDashboardView(DetailView):
 
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
-        league = self.object
-
-        # season terbaru: ambil distinct season dari Match, pilih paling "besar" secara leksikografis
-        seasons = (
-            Match.objects.filter(league=league)
-            .values_list("season", flat=True)
-            .distinct()
-        )
-        latest_season = None
-        if seasons:
-            latest_season = sorted(seasons)[-1]  # "10/11","11/12",... -> cukup untuk MVP
-        ctx["latest_season"] = latest_season
-
-        # standings untuk season terbaru
-        standings = []
-        if latest_season:
-            standings = (
-                Standing.objects.filter(league=league, season=latest_season)
-                .select_related("team")
-            )
-        ctx["standings"] = standings
-
-        # pertandingan terbaru selesai (5)
-        finished = (
-            Match.objects.filter(league=league, status=Match.Status.FINISHED)
-            .select_related("home_team", "away_team")
-            .order_by("-date")[:5]
-        )
-        ctx["finished_recent"] = finished
-
-        # pertandingan akan datang (5) – bisa kosong jika dataset FT semua
-        now = timezone.now()  # USE_TZ=True → ini UTC-aware
-        upcoming = (
-            Match.objects.filter(league=league, date__gt=now)
-            .select_related("home_team", "away_team")
-            .order_by("date")[:5]
-        )
-        ctx["upcoming"] = upcoming
-
+        # season terbaru, klasemennya, 5 match selesai & 5 akan datang dari snapshot cache
+        snapshot = get_dashboard_snapshot(self.object)
+        ctx["latest_season"] = snapshot["latest_season"]
+        ctx["standings"] = snapshot["standings"]
+        ctx["finished_recent"] = snapshot["finished_recent"]
+        ctx["upcoming"] = snapshot["upcoming"]
         return ctx
 
 class MatchListView(ListView):
@@ -104,8 +88,9 @@ class MatchListView(ListView):
 
         # filter tambahan (opsional)
         team = self.request.GET.get("team")
-        if team:
-            qs = qs.filter(Q(home_team__name__icontains=team) | Q(away_team__name__icontains=team))
+        team_ids = search_team_ids(league, team) if team else None
+        if team_ids is not None:
+            qs = qs.filter(Q(home_team_id__in=team_ids) | Q(away_team_id__in=team_ids))
 
         date_from = self.request.GET.get("from")
         date_to = self.request.GET.get("to")
@@ -134,13 +119,8 @@ class StandingsView(TemplateView):
         league = League.objects.get(pk=self.kwargs["pk"])
         ctx["league"] = league
 
-        # daftar musim yang tersedia dari data Match
-        seasons = list(
-            Match.objects.filter(league=league)
-            .values_list("season", flat=True)
-            .distinct()
-        )
-        seasons.sort()  # "10/11","11/12", ...
+        # daftar musim dari registry Season (ter-cache, urut kronologis)
+        seasons = get_seasons(league)
 
         # pilih musim dari query ?season=..., default: musim terakhir
         selected = self.request.GET.get("season") or (seasons[-1] if seasons else None)
@@ -165,8 +145,9 @@ class TeamListView(ListView):
         league = League.objects.get(pk=self.kwargs["pk"])
         qs = Team.objects.filter(league=league).order_by("name")
         q = self.request.GET.get("q")
-        if q:
-            qs = qs.filter(name__icontains=q)
+        team_ids = search_team_ids(league, q) if q else None
+        if team_ids is not None:
+            qs = qs.filter(pk__in=team_ids)
         return qs
 
     def get_context_data(self, **kwargs):
@@ -203,24 +184,27 @@ class TeamDetailView(TemplateView):
         ctx["team"] = team
         ctx["league"] = league
 
-        # daftar musim untuk navigasi
+        # daftar musim untuk navigasi: season registry liga (urut kronologis) tempat tim ini
+        # punya match apa pun (termasuk yang baru terjadwal); EXISTS per season lewat indeks
+        # (league, season, home/away_team), tanpa DISTINCT atas Match
+        plays = Match.objects.filter(league=league, season=OuterRef("name"))
         seasons = list(
-            Match.objects.filter(Q(home_team=team) | Q(away_team=team))
-            .values_list("season", flat=True).distinct()
+            Season.objects.filter(league=league)
+            .filter(Exists(plays.filter(home_team=team)) | Exists(plays.filter(away_team=team)))
+            .values_list("name", flat=True)
         )
-        seasons.sort()
+        standings = {s.season: s for s in Standing.objects.select_related("team").filter(league=league, team=team)}
         selected = self.request.GET.get("season") or (seasons[-1] if seasons else None)
         ctx["seasons"] = seasons
         ctx["selected_season"] = selected
 
         # posisi di klasemen musim terpilih
-        standing = None
-        if selected:
-            standing = (Standing.objects
-                        .select_related("team")
-                        .filter(league=league, season=selected, team=team)
-                        .first())
-        ctx["standing"] = standing
+        ctx["standing"] = standings.get(selected)
+
+        # statistik rata-rata per match musim terpilih (tabel TeamSeasonStats)
+        ctx["season_stats"] = (TeamSeasonStats.objects
+                               .filter(league=league, season=selected, team=team)
+                               .first()) if selected else None
 
         # 5 laga terakhir (FINISHED) untuk musim terpilih
         recent = (Match.objects
@@ -415,25 +399,60 @@ def show_leagues_json(request):
     return HttpResponse(serializers.serialize("json", data), content_type="application/json")
 
 def show_teams_json(request):
-    data = Team.objects.all()
-    return HttpResponse(serializers.serialize("json", data), content_type="application/json")
+    return streaming_json_response(request, Team.objects.order_by("pk"))
 
 def show_matches_json(request):
+    """
+    Dump Match (format serializer Django), terbaru lebih dulu, per halaman.
+    Parameter: ?limit=N, ?cursor=<token>. Token halaman berikutnya ada di
+    header X-Next-Cursor (dan Link rel="next"); tidak ada header = halaman terakhir.
+    ?all=1 mengekspor semua match liga sekaligus (di-stream, tanpa paginasi).
+    """
     league = League.objects.first()
     if not league:
         return HttpResponse("[]", content_type="application/json")
-    
-    data = Match.objects.filter(league=league).order_by('-date')
-    return HttpResponse(serializers.serialize("json", data), content_type="application/json")
 
-def show_standings_json(request):
-    data = Standing.objects.all()
-    return HttpResponse(serializers.serialize("json", data), content_type="application/json")
+    if request.GET.get("all") == "1":
+        return streaming_json_response(request, Match.objects.filter(league=league).order_by("-date", "-id"))
+
+    try:
+        data, next_cursor = keyset_page(
+            Match.objects.filter(league=league),
+            cursor=request.GET.get("cursor"),
+            limit=parse_limit(request.GET.get("limit")),
+        )
+    except InvalidPage as e:
+        return JsonResponse({"status": "error", "message": str(e)}, status=400)
+
+    response = streaming_json_response(request, data)
+    if next_cursor:
+        params = request.GET.copy()
+        params["cursor"] = next_cursor
+        response["X-Next-Cursor"] = next_cursor
+        response["Link"] = f'<{request.build_absolute_uri(request.path)}?{params.urlencode()}>; rel="next"'
+    return response
 
 def show_standings_json(request):
     league = League.objects.first()
     data = Standing.objects.filter(league=league).order_by('-points', '-gd', '-gf')
-    return HttpResponse(serializers.serialize("json", data), content_type="application/json")
+    return streaming_json_response(request, data)
+
+def export_matches_npz(request):
+    """
+    Ekspor kolumnar Match (NumPy .npz) untuk analitik: satu array per kolom.
+    Parameter: ?season=... (default: semua season). File di-cache per versi data liga.
+    """
+    league = League.objects.first()
+    if not league:
+        return JsonResponse({"status": "error", "message": "Belum ada data liga."}, status=404)
+
+    season = request.GET.get("season") or None
+    if season and season not in get_seasons(league):
+        return JsonResponse({"status": "error", "message": "Season tidak ditemukan."}, status=404)
+
+    filename = f"matches-{(season or ALL_SEASONS).replace('/', '-')}.npz"
+    return FileResponse(open_columnar_export(league.pk, season), as_attachment=True, filename=filename,
+                        content_type="application/octet-stream")
 
 @csrf_exempt
 def create_team_flutter(request):
@@ -634,6 +653,47 @@ def create_match_flutter(request):
     except Exception as e:
         return JsonResponse({"status": "error", "message": str(e)}, status=500)
     
+@csrf_exempt
+def bulk_matches_flutter(request):
+    """
+    API tulis banyak match sekaligus (mis. satu matchday penuh).
+    Body: {"matches": [{...}, ...]}; item tanpa "id" = create, dengan "id" = update.
+    Semua item divalidasi dulu (gagal satu -> tidak ada yang ditulis), lalu ditulis
+    dalam satu transaksi; klasemen dibangun ulang sekali per season terdampak.
+    """
+    if request.method != 'POST':
+        return JsonResponse({"status": "error", "message": "Method not allowed"}, status=405)
+
+    if not request.user.is_authenticated or not request.user.is_staff:
+        return JsonResponse({"status": "error", "message": "Hanya admin yang boleh melakukan ini!"}, status=403)
+
+    try:
+        try:
+            items = json.loads(request.body).get("matches")
+        except (ValueError, AttributeError):
+            items = None
+        if not isinstance(items, list) or not items:
+            return JsonResponse({"status": "error", "message": "Body harus berisi list matches."}, status=400)
+        if len(items) > BATCH_LIMIT:
+            return JsonResponse(
+                {"status": "error", "message": f"Maksimal {BATCH_LIMIT} item per request."}, status=400
+            )
+
+        league = League.objects.first()
+        if not league:
+            return JsonResponse({"status": "error", "message": "Belum ada data liga."}, status=404)
+
+        ok, results = apply_match_batch(league, items)
+        if not ok:
+            return JsonResponse(
+                {"status": "error", "message": "Sebagian item tidak valid, tidak ada yang disimpan.", "results": results},
+                status=400,
+            )
+        return JsonResponse({"status": "success", "results": results}, status=200)
+
+    except Exception as e:
+        return JsonResponse({"status": "error", "message": str(e)}, status=500)
+
 @csrf_exempt
 def edit_match_flutter(request, id):
     if request.method != 'POST':
@@ -733,6 +793,7 @@ def delete_team_flutter(request, id):
         return JsonResponse({"status": "error", "message": "Tim tidak ditemukan."}, status=404)
     
 @csrf_exempt
+@league_condition(depends_on_clock=lambda request: True)  # daftar match akan datang
 def league_dashboard_flutter(request):
     """
     API khusus untuk menyediakan data ringkas bagi halaman League Summary di Mobile.
@@ -744,34 +805,27 @@ def league_dashboard_flutter(request):
         if not league:
             return JsonResponse({"status": "error", "message": "Belum ada data liga."}, status=404)
 
-        # 1. Cari Season Terbaru
-        seasons = Match.objects.filter(league=league).values_list("season", flat=True).distinct()
-        latest_season = sorted(seasons)[-1] if seasons else None
+        # 1. Season terbaru, klasemen, match terakhir & akan datang dari snapshot cache
+        snapshot = get_dashboard_snapshot(league)
+        latest_season = snapshot["latest_season"]
 
         # 2. Ambil Klasemen (Hanya 5 teratas untuk preview)
         standings_data = []
-        if latest_season:
-            top_standings = Standing.objects.filter(
-                league=league, season=latest_season
-            ).select_related("team").order_by('-points', '-gd', '-gf')[:5]
-            
-            for s in top_standings:
-                standings_data.append({
-                    "team_id": s.team.pk,  # <--- WAJIB ADA untuk navigasi ke Detail Tim
-                    "team_name": s.team.name,
-                    "played": s.played,
-                    "points": s.points,
-                    "gd": s.gd,
-                    "rank": 0 # Nanti diurus di frontend atau enumerate
-                })
+        for s in snapshot["standings"][:5]:
+            standings_data.append({
+                "team_id": s.team.pk,  # <--- WAJIB ADA untuk navigasi ke Detail Tim
+                "team_name": s.team.name,
+                "played": s.played,
+                "points": s.points,
+                "gd": s.gd,
+                "form": s.form,
+                "form_points": s.form_points,
+                "rank": 0 # Nanti diurus di frontend atau enumerate
+            })
 
         # 3. Pertandingan Terakhir Selesai (5 item)
-        recent_matches = Match.objects.filter(
-            league=league, status=Match.Status.FINISHED
-        ).select_related("home_team", "away_team").order_by("-date")[:5]
-
         recent_data = []
-        for m in recent_matches:
+        for m in snapshot["finished_recent"]:
             recent_data.append({
                 "id": m.pk,
                 "home_team": m.home_team.name,
@@ -783,13 +837,8 @@ def league_dashboard_flutter(request):
             })
 
         # 4. Pertandingan Akan Datang (5 item)
-        now = timezone.now()
-        upcoming_matches = Match.objects.filter(
-            league=league, date__gt=now
-        ).select_related("home_team", "away_team").order_by("date")[:5]
-
         upcoming_data = []
-        for m in upcoming_matches:
+        for m in snapshot["upcoming"]:
             upcoming_data.append({
                 "id": m.pk,
                 "home_team": m.home_team.name,
@@ -811,20 +860,47 @@ def league_dashboard_flutter(request):
         return JsonResponse({"status": "error", "message": str(e)}, status=500)
     
 @csrf_exempt
+@league_read_condition
 def standings_flutter(request):
     try:
         league = League.objects.first()
         if not league:
             return JsonResponse({"status": "error", "message": "Belum ada data liga."}, status=404)
 
-        # 1. Ambil daftar seasons
-        seasons = list(Match.objects.filter(league=league).values_list("season", flat=True).distinct())
-        seasons.sort()
+        # 1. Ambil daftar seasons (registry Season, urut kronologis)
+        seasons = get_seasons(league)
 
         # 2. Tentukan season terpilih
         req_season = request.GET.get("season")
         selected_season = req_season if req_season in seasons else (seasons[-1] if seasons else None)
 
+        # 3a. Klasemen per tanggal / matchday (opsional): ?matchday=N atau ?date=YYYY-MM-DD
+        req_matchday = request.GET.get("matchday")
+        req_date = request.GET.get("date")
+        if selected_season and (req_matchday or req_date):
+            try:
+                if req_matchday:
+                    matchday, day = int(req_matchday), None
+                    if matchday < 0:
+                        raise ValueError
+                else:
+                    matchday, day = None, parse_date(req_date)
+                    if day is None:
+                        raise ValueError
+            except ValueError:
+                return JsonResponse({"status": "error", "message": "Parameter matchday/date tidak valid."}, status=400)
+
+            rows, info = standings_as_of(league, selected_season, matchday=matchday, day=day)
+            for row in rows:
+                row.update(id=None, league_id=league.pk)
+            return JsonResponse({
+                "status": "success",
+                "seasons": seasons,
+                "selected_season": selected_season,
+                "standings": rows,
+                **info,
+            }, status=200)
+
         # 3. Ambil data Standing
         standings_data = []
         if selected_season:
@@ -846,6 +922,8 @@ def standings_flutter(request):
                     "ga": s.ga,
                     "gd": s.gd,
                     "points": s.points,
+                    "form": s.form,
+                    "form_points": s.form_points,
                 })
 
         return JsonResponse({
@@ -859,62 +937,244 @@ def standings_flutter(request):
         return JsonResponse({"status": "error", "message": str(e)}, status=500)
     
 @csrf_exempt
+@league_read_condition
+def season_analytics_flutter(request, season):
+    """
+    API statistik liga satu season: gol/kartu per match, persentase hasil,
+    korelasi penguasaan bola & tembakan vs hasil. Satu query aggregate, di-cache.
+    """
+    try:
+        league = League.objects.first()
+        if not league:
+            return JsonResponse({"status": "error", "message": "Belum ada data liga."}, status=404)
+        if season not in get_seasons(league):
+            return JsonResponse({"status": "error", "message": "Season tidak ditemukan."}, status=404)
+
+        return JsonResponse({"status": "success", **get_season_analytics(league, season)}, status=200)
+
+    except Exception as e:
+        return JsonResponse({"status": "error", "message": str(e)}, status=500)
+
+@csrf_exempt
+@league_read_condition
+def season_simulation_flutter(request):
+    """
+    API peluang akhir season (juara / 4 besar / degradasi) dari simulasi Monte Carlo
+    sisa match. Parameter: ?season=... (default: season terbaru). Hasil disimpan
+    dan baru dihitung ulang setelah hasil/jadwal match berubah.
+    """
+    try:
+        league = League.objects.first()
+        if not league:
+            return JsonResponse({"status": "error", "message": "Belum ada data liga."}, status=404)
+
+        seasons = get_seasons(league)
+        season = request.GET.get("season") or (seasons[-1] if seasons else None)
+        if season not in seasons:
+            return JsonResponse({"status": "error", "message": "Season tidak ditemukan."}, status=404)
+
+        return JsonResponse({"status": "success", **get_season_simulation(league, season)}, status=200)
+
+    except Exception as e:
+        return JsonResponse({"status": "error", "message": str(e)}, status=500)
+
+@csrf_exempt
+def standings_history_flutter(request):
+    """
+    API riwayat posisi klasemen per matchday (untuk grafik "posisi sepanjang season").
+    Parameter: ?season=... (default: season terbaru), ?team=<id> (boleh berulang).
+    Format ringkas: satu array per tim, sejajar dengan "matchdays".
+    """
+    try:
+        league = League.objects.first()
+        if not league:
+            return JsonResponse({"status": "error", "message": "Belum ada data liga."}, status=404)
+
+        seasons = get_seasons(league)
+        req_season = request.GET.get("season")
+        selected_season = req_season if req_season in seasons else (seasons[-1] if seasons else None)
+
+        try:
+            team_ids = [int(t) for t in request.GET.getlist("team")]
+        except ValueError:
+            return JsonResponse({"status": "error", "message": "Parameter team tidak valid."}, status=400)
+
+        matchdays, history = get_rank_history(league, selected_season, team_ids) if selected_season else ([], {})
+        names = dict(Team.objects.filter(pk__in=history.keys()).values_list("id", "name"))
+
+        teams_data = []
+        for team_id, points in sorted(history.items(), key=lambda kv: (kv[1][-1][1], kv[0])):
+            teams_data.append({
+                "team_id": team_id,
+                "team_name": names.get(team_id, ""),
+                "rank": [p[1] for p in points],
+                "points": [p[2] for p in points],
+                "gd": [p[3] for p in points],
+            })
+
+        return JsonResponse({
+            "status": "success",
+            "season": selected_season,
+            "matchdays": matchdays,
+            "teams": teams_data,
+        }, status=200)
+
+    except Exception as e:
+        return JsonResponse({"status": "error", "message": str(e)}, status=500)
+
+@csrf_exempt
+def head_to_head_flutter(request, team_a, team_b):
+    """
+    API rekap head-to-head dua tim (semua season), dari sudut pandang tim pertama.
+    Dibaca dari indeks HeadToHead, bukan dari scan tabel Match.
+    """
+    try:
+        if team_a == team_b:
+            return JsonResponse({"status": "error", "message": "Tim tidak boleh sama."}, status=400)
+        teams = Team.objects.in_bulk([team_a, team_b])
+        if len(teams) < 2:
+            return JsonResponse({"status": "error", "message": "Tim tidak ditemukan."}, status=404)
+
+        a, b = teams[team_a], teams[team_b]
+        h2h = get_head_to_head(a, b)
+        return JsonResponse({
+            "status": "success",
+            "team_a": {"id": a.pk, "name": a.name, "wins": h2h["a_wins"], "goals": h2h["a_goals"]},
+            "team_b": {"id": b.pk, "name": b.name, "wins": h2h["b_wins"], "goals": h2h["b_goals"]},
+            "meetings": h2h["meetings"],
+            "draws": h2h["draws"],
+            "recent_match_ids": h2h["recent_match_ids"],
+        }, status=200)
+
+    except Exception as e:
+        return JsonResponse({"status": "error", "message": str(e)}, status=500)
+
+@csrf_exempt
+def team_stats_flutter(request, team_id):
+    """
+    API statistik season satu tim (total & rata-rata per match, for/against).
+    Parameter: ?season=... (default: season terbaru tim tsb).
+    """
+    try:
+        team = Team.objects.get(pk=team_id)
+        stats_qs = TeamSeasonStats.objects.filter(team=team)
+        seasons = sort_seasons(stats_qs.values_list("season", flat=True))
+        req_season = request.GET.get("season")
+        selected_season = req_season if req_season in seasons else (seasons[-1] if seasons else None)
+
+        stats = stats_qs.filter(season=selected_season).first() if selected_season else None
+        return JsonResponse({
+            "status": "success",
+            "team_id": team.pk,
+            "team_name": team.name,
+            "season": selected_season,
+            "seasons": seasons,
+            "matches": stats.matches if stats else 0,
+            "stats": stats.stat_rows() if stats else [],
+        }, status=200)
+
+    except Team.DoesNotExist:
+        return JsonResponse({"status": "error", "message": "Tim tidak ditemukan."}, status=404)
+    except Exception as e:
+        return JsonResponse({"status": "error", "message": str(e)}, status=500)
+
+@csrf_exempt
+def ratings_flutter(request):
+    """
+    API ranking rating Elo tim liga (dari tabel TeamRating).
+    Parameter opsional: ?team=<id> untuk menyertakan riwayat rating tim tsb.
+    """
+    try:
+        league = League.objects.first()
+        if not league:
+            return JsonResponse({"status": "error", "message": "Belum ada data liga."}, status=404)
+
+        data = {"status": "success", "league": league.name, "ratings": get_ratings(league)}
+
+        team_param = request.GET.get("team")
+        if team_param:
+            try:
+                team = Team.objects.get(pk=int(team_param), league=league)
+            except (ValueError, Team.DoesNotExist):
+                return JsonResponse({"status": "error", "message": "Parameter team tidak valid."}, status=400)
+            data["history"] = {"team_id": team.pk, "team_name": team.name, "points": get_rating_history(team)}
+
+        return JsonResponse(data, status=200)
+
+    except Exception as e:
+        return JsonResponse({"status": "error", "message": str(e)}, status=500)
+
+def _lists_upcoming(request):
+    # tab upcoming memfilter date > sekarang, jadi isinya berganti seiring waktu
+    return request.GET.get("tab") == "upcoming"
+
+@csrf_exempt
+@league_condition(depends_on_clock=_lists_upcoming)
 def matches_flutter(request):
     """
     API untuk halaman Jadwal/Matches (Tab 3).
-    Mendukung filter ?tab=upcoming|finished|all dan ?q=nama_tim
+    Mendukung filter ?tab=upcoming|finished|all dan ?q=nama_tim.
+    Paginasi keyset: ?limit=N (maks 200) dan ?cursor=<token dari field "next">.
+    ?fields=a,b,c memilih field per match (lihat leagues/fields.py); default tanpa statistik.
     """
     try:
         league = League.objects.first()
         if not league:
             return JsonResponse({"status": "error", "message": "Belum ada data liga."}, status=404)
 
-        # 1. Base Queryset
-        qs = Match.objects.filter(league=league).select_related("home_team", "away_team").order_by("-date")
+        try:
+            fields = parse_fields(request.GET.get("fields"), MATCH_LIST_FIELDS)
+        except InvalidFields as e:
+            return JsonResponse({"status": "error", "message": str(e)}, status=400)
+
+        # 1. Base Queryset (hanya kolom yang dibutuhkan; date & id untuk cursor)
+        qs = Match.objects.filter(league=league)
 
         # 2. Filter Tab
         tab = request.GET.get("tab", "all")
         now = timezone.now()
-        
+        descending = True
+
         if tab == "upcoming":
             # Urutkan dari yang terdekat (ascending)
-            qs = qs.filter(date__gt=now).order_by("date")
+            qs = qs.filter(date__gt=now)
+            descending = False
         elif tab == "finished":
             # Urutkan dari yang baru selesai (descending)
             qs = qs.filter(status=Match.Status.FINISHED)
         # else "all": default order by -date
 
-        # 3. Filter Search Query (Nama Tim)
+        # 3. Filter Search Query (Nama Tim -> id tim dari indeks pencarian)
         query = request.GET.get("q", "")
-        if query:
-            qs = qs.filter(Q(home_team__name__icontains=query) | Q(away_team__name__icontains=query))
+        team_ids = search_team_ids(league, query) if query else None
+        if team_ids is not None:
+            qs = qs.filter(Q(home_team_id__in=team_ids) | Q(away_team_id__in=team_ids))
+
+        qs = qs.values(*columns_for(fields, extra=("id", "date")))
+
+        # 4. Ambil satu halaman (date, id) setelah cursor
+        try:
+            page, next_cursor = keyset_page(
+                qs, cursor=request.GET.get("cursor"),
+                limit=parse_limit(request.GET.get("limit")), descending=descending,
+            )
+        except InvalidPage as e:
+            return JsonResponse({"status": "error", "message": str(e)}, status=400)
+
+        # 5. Serialize Data
+        matches_data = [project(row, fields) for row in page]
 
-        # 4. Serialize Data
-        matches_data = []
-        for m in qs:
-            matches_data.append({
-                "id": m.pk,
-                "home_team": m.home_team.name,
-                "home_team_id": m.home_team.pk,
-                "away_team": m.away_team.name,
-                "away_team_id": m.away_team.pk,
-                "home_score": m.home_score,
-                "away_score": m.away_score,
-                "date": m.date.isoformat(),
-                "status": m.status, # SCHEDULED / FINISHED / LIVE / POSTPONED
-                "is_finished": m.status == "FINISHED",
-                "season": m.season,
-            })
-        
         return JsonResponse({
             "status": "success",
             "matches": matches_data,
+            "next": next_cursor,  # None = halaman terakhir
         }, status=200)
 
     except Exception as e:
         return JsonResponse({"status": "error", "message": str(e)}, status=500)
     
 @csrf_exempt
+@league_read_condition
 def teams_flutter(request):
     """
     API untuk halaman Daftar Tim (Tab 4).
@@ -930,8 +1190,9 @@ def teams_flutter(request):
 
         # 2. Filter Search Query
         query = request.GET.get("q", "")
-        if query:
-            qs = qs.filter(name__icontains=query)
+        team_ids = search_team_ids(league, query) if query else None
+        if team_ids is not None:
+            qs = qs.filter(pk__in=team_ids)
 
         # 3. Serialize Data
         teams_data = []
@@ -951,48 +1212,167 @@ def teams_flutter(request):
     except Exception as e:
         return JsonResponse({"status": "error", "message": str(e)}, status=500)
     
+@csrf_exempt
+def similar_matches_flutter(request, id):
+    """
+    API match yang mirip secara statistik dengan match `id` (nearest neighbour
+    atas 24 kolom statistik). Parameter: ?k=N (default 10, maks 50).
+    """
+    try:
+        try:
+            k = int(request.GET.get("k", DEFAULT_SIMILAR_K))
+            if k < 1:
+                raise ValueError
+        except ValueError:
+            return JsonResponse({"status": "error", "message": "Parameter k tidak valid."}, status=400)
+
+        league_id = Match.objects.filter(pk=id).values_list("league_id", flat=True).first()
+        if league_id is None:
+            return JsonResponse({"status": "error", "message": "Pertandingan tidak ditemukan."}, status=404)
+        try:
+            neighbours = similar_matches(league_id, id, min(k, MAX_SIMILAR_K))
+        except NotIndexed:
+            return JsonResponse(
+                {"status": "error", "message": "Statistik hanya tersedia untuk pertandingan selesai."}, status=404
+            )
+
+        rows = {row["id"]: row for row in
+                Match.objects.filter(pk__in=[pk for pk, _ in neighbours]).values(*columns_for(MATCH_LIST_FIELDS))}
+        similar = [
+            {**project(rows[pk], MATCH_LIST_FIELDS), "distance": round(distance, 4)}
+            for pk, distance in neighbours if pk in rows
+        ]
+        return JsonResponse({"status": "success", "match_id": id, "similar": similar}, status=200)
+
+    except Exception as e:
+        return JsonResponse({"status": "error", "message": str(e)}, status=500)
+
+LIVE_HEARTBEAT_SECONDS = 15
+
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _live_stream(subscription, snapshot):
+    try:
+        yield _sse("snapshot", {"matches": snapshot})
+        while True:
+            events = await subscription.next_events(LIVE_HEARTBEAT_SECONDS)
+            if not events:
+                yield ": ping\n\n"  # jaga koneksi tetap hidup di balik proxy
+            for event in events:
+                yield _sse("score", event)
+    finally:
+        subscription.close()
+
+
+async def live_scores_sse(request):
+    """
+    Server-Sent Events perubahan skor/status match LIVE (jalankan lewat ASGI).
+    Parameter: ?match=<id> untuk satu match; default semua match liga.
+    Event pertama "snapshot" berisi match LIVE saat ini, lalu "score" per perubahan.
+    Di bawah WSGI stream ini akan menahan satu worker selamanya, jadi ditolak (501);
+    client memakai polling API match sebagai gantinya.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {"status": "error", "message": "Live score hanya tersedia lewat server ASGI."}, status=501
+        )
+
+    match_id = request.GET.get("match")
+    if match_id:
+        if not match_id.isdigit():
+            return JsonResponse({"status": "error", "message": "Parameter match tidak valid."}, status=400)
+        match_id = int(match_id)
+        league_id = await Match.objects.filter(pk=match_id).values_list("league_id", flat=True).afirst()
+        if league_id is None:
+            return JsonResponse({"status": "error", "message": "Pertandingan tidak ditemukan."}, status=404)
+    else:
+        match_id = None
+        league_id = await League.objects.order_by("pk").values_list("pk", flat=True).afirst()
+        if league_id is None:
+            return JsonResponse({"status": "error", "message": "Belum ada data liga."}, status=404)
+
+    # berlangganan sebelum snapshot dibaca agar tidak ada perubahan yang terlewat
+    subscription = get_broker().subscribe(league_id, match_id)
+    stream = None
+    try:
+        live = Match.objects.filter(league_id=league_id, status=Match.Status.LIVE)
+        if match_id is not None:
+            live = live.filter(pk=match_id)
+        snapshot = [match_event(row) async for row in live.values(
+            "id", "league_id", "season", "status", "home_team_id", "away_team_id", "home_score", "away_score")]
+        stream = _live_stream(subscription, snapshot)
+    finally:
+        # setelah stream dibuat, _live_stream yang menutup subscription
+        if stream is None:
+            subscription.close()
+
+    response = StreamingHttpResponse(stream, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+MATCH_BATCH_LIMIT = 100
+
+@csrf_exempt
+def match_detail_batch_flutter(request):
+    """
+    API detail banyak pertandingan sekaligus (prefetch kartu di mobile).
+    Parameter: ?ids=1,2,3 (maks 100) dan ?fields= seperti match_detail_flutter.
+    Satu query JOIN untuk semua id; id yang tidak ada dilaporkan per id di "errors".
+    """
+    try:
+        try:
+            fields = parse_fields(request.GET.get("fields"), MATCH_DETAIL_FIELDS)
+        except InvalidFields as e:
+            return JsonResponse({"status": "error", "message": str(e)}, status=400)
+
+        tokens = list(dict.fromkeys(t.strip() for t in request.GET.get("ids", "").split(",") if t.strip()))
+        if not tokens:
+            return JsonResponse({"status": "error", "message": "Parameter ids wajib diisi."}, status=400)
+        if len(tokens) > MATCH_BATCH_LIMIT:
+            return JsonResponse(
+                {"status": "error", "message": f"Maksimal {MATCH_BATCH_LIMIT} id per request."}, status=400
+            )
+
+        errors = {}
+        ids = []
+        for token in tokens:
+            if token.isdigit():
+                ids.append(int(token))
+            else:
+                errors[token] = "Id tidak valid."
+
+        rows = Match.objects.filter(pk__in=ids).values(*columns_for(fields))
+        matches = {str(row["id"]): project(row, fields) for row in rows}
+        for match_id in ids:
+            if str(match_id) not in matches:
+                errors[str(match_id)] = "Pertandingan tidak ditemukan."
+
+        return JsonResponse({"status": "success", "matches": matches, "errors": errors}, status=200)
+
+    except Exception as e:
+        return JsonResponse({"status": "error", "message": str(e)}, status=500)
+
 @csrf_exempt
 def match_detail_flutter(request, id):
     """
     API untuk detail satu pertandingan (Stats lengkap).
     Digunakan saat kartu pertandingan diklik di mobile.
+    ?fields=a,b,c membatasi field yang dimuat & dikirim (lihat leagues/fields.py).
     """
     try:
-        m = Match.objects.get(pk=id)
-        data = {
-            "id": m.pk,
-            "home_team": m.home_team.name,
-            "away_team": m.away_team.name,
-            "home_score": m.home_score,
-            "away_score": m.away_score,
-            "date": m.date.isoformat(),
-            "status": m.status,
-            "season": m.season,
-            "is_finished": m.status == "FINISHED",
-            
-            # --- Statistik Home ---
-            "home_shots": m.home_shots,
-            "home_shots_on_target": m.home_shots_on_target,
-            "home_possession": m.home_possession,
-            "home_passes": m.home_passes,
-            "home_corners": m.home_corners,
-            "home_offsides": m.home_offsides,
-            "home_fouls": m.home_fouls_conceded,
-            "home_yellow_cards": m.home_yellow_cards,
-            "home_red_cards": m.home_red_cards,
-
-            # --- Statistik Away ---
-            "away_shots": m.away_shots,
-            "away_shots_on_target": m.away_shots_on_target,
-            "away_possession": m.away_possession,
-            "away_passes": m.away_passes,
-            "away_corners": m.away_corners,
-            "away_offsides": m.away_offsides,
-            "away_fouls": m.away_fouls_conceded,
-            "away_yellow_cards": m.away_yellow_cards,
-            "away_red_cards": m.away_red_cards,
-        }
-        return JsonResponse(data, status=200)
+        try:
+            fields = parse_fields(request.GET.get("fields"), MATCH_DETAIL_FIELDS)
+        except InvalidFields as e:
+            return JsonResponse({"status": "error", "message": str(e)}, status=400)
+
+        row = Match.objects.filter(pk=id).values(*columns_for(fields)).first()
+        if row is None:
+            raise Match.DoesNotExist
+        return JsonResponse(project(row, fields), status=200)
 
     except Match.DoesNotExist:
         return JsonResponse({"status": "error", "message": "Pertandingan tidak ditemukan."}, status=404)